@@ -5,6 +5,8 @@ from flask_cors import CORS  # Make sure this is imported
 from datetime import datetime
 from app.config import Config
 from app.db import DB
+from app.utils.http_cache import init_http_cache
+from app.utils.deadline import init_deadlines
 from bson import ObjectId
 
 
@@ -53,10 +55,22 @@ def create_app():
     # -----------------------------------------------
     jwt = JWTManager(app)
 
+    # -----------------------------------------------
+    # ETag / 304 handling and response compression
+    # -----------------------------------------------
+    init_http_cache(app)
+
+    # -----------------------------------------------
+    # Per-request time budgets (503 when exceeded)
+    # -----------------------------------------------
+    init_deadlines(app)
+
     # -----------------------------------------------
     # MongoDB Initialization
     # -----------------------------------------------
-    DB.initialize()
+    # Lazy: clients connect on first use. Under gunicorn each worker
+    # reconnects and warms up after fork (see gunicorn.conf.py).
+    DB.initialize(connect=False)
 
     # -----------------------------------------------
     # Register Blueprints
@@ -70,6 +84,14 @@ def create_app():
     from app.routes.veterinarian_auth import veterinarian_auth_bp
     from app.routes.upload_routes import upload_bp
     from app.routes.authority_dashboard import authority_dashboard_bp
+    from app.routes.sync import sync_bp
+    from app.routes.medicines import medicines_bp
+    from app.routes.vets import vets_bp
+    from app.routes.dispatch import dispatch_bp
+    from app.routes.health import health_bp
+    from app.routes.analytics import analytics_bp
+    from app.routes.exports import exports_bp
+    from app.routes.qr import qr_bp
 
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(farmers_bp, url_prefix='/farmers')
@@ -80,6 +102,20 @@ def create_app():
     app.register_blueprint(authority_auth_bp, url_prefix='/authority/auth')
     app.register_blueprint(upload_bp, url_prefix='/uploads')
     app.register_blueprint(authority_dashboard_bp, url_prefix='/authority/dashboard')
+    app.register_blueprint(sync_bp, url_prefix='/sync')
+    app.register_blueprint(medicines_bp, url_prefix='/medicines')
+    app.register_blueprint(vets_bp, url_prefix='/vets')
+    app.register_blueprint(dispatch_bp, url_prefix='/dispatch')
+    app.register_blueprint(health_bp, url_prefix='/health')
+    app.register_blueprint(analytics_bp, url_prefix='/authority/analytics')
+    app.register_blueprint(exports_bp, url_prefix='/authority/exports')
+    app.register_blueprint(qr_bp, url_prefix='/qr')
+
+    # -----------------------------------------------
+    # CLI maintenance commands (flask <command>)
+    # -----------------------------------------------
+    from app.cli import register_commands
+    register_commands(app)
 
     # -----------------------------------------------
     # Health Check Route
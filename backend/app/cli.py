@@ -0,0 +1,123 @@
+import os
+import re
+
+import click
+
+
+def register_commands(app):
+    """Maintenance jobs, run with `flask --app run <command>`"""
+
+    @app.cli.command("migrate-gps")
+    @click.option("--batch-size", default=500, show_default=True)
+    def migrate_gps(batch_size):
+        """Backfill GeoJSON locations from gps_location lat/lng embeds."""
+        from app.services.geo_service import GeoService
+
+        summary = GeoService.migrate_gps_locations(batch_size=batch_size)
+        for name, counts in summary.items():
+            click.echo(f"{name}: {counts['migrated']} migrated, {counts['skipped']} skipped")
+
+    @app.cli.command("rebuild-rollups")
+    @click.option("--since", default=None, help="First day to rebuild (YYYY-MM-DD); all history when omitted.")
+    @click.option("--batch-size", default=1000, show_default=True)
+    def rebuild_rollups(since, batch_size):
+        """Recompute treatment_daily_stats from raw treatments."""
+        from datetime import datetime
+        from app.services.rollup_service import RollupService
+
+        start = datetime.strptime(since, "%Y-%m-%d") if since else None
+        summary = RollupService.rebuild(since=start, batch_size=batch_size)
+        click.echo(f"{summary['documents']} rollup documents from {summary['treatments']} treatments")
+
+    @app.cli.command("recount-violations")
+    @click.option("--batch-size", default=1000, show_default=True)
+    def recount_violations(batch_size):
+        """Recompute each farmer's violation_count and active_animals counters."""
+        from app.services.violation_service import ViolationService
+
+        summary = ViolationService.recount(batch_size=batch_size)
+        click.echo(f"{summary['farmers']} farmers with violations, {summary['updated']} updated, {summary['cleared']} cleared")
+        click.echo(f"{summary['active_farms']} active farms, {summary['active_corrected']} corrected")
+
+    @app.cli.command("check-compliance")
+    @click.option("--full", is_flag=True, help="Re-scan every treatment instead of those updated since the last run.")
+    @click.option("--chunk-size", default=5000, show_default=True)
+    def check_compliance(full, chunk_size):
+        """Run the compliance rules and flag (or clear) violations."""
+        from app.services.compliance_engine import ComplianceEngine
+
+        summary = ComplianceEngine.run(full=full, chunk_size=chunk_size)
+        click.echo(f"{summary['scanned']} scanned, {summary['flagged']} flagged, {summary['cleared']} cleared")
+
+    @app.cli.command("compute-amu")
+    @click.option("--since", default=None, help="First month to compute (YYYY-MM); the last 12 months when omitted.")
+    @click.option("--chunk-size", default=5000, show_default=True)
+    def compute_amu(since, chunk_size):
+        """Recompute antimicrobial usage metrics into amu_metrics."""
+        from datetime import datetime
+        from app.services.amu_service import AmuService
+
+        if since:
+            start = datetime.strptime(since, "%Y-%m")
+        else:
+            now = datetime.utcnow()
+            index = now.year * 12 + now.month - 12
+            start = datetime(index // 12, index % 12 + 1, 1)
+        summary = AmuService.compute(start, chunk_size=chunk_size)
+        click.echo(f"{summary['documents']} metric documents from {summary['treatments']} treatments")
+
+    @app.cli.command("export-parquet")
+    @click.option("--out", default=None, help="Output directory; EXPORT_DIR when omitted.")
+    @click.option("--full", is_flag=True, help="Export everything instead of changes since the last run.")
+    @click.option("--batch-size", default=10000, show_default=True)
+    def export_parquet(out, full, batch_size):
+        """Write treatments, prescriptions and animals as partitioned Parquet."""
+        from app.services.export_service import ExportService
+
+        summary = ExportService.export(root=out, full=full, batch_size=batch_size)
+        for name, result in summary.items():
+            click.echo(f"{name}: {result['rows']} rows in {result['files']} files")
+
+    @app.cli.command("refresh-analytics")
+    @click.option("--full", is_flag=True, help="Rebuild the store instead of loading changes since the last refresh.")
+    @click.option("--batch-size", default=10000, show_default=True)
+    def refresh_analytics(full, batch_size):
+        """Load treatments and prescriptions into the DuckDB analytics store."""
+        from app.services.analytics_service import AnalyticsService
+
+        summary = AnalyticsService.refresh(full=full, batch_size=batch_size)
+        click.echo(f"{summary['treatments']} treatments loaded ({'full' if summary['full'] else 'incremental'})")
+
+    @app.cli.command("qr-sheets")
+    @click.option("--district", default=None, help="Badges for every farmer in this district.")
+    @click.option("--farmer-ids", default=None, help="Comma-separated farmer IDs.")
+    @click.option("--out", default="badges", show_default=True, help="Directory for the SVG pages.")
+    @click.option("--workers", default=os.cpu_count() or 1, show_default=True, help="Processes rendering pages.")
+    def qr_sheets(district, farmer_ids, out, workers):
+        """Render printable A4 sheets of farmer QR badges."""
+        from bson import ObjectId
+        from app.db import DB
+        from app.services.qr_service import QRService
+
+        if farmer_ids:
+            query = {"_id": {"$in": [ObjectId(i.strip()) for i in farmer_ids.split(",") if i.strip()]}}
+        elif district:
+            query = {"district": {"$regex": f"^\\s*{re.escape(district.strip())}\\s*$", "$options": "i"}}
+        else:
+            raise click.UsageError("Pass --district or --farmer-ids")
+
+        farmers = list(DB.farmers.find(query, {"name": 1, "district": 1}).sort("name", 1))
+        pages = QRService.sheets(QRService.badges(farmers), workers=workers)
+        os.makedirs(out, exist_ok=True)
+        for number, page in enumerate(pages, start=1):
+            with open(os.path.join(out, f"badges-{number:03d}.svg"), "wb") as f:
+                f.write(page)
+        click.echo(f"{len(farmers)} badges on {len(pages)} pages → {out}")
+
+    @app.cli.command("complete-dispatched")
+    @click.option("--batch-size", default=500, show_default=True)
+    def complete_dispatched(batch_size):
+        """Complete dispatch requests whose treatments were already diagnosed."""
+        from app.services.dispatch_service import DispatchService
+
+        click.echo(f"{DispatchService.complete_diagnosed(batch_size=batch_size)} requests completed")
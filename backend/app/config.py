@@ -6,10 +6,101 @@ load_dotenv()
 class Config:
     MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
     MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "digital_farm")
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+    MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', 0))
+    MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', 100))
+    DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() in ('1', 'true')
+
+    # Health probes: readiness ping / deep check result caching
+    HEALTH_PING_CACHE_SECONDS = float(os.getenv('HEALTH_PING_CACHE_SECONDS', 2))
+    HEALTH_DEEP_CACHE_SECONDS = float(os.getenv('HEALTH_DEEP_CACHE_SECONDS', 30))
+    HEALTH_DEEP_TIMEOUT_MS = int(os.getenv('HEALTH_DEEP_TIMEOUT_MS', 1000))
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "super-secret-jwt-key")
     JWT_ACCESS_TOKEN_EXPIRES = int(os.getenv('JWT_ACCESS_TOKEN_EXPIRES', 3600))
     TEST_OTP_MODE = os.getenv('TEST_OTP_MODE', 'False').lower() == 'true'
 
+    # Request deadlines: default budget per request (routes may declare
+    # their own with @budget) and the cap for outbound HTTP calls
+    REQUEST_BUDGET_SECONDS = float(os.getenv('REQUEST_BUDGET_SECONDS', 10))
+    HTTP_TIMEOUT_SECONDS = float(os.getenv('HTTP_TIMEOUT_SECONDS', 10))
+    DASHBOARD_BUDGET_SECONDS = float(os.getenv('DASHBOARD_BUDGET_SECONDS', 5))
+    SYNC_BUDGET_SECONDS = float(os.getenv('SYNC_BUDGET_SECONDS', 20))
+    UPLOAD_BUDGET_SECONDS = float(os.getenv('UPLOAD_BUDGET_SECONDS', 30))
+
+    # Async (gevent) serving mode, see serve_async.py
+    ASYNC_MAX_CONNECTIONS = int(os.getenv('ASYNC_MAX_CONNECTIONS', 2000))
+
+    # Offline sync (mobile field app)
+    SYNC_TOKEN_MAX_AGE_DAYS = int(os.getenv('SYNC_TOKEN_MAX_AGE_DAYS', 30))
+    SYNC_CLOCK_SKEW_SECONDS = int(os.getenv('SYNC_CLOCK_SKEW_SECONDS', 5))
+    SYNC_MAX_MUTATIONS = int(os.getenv('SYNC_MAX_MUTATIONS', 200))
+
+    # HTTP caching / compression
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+    COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', 6))
+
+    # Authorized medicine catalog cache
+    CATALOG_VERSION_CHECK_SECONDS = float(os.getenv('CATALOG_VERSION_CHECK_SECONDS', 5))
+    # Similarity (0..1) above which a misspelled medicine name is auto-corrected
+    MEDICINE_MATCH_CUTOFF = float(os.getenv('MEDICINE_MATCH_CUTOFF', 0.85))
+
+    # Treatment request dispatch queue
+    DISPATCH_LEASE_SECONDS = int(os.getenv('DISPATCH_LEASE_SECONDS', 900))
+    DISPATCH_MAX_ACTIVE_PER_VET = int(os.getenv('DISPATCH_MAX_ACTIVE_PER_VET', 5))
+    DISPATCH_RADIUS_KM = float(os.getenv('DISPATCH_RADIUS_KM', 50))
+    DISPATCH_CANDIDATES = int(os.getenv('DISPATCH_CANDIDATES', 20))
+    DISPATCH_PREFERRED_GRACE_SECONDS = int(os.getenv('DISPATCH_PREFERRED_GRACE_SECONDS', 600))
+
+    # Live authority dashboard (Server-Sent Events)
+    DASHBOARD_STREAM_INTERVAL = float(os.getenv('DASHBOARD_STREAM_INTERVAL', 5))
+    DASHBOARD_STREAM_HEARTBEAT = float(os.getenv('DASHBOARD_STREAM_HEARTBEAT', 15))
+    DASHBOARD_STREAM_QUEUE_SIZE = int(os.getenv('DASHBOARD_STREAM_QUEUE_SIZE', 100))
+    DASHBOARD_STREAM_MAX_EVENTS = int(os.getenv('DASHBOARD_STREAM_MAX_EVENTS', 200))
+
+    # Dashboard statistics: query time limit, last-known-good cache, circuit breaker
+    DASHBOARD_QUERY_TIMEOUT_MS = int(os.getenv('DASHBOARD_QUERY_TIMEOUT_MS', 3000))
+    # The dashboard data version (ETag stamp) is recomputed at most this often per worker
+    DASHBOARD_VERSION_SECONDS = float(os.getenv('DASHBOARD_VERSION_SECONDS', 5))
+    DASHBOARD_STATS_FRESH_SECONDS = float(os.getenv('DASHBOARD_STATS_FRESH_SECONDS', 10))
+    DASHBOARD_STATS_MAX_STALE_SECONDS = float(os.getenv('DASHBOARD_STATS_MAX_STALE_SECONDS', 86400))
+    DASHBOARD_BREAKER_FAILURES = int(os.getenv('DASHBOARD_BREAKER_FAILURES', 5))
+    DASHBOARD_BREAKER_RESET_SECONDS = float(os.getenv('DASHBOARD_BREAKER_RESET_SECONDS', 30))
+
+    # Shared pool for running independent dashboard queries concurrently
+    FANOUT_MAX_WORKERS = int(os.getenv('FANOUT_MAX_WORKERS', 16))
+
+    # Request coalescing: identical concurrent requests share one computation.
+    # COALESCE_SHARED extends it across workers through a Mongo lock.
+    COALESCE_SHARED = os.getenv('COALESCE_SHARED', 'False').lower() == 'true'
+    COALESCE_LOCK_SECONDS = float(os.getenv('COALESCE_LOCK_SECONDS', 10))
+    COALESCE_RESULT_SECONDS = float(os.getenv('COALESCE_RESULT_SECONDS', 1))
+    COALESCE_POLL_SECONDS = float(os.getenv('COALESCE_POLL_SECONDS', 0.05))
+
+    # Analyst exports (flask export-parquet)
+    EXPORT_DIR = os.getenv('EXPORT_DIR', 'exports')
+    # Smallest row group written (a partition's last one may be smaller),
+    # rows buffered across partitions, and part files held open at once
+    EXPORT_ROW_GROUP_ROWS = int(os.getenv('EXPORT_ROW_GROUP_ROWS', 10000))
+    EXPORT_BUFFER_ROWS = int(os.getenv('EXPORT_BUFFER_ROWS', 100000))
+    EXPORT_MAX_OPEN_FILES = int(os.getenv('EXPORT_MAX_OPEN_FILES', 32))
+
+    # Embedded analytics store (flask refresh-analytics)
+    ANALYTICS_DB_PATH = os.getenv('ANALYTICS_DB_PATH', 'analytics.duckdb')
+
+    # QR badges: codes point consumers at PUBLIC_BASE_URL/consumer/safety/<token>
+    PUBLIC_BASE_URL = os.getenv('PUBLIC_BASE_URL', 'http://localhost:5000')
+    QR_CACHE_DIR = os.getenv('QR_CACHE_DIR', 'qr_cache')
+    QR_MEMORY_CACHE_SIZE = int(os.getenv('QR_MEMORY_CACHE_SIZE', 512))
+    QR_SHEET_MAX_BADGES = int(os.getenv('QR_SHEET_MAX_BADGES', 240))
+
+    # POST /consumer/safety/batch
+    SAFETY_BATCH_MAX_IDS = int(os.getenv('SAFETY_BATCH_MAX_IDS', 1000))
+
+    # Per-worker map of farmers under withdrawal behind the consumer safety checks
+    SAFETY_MAP_POLL_SECONDS = float(os.getenv('SAFETY_MAP_POLL_SECONDS', 5))
+    SAFETY_MAP_MAX_STALE_SECONDS = float(os.getenv('SAFETY_MAP_MAX_STALE_SECONDS', 60))
+    SAFETY_KNOWN_FARMERS_SIZE = int(os.getenv('SAFETY_KNOWN_FARMERS_SIZE', 100000))
+
 TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID')
 TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN')
 TWILIO_VERIFY_SERVICE_SID = os.getenv('TWILIO_VERIFY_SERVICE_SID') # seconds
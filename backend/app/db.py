@@ -1,6 +1,7 @@
 from pymongo import MongoClient
 import certifi
 from app.config import Config
+from app.utils.pool_stats import POOL_STATS
 
 class DB:
     client = None
@@ -13,12 +14,34 @@ class DB:
     consumer_checks = None
     authority_verifications = None
     authorities = None
+    catalog_versions = None
+    treatment_daily_stats = None
+    job_state = None
 
     @classmethod
-    def initialize(cls):
-        from mongoengine import connect
-        connect(db=Config.MONGO_DB_NAME, host=Config.MONGO_URI, tlsCAFile=certifi.where())
-        cls.client = MongoClient(Config.MONGO_URI, tlsCAFile=certifi.where())
+    def initialize(cls, connect=True):
+        """
+        Create the Mongo clients. With connect=False nothing touches the
+        network (or starts threads) until the first operation, which keeps
+        a preloaded gunicorn master fork-safe.
+        """
+        from mongoengine import connect as mongoengine_connect
+
+        # Idempotent: drop an earlier registration first, so a second call
+        # (tests after create_app, a worker after fork) with other settings
+        # does not clash with mongoengine's 'default' alias
+        cls.close()
+
+        options = dict(
+            tlsCAFile=certifi.where(),
+            serverSelectionTimeoutMS=Config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            minPoolSize=Config.MONGO_MIN_POOL_SIZE,
+            maxPoolSize=Config.MONGO_MAX_POOL_SIZE,
+            event_listeners=[POOL_STATS],
+            connect=connect
+        )
+        mongoengine_connect(db=Config.MONGO_DB_NAME, host=Config.MONGO_URI, **options)
+        cls.client = MongoClient(Config.MONGO_URI, **options)
         cls.db = cls.client[Config.MONGO_DB_NAME]
         cls.farmers = cls.db.farmers
         cls.animals = cls.db.animals
@@ -28,8 +51,29 @@ class DB:
         cls.consumer_checks = cls.db.consumer_checks
         cls.authority_verifications = cls.db.authority_verifications
         cls.authorities = cls.db.authorities
+        cls.catalog_versions = cls.db.catalog_versions
+        cls.treatment_daily_stats = cls.db.treatment_daily_stats
+        cls.job_state = cls.db.job_state
 
     @classmethod
     def close(cls):
+        from mongoengine import disconnect
+        # Also drops the collection handles cached on mongoengine Documents
+        disconnect()
         if cls.client:
-            cls.client.close()
\ No newline at end of file
+            cls.client.close()
+            cls.client = None
+
+
+class CollectionRef:
+    """
+    Class attribute that resolves to a DB collection when accessed, so
+    classes defined at import time follow a later DB.initialize()
+    (e.g. gunicorn workers reconnecting after fork).
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, obj, owner):
+        return getattr(DB, self.name)
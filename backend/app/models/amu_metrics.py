@@ -0,0 +1,38 @@
+from mongoengine import Document, StringField, IntField, FloatField, DateTimeField
+import datetime
+
+
+class AmuMetric(Document):
+    """
+    Antimicrobial usage for one (month, district, species, class),
+    materialized by AmuService.compute (`flask compute-amu`).
+
+    mg is active substance; pcu_kg the population correction unit (live
+    weight at risk of treatment) of the district's active animals of that
+    species. antimicrobial_class "*" rows total every class (a treatment
+    with two classes counts once there).
+    """
+    period = DateTimeField(required=True)        # first day of the month, UTC
+    district = StringField(required=True)
+    species = StringField(required=True)
+    antimicrobial_class = StringField(required=True)
+
+    mg = FloatField(default=0)
+    pcu_kg = FloatField(default=0)
+    mg_per_pcu = FloatField()
+    treatments = IntField(default=0)
+    animals_treated = IntField(default=0)
+    treatment_days = IntField(default=0)
+    animal_days = IntField(default=0)
+    treatment_days_per_1000 = FloatField()
+    unquantified_doses = IntField(default=0)     # dosages not expressible in mg
+
+    computed_at = DateTimeField(default=datetime.datetime.utcnow)
+
+    meta = {
+        "collection": "amu_metrics",
+        "indexes": [
+            {"fields": ("period", "district", "species", "antimicrobial_class"), "unique": True},
+            ("district", "period")
+        ]
+    }
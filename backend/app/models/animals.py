@@ -1,10 +1,11 @@
 from mongoengine import (
     Document, StringField, IntField, FloatField, BooleanField,
     DateTimeField, EmbeddedDocument, EmbeddedDocumentField,
-    ListField, ReferenceField
+    ListField, ReferenceField, PointField
 )
 import datetime
 from app.utils.serializer import SerializerMixin
+from app.utils.geo import point_from_gps
 from app.models.farmers import Farmer
 
 
@@ -42,11 +43,16 @@ class Animal(Document, SerializerMixin):
     treatment_ids = ListField(StringField())
 
     gps_location = EmbeddedDocumentField(GPSLocation)
+    # GeoJSON copy of gps_location, kept in sync on save (2dsphere indexed)
+    location = PointField()
 
     created_at = DateTimeField(default=datetime.datetime.utcnow)
     updated_at = DateTimeField(default=datetime.datetime.utcnow)
 
-    meta = {"collection": "animals"}
+    meta = {
+        "collection": "animals",
+        "indexes": ["updated_at", ("farmer", "updated_at"), ("is_active", "farmer")]
+    }
     # Optional but helps debugging
     def to_json(self):
         print("🔥 Animal.to_json() running")
@@ -54,5 +60,19 @@ class Animal(Document, SerializerMixin):
 
     def save(self, *args, **kwargs):
         self.updated_at = datetime.datetime.utcnow()
-        return super().save(*args, **kwargs)
+        self.location = point_from_gps(self.gps_location)
+
+        # Keep the farmer's active_animals counter in step; recount-violations reconciles drift
+        if self.pk is None:
+            delta = 1 if self.is_active else 0
+        elif "is_active" in self._get_changed_fields():
+            delta = 1 if self.is_active else -1
+        else:
+            delta = 0
+
+        result = super().save(*args, **kwargs)
+        if delta:
+            farmer = self._data.get("farmer")
+            Farmer.objects(id=getattr(farmer, "id", farmer)).update_one(inc__active_animals=delta)
+        return result
 
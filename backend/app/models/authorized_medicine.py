@@ -1,4 +1,5 @@
-from mongoengine import Document, StringField, IntField
+from mongoengine import Document, StringField, IntField, DateTimeField
+import datetime
 
 class AuthorizedMedicine(Document):
     name = StringField(required=True, unique=True)
@@ -7,7 +8,17 @@ class AuthorizedMedicine(Document):
     frequency = StringField()
     duration_days = IntField(default=1)
     withdrawal_period_days = IntField(required=True)
+    # e.g. "tetracyclines"; None for medicines that are not antimicrobials
+    antimicrobial_class = StringField()
+
+    created_at = DateTimeField(default=datetime.datetime.utcnow)
+    updated_at = DateTimeField(default=datetime.datetime.utcnow)
 
     meta = {
-        "collection": "authorized_medicines"
+        "collection": "authorized_medicines",
+        "indexes": ["updated_at"]
     }
+
+    def save(self, *args, **kwargs):
+        self.updated_at = datetime.datetime.utcnow()
+        return super(AuthorizedMedicine, self).save(*args, **kwargs)
@@ -1,10 +1,11 @@
 from mongoengine import (
     Document, StringField, IntField, BooleanField,
     DateTimeField, EmbeddedDocument, EmbeddedDocumentField,
-    ListField, FloatField
+    ListField, FloatField, PointField
 )
 import datetime
 from app.utils.serializer import SerializerMixin
+from app.utils.geo import point_from_gps
 
 
 
@@ -32,6 +33,7 @@ class Farmer(Document, SerializerMixin):
     age = IntField()
     gender = StringField(choices=["male", "female", "other"])
     address = StringField()
+    district = StringField()
 
     # Contact
     mobile = StringField(required=True, unique=True)
@@ -48,8 +50,15 @@ class Farmer(Document, SerializerMixin):
     # Verification
     is_verified = BooleanField(default=False)
 
+    # Treatments currently flagged as violations; maintained by ViolationService
+    violation_count = IntField(default=0)
+    # Active animals on the farm; maintained by Animal.save
+    active_animals = IntField(default=0)
+
     # Location
     gps_location = EmbeddedDocumentField(GPSLocation)
+    # GeoJSON copy of gps_location, kept in sync on save (2dsphere indexed)
+    location = PointField()
 
     # Extra registration details
     after_registration = EmbeddedDocumentField(AfterRegistration)
@@ -58,7 +67,17 @@ class Farmer(Document, SerializerMixin):
     created_at = DateTimeField(default=datetime.datetime.utcnow)
     updated_at = DateTimeField(default=datetime.datetime.utcnow)
 
-    meta = {"collection": "farmers"}
+    meta = {
+        "collection": "farmers",
+        "indexes": [
+            "updated_at",
+            "is_verified",
+            # Only farms with violations are indexed; tiny however many farms there are
+            {"fields": ["violation_count"], "partialFilterExpression": {"violation_count": {"$gt": 0}}},
+            # Only active farms are indexed, so counting them never touches the documents
+            {"fields": ["active_animals"], "partialFilterExpression": {"active_animals": {"$gt": 0}}}
+        ]
+    }
 
     # 🔥 ADD THIS EXACTLY HERE
     def to_json(self):
@@ -67,4 +86,5 @@ class Farmer(Document, SerializerMixin):
 
     def save(self, *args, **kwargs):
         self.updated_at = datetime.datetime.utcnow()
+        self.location = point_from_gps(self.gps_location)
         return super(Farmer, self).save(*args, **kwargs)
@@ -0,0 +1,27 @@
+from mongoengine import Document, StringField, IntField, DateTimeField, BinaryField, ListField
+
+
+class RequestFlight(Document):
+    """
+    Cross-worker lock (and, briefly, the shared result) for one coalesced
+    request. Written by SingleFlight when COALESCE_SHARED is on; expired
+    documents are removed by the TTL index.
+    """
+    key = StringField(primary_key=True)          # normalized endpoint + arguments
+    state = StringField(choices=["running", "done"], required=True)
+    owner = StringField()                        # host:pid of the computing worker
+    lock_expires_at = DateTimeField()
+
+    status = IntField()
+    headers = ListField(ListField(StringField()))
+    body = BinaryField()
+    result_expires_at = DateTimeField()
+
+    expires_at = DateTimeField()                 # TTL: lock or result expiry, whichever is later
+
+    meta = {
+        "collection": "request_flights",
+        "indexes": [
+            {"fields": ["expires_at"], "expireAfterSeconds": 0}
+        ]
+    }
@@ -0,0 +1,33 @@
+from mongoengine import Document, StringField, IntField, DateTimeField, ObjectIdField
+import datetime
+
+
+class TreatmentDailyStat(Document):
+    """
+    Pre-aggregated treatment counters, one document per
+    (date, district, species, medicine, vet). Maintained incrementally
+    by RollupService; rebuilt from raw treatments by `flask rebuild-rollups`.
+
+    medicine is "*" for the per-treatment row (treatments / violations);
+    other rows hold prescription counts for one medicine.
+    """
+    date = DateTimeField(required=True)          # UTC midnight
+    district = StringField(required=True)
+    species = StringField(required=True)
+    medicine = StringField(required=True)        # catalog id, "name:<lowercase>" or "*"
+    medicine_name = StringField()
+    vet = ObjectIdField()
+
+    treatments = IntField(default=0)
+    violations = IntField(default=0)
+    prescriptions = IntField(default=0)
+
+    updated_at = DateTimeField(default=datetime.datetime.utcnow)
+
+    meta = {
+        "collection": "treatment_daily_stats",
+        "indexes": [
+            {"fields": ("date", "district", "species", "medicine", "vet"), "unique": True},
+            ("medicine", "date")
+        ]
+    }
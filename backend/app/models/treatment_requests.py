@@ -1,21 +1,48 @@
-from mongoengine import Document, StringField, IntField, ObjectIdField, DateTimeField, EmbeddedDocument, EmbeddedDocumentField, ListField, ReferenceField
+from mongoengine import Document, StringField, IntField, FloatField, DateTimeField, EmbeddedDocument, EmbeddedDocumentField, ListField, ReferenceField, PointField
 import datetime
 from .farmers import Farmer
 from .vets import Vet
 from .animals import Animal
+from .treatments import Treatment
+from app.utils.geo import point_from_gps
 
 class GPSLocation(EmbeddedDocument):
-    lat = IntField(required=True)
-    lng = IntField(required=True)
+    lat = FloatField(required=True)
+    lng = FloatField(required=True)
 
 class TreatmentRequest(Document):
     farmer = ReferenceField(Farmer, required=True)
     animal = ReferenceField(Animal, required=True)
+    treatment = ReferenceField(Treatment)
     preferred_vet = ReferenceField(Vet)
     assigned_vet = ReferenceField(Vet)
-    status = StringField(choices=["pending", "assigned", "accepted", "rejected", "cancelled"], default="pending")
+    status = StringField(choices=["pending", "assigned", "accepted", "completed", "rejected", "cancelled"], default="pending")
     symptoms = StringField()
     photos = ListField(StringField())
     gps_location = EmbeddedDocumentField(GPSLocation)
-    created_at = DateTimeField(default=datetime.datetime.now)
-    updated_at = DateTimeField(default=datetime.datetime.now)
\ No newline at end of file
+    location = PointField(auto_index=False)
+
+    # Dispatch queue: higher urgency is served first (0 = routine, 3 = emergency)
+    urgency = IntField(min_value=0, max_value=3, default=1)
+    lease_expires_at = DateTimeField()
+    claim_count = IntField(default=0)
+    completed_at = DateTimeField()
+
+    created_at = DateTimeField(default=datetime.datetime.utcnow)
+    updated_at = DateTimeField(default=datetime.datetime.utcnow)
+
+    meta = {
+        "collection": "treatment_requests",
+        "indexes": [
+            ("status", "-urgency", "created_at"),
+            ("status", "lease_expires_at"),
+            ("assigned_vet", "status"),
+            "treatment",
+            ("(location", "status")
+        ]
+    }
+
+    def save(self, *args, **kwargs):
+        self.updated_at = datetime.datetime.utcnow()
+        self.location = point_from_gps(self.gps_location)
+        return super(TreatmentRequest, self).save(*args, **kwargs)
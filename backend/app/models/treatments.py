@@ -6,11 +6,16 @@ import datetime
 from app.models.farmers import Farmer
 from app.models.vets import Vet
 from app.models.animals import Animal
+from app.models.authorized_medicine import AuthorizedMedicine
 from app.utils.serializer import SerializerMixin
 
 
 class MedicineDetail(Document, SerializerMixin):
+    # Catalog entry this prescription was resolved to; name is the
+    # catalog's canonical name, prescribed_name what the vet typed.
+    authorized_medicine = ReferenceField(AuthorizedMedicine)
     name = StringField(required=True)
+    prescribed_name = StringField()
     dosage = StringField(required=True)
     route = StringField(choices=["oral", "IM", "IV", "SC", "topical"])
     frequency = StringField()
@@ -43,6 +48,10 @@ class Treatment(Document, SerializerMixin):
     is_withdrawal_completed = BooleanField(default=False)
     is_flagged_violation = BooleanField(default=False)
     violation_reason = StringField()
+    # Who decided the flag: the compliance rules (which may also clear it)
+    # or an authority (which the rules never override)
+    violation_source = StringField(choices=["rules", "authority"])
+    violation_rules = ListField(StringField())
 
     status = StringField(
         choices=["pending", "diagnosed", "completed"],
@@ -52,7 +61,21 @@ class Treatment(Document, SerializerMixin):
     created_at = DateTimeField(default=datetime.datetime.utcnow)
     updated_at = DateTimeField(default=datetime.datetime.utcnow)
 
-    meta = {"collection": "treatments"}
+    meta = {
+        "collection": "treatments",
+        "indexes": [
+            "updated_at",
+            ("farmer", "updated_at"),
+            ("vet", "updated_at"),
+            ("status", "updated_at"),
+            # Consumer safety: active withdrawals overall / per farmer / per animal
+            "withdrawal_ends_on",
+            ("farmer", "withdrawal_ends_on"),
+            ("animal", "withdrawal_ends_on"),
+            # Flagged treatments only: violation listings, counts and recounts
+            {"fields": ["farmer"], "partialFilterExpression": {"is_flagged_violation": True}}
+        ]
+    }
 
     def save(self, *args, **kwargs):
         # auto withdrawal date
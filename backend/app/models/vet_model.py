@@ -1,9 +1,9 @@
-from app.db import DB
+from app.db import CollectionRef
 from app.models.base_utils import serialize_doc
 from bson.objectid import ObjectId
 
 class Vet:
-    collection = DB.vets
+    collection = CollectionRef("vets")
 
     @staticmethod
     def create(data):
@@ -1,10 +1,11 @@
 from mongoengine import (
     Document, StringField, IntField, BooleanField,
     DateTimeField, EmbeddedDocument, EmbeddedDocumentField,
-    FloatField, ListField
+    FloatField, ListField, PointField
 )
 import datetime
 from app.utils.serializer import SerializerMixin
+from app.utils.geo import point_from_gps
 
 
 class GPSLocation(EmbeddedDocument):
@@ -40,16 +41,28 @@ class Vet(Document, SerializerMixin):
 
     # Location
     gps_location = EmbeddedDocumentField(GPSLocation)
+    # GeoJSON copy of gps_location, kept in sync on save; indexed together
+    # with is_verified below for the nearest-vet search
+    location = PointField(auto_index=False)
 
     # Activity
     rating = FloatField(default=0)
     review_count = IntField(default=0)
 
+    # Dispatch: held briefly while this vet's claim checks the active-request cap
+    dispatch_lock_until = DateTimeField()
+
     # Timestamps
     created_at = DateTimeField(default=datetime.datetime.utcnow)
     updated_at = DateTimeField(default=datetime.datetime.utcnow)
 
-    meta = {"collection": "vets"}
+    meta = {
+        "collection": "vets",
+        "indexes": [
+            "updated_at",
+            ("(location", "is_verified")
+        ]
+    }
 
     def to_json(self):
         print("🔥 CUSTOM Vet.to_json() IS RUNNING")
@@ -58,4 +71,5 @@ class Vet(Document, SerializerMixin):
 
     def save(self, *args, **kwargs):
         self.updated_at = datetime.datetime.utcnow()
+        self.location = point_from_gps(self.gps_location)
         return super(Vet, self).save(*args, **kwargs)
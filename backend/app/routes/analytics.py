@@ -0,0 +1,72 @@
+from datetime import datetime
+
+from flask import Blueprint, request
+
+from app.services.analytics_service import AnalyticsService, AnalyticsError, AnalyticsUnavailable, FACTS
+from app.utils.http_cache import cache_control
+from app.utils.responses import success_response, error_response
+from app.utils.security import authority_required
+from app.utils.single_flight import coalesce
+
+analytics_bp = Blueprint("analytics", __name__)
+
+# Query-string names that are not dimension filters
+RESERVED_ARGS = {"fact", "dimensions", "measures", "from", "to", "limit"}
+
+
+def _names(value):
+    return [name.strip() for name in (value or "").split(",") if name.strip()]
+
+
+def _date(value):
+    return datetime.strptime(value, "%Y-%m-%d") if value else None
+
+
+# ------------------------------------------------------
+# WHAT CAN BE ASKED
+# ------------------------------------------------------
+@analytics_bp.route('/schema', methods=['GET'])
+@authority_required
+@cache_control("private, max-age=3600")
+def schema():
+    return success_response({
+        fact: {"dimensions": list(spec["dimensions"]), "measures": list(spec["measures"])}
+        for fact, spec in FACTS.items()
+    }, 200)
+
+
+# ------------------------------------------------------
+# GROUP-BY QUERY
+# e.g. /query?fact=treatments&dimensions=month,district&measures=treatments,violations
+#          &from=2024-01-01&species=cow
+# ------------------------------------------------------
+@analytics_bp.route('/query', methods=['GET'])
+@authority_required
+@cache_control("private, max-age=60")
+@coalesce
+def query():
+    try:
+        date_from, date_to = _date(request.args.get("from")), _date(request.args.get("to"))
+    except ValueError:
+        return error_response("from/to must be dates (YYYY-MM-DD)", 400)
+
+    filters = {k: v for k, v in request.args.items() if k not in RESERVED_ARGS}
+    try:
+        rows, refreshed_at = AnalyticsService.query(
+            request.args.get("fact", "treatments"),
+            _names(request.args.get("dimensions")),
+            _names(request.args.get("measures")),
+            filters=filters,
+            date_from=date_from,
+            date_to=date_to,
+            limit=request.args.get("limit", 1000, type=int)
+        )
+    except AnalyticsError as e:
+        return error_response(str(e), 400)
+    except AnalyticsUnavailable as e:
+        return error_response(str(e), 503)
+
+    return success_response(rows, 200, meta={
+        "refreshed_at": refreshed_at.isoformat() + "Z" if refreshed_at else None,
+        "rows": len(rows)
+    })
@@ -154,6 +154,7 @@ def register_farmer():
     if 'age' in data: farmer.age = data['age']
     if 'gender' in data: farmer.gender = data['gender']
     if 'address' in data: farmer.address = data['address']
+    if 'district' in data: farmer.district = data['district']
     if 'photo_path' in data: farmer.photo_path = data['photo_path']
     if 'aadhar_photo_path' in data: farmer.aadhar_photo_path = data['aadhar_photo_path']
     if 'tahsildar_verification_path' in data: farmer.tahsildar_verification_path = data['tahsildar_verification_path']
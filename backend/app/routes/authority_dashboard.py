@@ -1,277 +1,295 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request, Response, stream_with_context
 from datetime import datetime, timedelta
+import queue
+import time
 import traceback
 
 authority_dashboard_bp = Blueprint("authority_dashboard", __name__)
 from app.models.authorities import Authority
 from bson.objectid import ObjectId
-from app.models.farmer_model import Farmer
-from app.models.vet_model import Vet
 from app.models.animals import Animal
-from app.models.treatment_model import Treatment
+from app.models.treatments import Treatment
+from app.utils.security import authority_required
 # -----------------------------------------------------------
 # DATABASE HELPER FUNCTIONS
 # -----------------------------------------------------------
 from app.db import DB
 from bson import ObjectId
 from app.utils.responses import success_response, error_response
-
-def get_collection_count(collection_name, query=None):
-    """Get count from a MongoDB collection"""
+from app.services.medicine_catalog import MedicineCatalog
+from app.services.rollup_service import RollupService
+from app.services.amu_service import AmuService, ALL_CLASSES
+from app.services.violation_service import ViolationService
+from app.services.stats_cache import StatsCache, StatsUnavailable
+from app.services.health_service import HealthService
+from app.services.dashboard_stream import DashboardStream, format_sse, CLOSED
+from app.config import Config
+from app.utils.http_cache import cache_control, conditional
+from app.utils.deadline import budget
+from app.utils.fanout import fan_out
+from app.utils.single_flight import coalesce
+
+# Dashboard tiles are polled; let browsers reuse a copy briefly and
+# revalidate cheaply (304) after that.
+DASHBOARD_CACHE_POLICY = "private, max-age=30"
+
+
+# Last data version computed by this worker: (stamp, time.monotonic())
+_data_version = (None, 0.0)
+
+
+def dashboard_data_version():
+    """
+    Cheap version stamp for everything the dashboard aggregates: the
+    newest treatment/animal write (index-backed), collection sizes so
+    deletes are noticed, and today's date for the rolling time windows.
+    Reused for DASHBOARD_VERSION_SECONDS, so polling tiles cost a handful
+    of queries per worker every few seconds rather than per request.
+    """
+    global _data_version
+    if StatsCache.breaker.is_open():
+        # Database is being shed; let the views serve last-known-good data
+        return None
+    stamp, computed_at = _data_version
+    if stamp is not None and time.monotonic() - computed_at < Config.DASHBOARD_VERSION_SECONDS:
+        return stamp
     try:
-        collection = getattr(DB, collection_name, None)
-        # FIXED: Use 'is None' instead of boolean check
-        if collection is None:
-            return 0
-        if query:
-            return collection.count_documents(query)
-        return collection.count_documents({})
+        parts = [datetime.utcnow().date().isoformat()]
+        for name in ("treatments", "animals", "farmers", "vets"):
+            collection = getattr(DB, name, None)
+            if collection is None:
+                return None
+            latest = collection.find_one(
+                {}, {"updated_at": 1}, sort=[("updated_at", -1)], max_time_ms=query_timeout()
+            )
+            stamp = latest.get("updated_at") if latest else None
+            count = collection.estimated_document_count(maxTimeMS=query_timeout())
+            parts.append(f"{stamp.isoformat() if stamp else '-'}/{count}")
+        _data_version = ("|".join(parts), time.monotonic())
+        return _data_version[0]
     except Exception as e:
-        print(f"❌ Error counting {collection_name}: {str(e)}")
-        return 0
+        print(f"❌ Error computing dashboard version: {str(e)}")
+        return None
+
+def query_timeout():
+    """maxTimeMS applied to every dashboard query"""
+    return Config.DASHBOARD_QUERY_TIMEOUT_MS
+
+def get_collection_count(collection_name, query=None, exact=False):
+    """
+    Count documents in a MongoDB collection.
+
+    exact=False answers unfiltered counts from collection metadata
+    (estimated_document_count, O(1)); exact=True always runs
+    count_documents, e.g. for audit exports. Filtered counts are always
+    exact and must be index-backed.
+    """
+    collection = getattr(DB, collection_name, None)
+    if collection is None:
+        raise RuntimeError(f"Collection '{collection_name}' is not initialized")
+    if query or exact:
+        return collection.count_documents(query or {}, maxTimeMS=query_timeout())
+    return collection.estimated_document_count(maxTimeMS=query_timeout())
+
+def today_start():
+    today = datetime.utcnow().date()
+    return datetime(today.year, today.month, today.day)
 
-def get_today_treatments():
+# -----------------------------------------------------------
+# HEADLINE TILES
+# Each tile declares how accurate it has to be:
+#   "estimated" - collection metadata, O(1); can lag right after bulk
+#                 deletes or an unclean shutdown, fine for totals shown
+#                 in thousands
+#   "rollup"    - daily rollup counters; eventually consistent, reconciled
+#                 by `flask rebuild-rollups`
+#   "exact"     - count_documents over an index
+# ?exact=true on /overview forces every tile to "exact".
+# -----------------------------------------------------------
+COUNT_TILES = {
+    "total_farmers": ("estimated", lambda exact: get_collection_count('farmers', exact=exact)),
+    "total_veterinarians": ("estimated", lambda exact: get_collection_count('vets', exact=exact)),
+    "total_animals": ("estimated", lambda exact: get_collection_count('animals', exact=exact)),
+    "total_treatments": ("estimated", lambda exact: get_collection_count('treatments', exact=exact)),
+    "pending_verifications": ("exact", lambda exact: get_collection_count('farmers', {"is_verified": False})),
+    "today_treatments": ("rollup", lambda exact: get_today_treatments(exact=exact)),
+    "violations_count": ("exact", lambda exact: get_violations_count()),
+}
+OVERVIEW_TILES = ("total_farmers", "total_veterinarians", "total_animals", "total_treatments", "pending_verifications")
+
+def tile_accuracy(names, exact=False):
+    return {name: "exact" if exact else COUNT_TILES[name][0] for name in names}
+
+def get_overview_counts(exact=False):
+    """Headline counters for the overview tiles, counted concurrently"""
+    counts, errors = fan_out(
+        {name: (lambda count=COUNT_TILES[name][1]: count(exact)) for name in OVERVIEW_TILES},
+        timeout=query_timeout() / 1000
+    )
+    if errors:
+        # All or nothing: the cache keeps serving the last complete set
+        name, error = next(iter(errors.items()))
+        raise RuntimeError(f"overview tile '{name}' failed: {error}")
+    return {name: counts[name] for name in OVERVIEW_TILES}
+
+def get_today_treatments(exact=False):
     """Get today's treatments count"""
-    try:
-        # FIXED: Check if DB.treatments exists
-        if DB.treatments is None:
-            return 12
-            
-        today = datetime.utcnow().date()
-        tomorrow = today + timedelta(days=1)
-        
-        today_start = datetime(today.year, today.month, today.day)
-        tomorrow_start = datetime(tomorrow.year, tomorrow.month, tomorrow.day)
-        
-        count = DB.treatments.count_documents({
-            "treatment_start_date": {
-                "$gte": today_start,
-                "$lt": tomorrow_start
-            }
-        })
-        return count
-    except Exception as e:
-        print(f"❌ Error getting today's treatments: {str(e)}")
-        return 12  # Default value
+    start = today_start()
+    if not exact:
+        return RollupService.treatments_on(start, max_time_ms=query_timeout())
+    
+    return get_collection_count('treatments', {
+        "treatment_start_date": {
+            "$gte": start,
+            "$lt": start + timedelta(days=1)
+        }
+    })
 
 def get_violations_count():
     """Get count of treatment violations"""
-    try:
-        # FIXED: Check if DB.treatments exists
-        if DB.treatments is None:
-            return 5
-            
-        count = DB.treatments.count_documents({
-            "is_flagged_violation": True
-        })
-        return count
-    except Exception as e:
-        print(f"❌ Error getting violations: {str(e)}")
-        return 5  # Default value
+    return get_collection_count('treatments', {"is_flagged_violation": True})
 
 def get_farm_safety_data():
-    """Calculate farm safety metrics"""
-    try:
-        # Get total farmers
-        total_farmers = get_collection_count('farmers')
-        
-        # FIXED: Check if DB.treatments exists
-        if DB.treatments is None:
-            return {"safe": max(0, total_farmers - 25), "unsafe": 25}
-        
-        # Get farmers with violation treatments
-        violation_treatments = DB.treatments.find({
-            "is_flagged_violation": True
-        })
-        
-        # Count unique farmers with violations
-        unsafe_farmer_ids = set()
-        for treatment in violation_treatments:
-            if 'farmer' in treatment:
-                unsafe_farmer_ids.add(str(treatment['farmer']))
-        
-        unsafe_count = len(unsafe_farmer_ids)
-        safe_count = max(0, total_farmers - unsafe_count)
-        
-        return {
-            "safe": safe_count,
-            "unsafe": unsafe_count
-        }
-    except Exception as e:
-        print(f"❌ Error calculating farm safety: {str(e)}")
-        return {"safe": 118, "unsafe": 25}
+    """Active farms split by whether they have flagged violations"""
+    # Per-farmer violation counters over a partial index, not a pass over
+    # every flagged treatment
+    return ViolationService.farm_safety(max_time_ms=query_timeout())
+
+def farm_safety_percentages(farm_safety):
+    """Pie chart split of get_farm_safety_data(); empty when there are no farms"""
+    total = farm_safety["safe"] + farm_safety["unsafe"]
+    if total <= 0:
+        return []
+    safe_percent = int((farm_safety["safe"] / total) * 100)
+    return [
+        {"name": "Safe", "value": safe_percent},
+        {"name": "Under Withdrawal", "value": 100 - safe_percent}
+    ]
 
 def get_animals_by_species():
     """Get animal counts by species"""
-    try:
-        # FIXED: Check if DB.animals exists
-        if DB.animals is None:
-            return [
-                {"species": "Cattle", "count": 120},
-                {"species": "Goat", "count": 70},
-                {"species": "Buffalo", "count": 55},
-                {"species": "Sheep", "count": 45},
-            ]
-        
-        pipeline = [
-            {
-                "$group": {
-                    "_id": "$species",
-                    "count": {"$sum": 1}
-                }
-            },
-            {
-                "$sort": {"count": -1}
+    pipeline = [
+        {
+            "$group": {
+                "_id": "$species",
+                "count": {"$sum": 1}
             }
-        ]
-        
-        results = list(DB.animals.aggregate(pipeline))
-        
-        species_data = []
-        for result in results:
-            species_data.append({
-                "species": result["_id"] if result["_id"] else "Unknown",
-                "count": result["count"]
-            })
-        
-        # If no data, return default
-        if not species_data:
-            return [
-                {"species": "Cattle", "count": 120},
-                {"species": "Goat", "count": 70},
-                {"species": "Buffalo", "count": 55},
-                {"species": "Sheep", "count": 45},
-            ]
-        
-        return species_data
-    except Exception as e:
-        print(f"❌ Error getting animals by species: {str(e)}")
-        return [
-            {"species": "Cattle", "count": 120},
-            {"species": "Goat", "count": 70},
-            {"species": "Buffalo", "count": 55},
-            {"species": "Sheep", "count": 45},
-        ]
+        },
+        {
+            "$sort": {"count": -1}
+        }
+    ]
+    
+    results = DB.animals.aggregate(pipeline, maxTimeMS=query_timeout())
+    
+    return [
+        {
+            "species": result["_id"] if result["_id"] else "Unknown",
+            "count": result["count"]
+        }
+        for result in results
+    ]
+
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
 
 def get_treatment_trends():
     """Get treatment trends for last 6 months"""
-    try:
-        # FIXED: Check if DB.treatments exists
-        if DB.treatments is None:
-            return [
-                {"month": "Jan", "treatments": 12},
-                {"month": "Feb", "treatments": 18},
-                {"month": "Mar", "treatments": 25},
-                {"month": "Apr", "treatments": 20},
-                {"month": "May", "treatments": 30},
-                {"month": "Jun", "treatments": 22},
-            ]
-        
-        six_months_ago = datetime.utcnow() - timedelta(days=180)
-        
-        pipeline = [
-            {
-                "$match": {
-                    "treatment_start_date": {"$gte": six_months_ago}
-                }
-            },
-            {
-                "$group": {
-                    "_id": {
-                        "year": {"$year": "$treatment_start_date"},
-                        "month": {"$month": "$treatment_start_date"}
-                    },
-                    "count": {"$sum": 1}
-                }
-            },
-            {
-                "$sort": {"_id.year": 1, "_id.month": 1}
-            }
-        ]
-        
-        results = list(DB.treatments.aggregate(pipeline))
-        
-        month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-        trends = []
-        
-        for result in results:
-            month_num = result["_id"]["month"]
-            if 1 <= month_num <= 12:
-                month_name = month_names[month_num - 1]
-                trends.append({
-                    "month": month_name,
-                    "treatments": result["count"]
-                })
-        
-        # If no data or less than 6 months, fill with defaults
-        if len(trends) < 6:
-            trends = [
-                {"month": "Jan", "treatments": 12},
-                {"month": "Feb", "treatments": 18},
-                {"month": "Mar", "treatments": 25},
-                {"month": "Apr", "treatments": 20},
-                {"month": "May", "treatments": 30},
-                {"month": "Jun", "treatments": 22},
-            ]
-        
-        return trends
-    except Exception as e:
-        print(f"❌ Error getting treatment trends: {str(e)}")
-        return [
-            {"month": "Jan", "treatments": 12},
-            {"month": "Feb", "treatments": 18},
-            {"month": "Mar", "treatments": 25},
-            {"month": "Apr", "treatments": 20},
-            {"month": "May", "treatments": 30},
-            {"month": "Jun", "treatments": 22},
-        ]
+    six_months_ago = datetime.utcnow() - timedelta(days=180)
+    
+    # Pre-aggregated daily rollups: a few hundred small documents at most
+    results = RollupService.monthly_totals(six_months_ago, max_time_ms=query_timeout())
+    
+    return [
+        {
+            "month": MONTH_NAMES[result["_id"]["month"] - 1],
+            "treatments": result["treatments"]
+        }
+        for result in results
+        if 1 <= result["_id"]["month"] <= 12
+    ]
+
+def get_compliance_data():
+    """Compliant vs flagged treatments per month, last 6 months"""
+    six_months_ago = datetime.utcnow() - timedelta(days=180)
+    
+    results = RollupService.monthly_totals(six_months_ago, max_time_ms=query_timeout())
+    
+    compliance_data = []
+    for result in results:
+        month_num = result["_id"]["month"]
+        if 1 <= month_num <= 12:
+            non_compliant = result["violations"]
+            compliance_data.append({
+                "month": MONTH_NAMES[month_num - 1],
+                "compliant": result["treatments"] - non_compliant,
+                "nonCompliant": non_compliant
+            })
+    return compliance_data
+
+def get_vet_activity():
+    """Treatments attended by vets per weekday, last 7 days (today included)"""
+    week_start = datetime.utcnow() - timedelta(days=6)
+    
+    results = RollupService.daily_vet_visits(week_start, max_time_ms=query_timeout())
+    
+    # One rollup bucket per day; list them Monday first
+    day_names = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+    return [
+        {"day": day_names[result["_id"].weekday()], "visits": result["visits"]}
+        for result in sorted(results, key=lambda r: r["_id"].weekday())
+        if result["visits"]
+    ]
+
+def get_amu_metrics(since, district=None, species=None, klass=ALL_CLASSES):
+    """Antimicrobial usage per month, district and species"""
+    rows = AmuService.metrics(since, district, species, klass, max_time_ms=query_timeout())
+    for row in rows:
+        row["period"] = row["period"].strftime("%Y-%m")
+    return rows
 
 def get_medicine_usage():
     """Get medicine usage statistics"""
+    # Rollups are keyed on the authorized catalog id each prescription
+    # was resolved to; legacy entries without one use their name.
+    results = RollupService.medicine_totals(limit=10, max_time_ms=query_timeout())
+    
+    medicine_data = []
+    for result in results:
+        catalog_entry = MedicineCatalog.get(result["_id"])
+        medicine_data.append({
+            "medicine_id": str(result["_id"]) if catalog_entry else None,
+            "medicine": catalog_entry["name"] if catalog_entry else (result["name"] or "Unknown"),
+            "count": result["count"]
+        })
+    return medicine_data
+
+
+# -----------------------------------------------------------
+# DEGRADED MODE
+# Statistics go through StatsCache: real numbers, or the last real
+# numbers flagged stale, or a 503 — never placeholder figures.
+# -----------------------------------------------------------
+def stats_unavailable(e):
+    response, status = error_response("Dashboard statistics are temporarily unavailable", 503)
+    if e.retry_after:
+        response.headers["Retry-After"] = str(e.retry_after)
+    return response, status
+
+def stat_response(name, compute, shape=None, meta=None):
+    """Serve one statistic through the last-known-good cache"""
     try:
-        # FIXED: Check if DB.treatments exists
-        if DB.treatments is None:
-            return [
-                {"medicine": "Antibiotic A", "count": 45},
-                {"medicine": "Vaccine X", "count": 38},
-                {"medicine": "Painkiller Y", "count": 32},
-                {"medicine": "Antibiotic B", "count": 28},
-            ]
-        
-        pipeline = [
-            {"$unwind": "$medicines"},
-            {"$group": {"_id": "$medicines.name", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}},
-            {"$limit": 10}
-        ]
-        
-        results = list(DB.treatments.aggregate(pipeline))
-        
-        medicine_data = []
-        for result in results:
-            medicine_data.append({
-                "medicine": result["_id"] if result["_id"] else "Unknown",
-                "count": result["count"]
-            })
-        
-        # If no data, return defaults
-        if not medicine_data:
-            return [
-                {"medicine": "Antibiotic A", "count": 45},
-                {"medicine": "Vaccine X", "count": 38},
-                {"medicine": "Painkiller Y", "count": 32},
-                {"medicine": "Antibiotic B", "count": 28},
-            ]
-        
-        return medicine_data
-    except Exception as e:
-        print(f"❌ Error getting medicine usage: {str(e)}")
-        return [
-            {"medicine": "Antibiotic A", "count": 45},
-            {"medicine": "Vaccine X", "count": 38},
-            {"medicine": "Painkiller Y", "count": 32},
-            {"medicine": "Antibiotic B", "count": 28},
-        ]
+        result = StatsCache.get(name, compute)
+    except StatsUnavailable as e:
+        return stats_unavailable(e)
+    data = shape(result.value) if shape else result.value
+    return cached_response(data, dict(result.meta(), **(meta or {})))
+
+def cached_response(data, meta):
+    response, status = success_response(data, 200, meta=meta)
+    if meta.get("stale"):
+        # Make clients come back for fresh numbers as soon as possible
+        response.headers["Cache-Control"] = "no-cache"
+    return response, status
 
 # -----------------------------------------------------------
 # 1) TEST ENDPOINT
@@ -311,436 +329,178 @@ def test():
 # 2) DASHBOARD OVERVIEW - REAL DATA
 # -----------------------------------------------------------
 @authority_dashboard_bp.route('/overview', methods=['GET'])
+@budget(Config.DASHBOARD_BUDGET_SECONDS)
+@cache_control(DASHBOARD_CACHE_POLICY)
+@conditional(dashboard_data_version)
+@coalesce
 def dashboard_overview():
-    try:
-        # FIXED: Handle cases where collections might not exist
-        farmers_count = 0
-        vets_count = 0
-        animals_count = 0
-        treatments_count = 0
-        pending_verifications = 0
-        
-        try:
-            if hasattr(Farmer, 'collection') and Farmer.collection is not None:
-                farmers_count = Farmer.collection.count_documents({})
-                pending_verifications = Farmer.collection.count_documents({"is_verified": False})
-        except:
-            farmers_count = 143
-            pending_verifications = 8
-            
-        try:
-            if hasattr(Vet, 'collection') and Vet.collection is not None:
-                vets_count = Vet.collection.count_documents({})
-        except:
-            vets_count = 24
-            
-        try:
-            if hasattr(Animal, 'collection') and Animal.collection is not None:
-                animals_count = Animal.collection.count_documents({})
-        except:
-            animals_count = 987
-            
-        try:
-            if hasattr(Treatment, 'collection') and Treatment.collection is not None:
-                treatments_count = Treatment.collection.count_documents({})
-        except:
-            treatments_count = 436
-        
-        return success_response({
-            "total_farmers": farmers_count,
-            "total_veterinarians": vets_count,
-            "total_animals": animals_count,
-            "total_treatments": treatments_count,
-            "pending_verifications": pending_verifications
-        }, 200)
-    except Exception as e:
-        print(f"❌ Error in dashboard_overview: {str(e)}")
-        return success_response({
-            "total_farmers": 143,
-            "total_veterinarians": 24,
-            "total_animals": 987,
-            "total_treatments": 436,
-            "pending_verifications": 8
-        }, 200)
+    # ?exact=true: exact counts for audits, at the cost of index scans
+    exact = request.args.get("exact", "false").lower() in ("1", "true")
+    return stat_response(
+        "overview:exact" if exact else "overview",
+        lambda: get_overview_counts(exact=exact),
+        meta={"accuracy": tile_accuracy(OVERVIEW_TILES, exact)}
+    )
 
 # -----------------------------------------------------------
 # 3) SIMPLIFIED DASHBOARD - REAL DATA
 # -----------------------------------------------------------
 @authority_dashboard_bp.route('/simplified', methods=['GET'])
+@budget(Config.DASHBOARD_BUDGET_SECONDS)
+@cache_control(DASHBOARD_CACHE_POLICY)
+@conditional(dashboard_data_version)
+@coalesce
 def simplified_dashboard():
     try:
-        print("✅ Simplified dashboard called - fetching real data")
-        
-        # Get real counts from database
-        total_farmers = get_collection_count('farmers')
-        total_vets = get_collection_count('vets')
-        total_animals = get_collection_count('animals')
-        total_treatments = get_collection_count('treatments')
-        pending_verifications = get_collection_count('farmers', {"is_verified": False})
-        
-        # Get real-time data
-        today_treatments = get_today_treatments()
-        violations_count = get_violations_count()
-        farm_safety = get_farm_safety_data()
-        
-        # Get real chart data
-        treatment_trends = get_treatment_trends()
-        animals_by_species = get_animals_by_species()
-        
-        # Calculate farm safety status for pie chart
-        farm_safety_status = []
-        if farm_safety["safe"] > 0 or farm_safety["unsafe"] > 0:
-            total = farm_safety["safe"] + farm_safety["unsafe"]
-            if total > 0:
-                safe_percent = int((farm_safety["safe"] / total) * 100)
-                unsafe_percent = 100 - safe_percent
-                farm_safety_status = [
-                    {"name": "Safe", "value": safe_percent},
-                    {"name": "Under Withdrawal", "value": unsafe_percent}
-                ]
-        
-        # If no farm safety data, use defaults
-        if not farm_safety_status:
-            farm_safety_status = [
-                {"name": "Safe", "value": 82},
-                {"name": "Under Withdrawal", "value": 18}
-            ]
-        
-        # Use defaults if no real data
-        use_real_data = total_farmers > 0 or total_vets > 0
-        
-        if not use_real_data:
-            print("📊 Using mock data (no real data found)")
-            return success_response({
-                "overview": {
-                    "total_farmers": 143,
-                    "total_veterinarians": 24,
-                    "total_animals": 987,
-                    "total_treatments": 436,
-                    "pending_verifications": 8
-                },
-                "today_treatments": 12,
-                "violations_count": 5,
-                "farm_safety": {
-                    "safe": 118,
-                    "unsafe": 25
-                },
-                "charts": {
-                    "treatment_trends": treatment_trends,
-                    "animals_by_species": animals_by_species,
-                    "farm_safety_status": farm_safety_status
-                }
-            }, 200)
-        
-        print(f"📊 Using REAL data - Farmers: {total_farmers}, Vets: {total_vets}")
-        
-        return success_response({
-            "overview": {
-                "total_farmers": total_farmers,
-                "total_veterinarians": total_vets,
-                "total_animals": total_animals,
-                "total_treatments": total_treatments,
-                "pending_verifications": pending_verifications
-            },
-            "today_treatments": today_treatments,
-            "violations_count": violations_count,
-            "farm_safety": farm_safety,
-            "charts": {
-                "treatment_trends": treatment_trends,
-                "animals_by_species": animals_by_species,
-                "farm_safety_status": farm_safety_status
-            }
-        }, 200)
-        
-    except Exception as e:
-        print(f"❌ Error in simplified dashboard: {str(e)}")
-        print(traceback.format_exc())
-        # Return mock data on error
-        return success_response({
-            "overview": {
-                "total_farmers": 143,
-                "total_veterinarians": 24,
-                "total_animals": 987,
-                "total_treatments": 436,
-                "pending_verifications": 8
-            },
-            "today_treatments": 12,
-            "violations_count": 5,
-            "farm_safety": {
-                "safe": 118,
-                "unsafe": 25
-            },
-            "charts": {
-                "treatment_trends": [
-                    {"month": "Jan", "treatments": 12},
-                    {"month": "Feb", "treatments": 18},
-                    {"month": "Mar", "treatments": 25},
-                    {"month": "Apr", "treatments": 20},
-                    {"month": "May", "treatments": 30},
-                    {"month": "Jun", "treatments": 22},
-                ],
-                "animals_by_species": [
-                    {"species": "Cattle", "count": 120},
-                    {"species": "Goat", "count": 70},
-                    {"species": "Buffalo", "count": 55},
-                    {"species": "Sheep", "count": 45},
-                ],
-                "farm_safety_status": [
-                    {"name": "Safe", "value": 82},
-                    {"name": "Under Withdrawal", "value": 18}
-                ]
-            }
-        }, 200)
+        values, meta = StatsCache.get_many({
+            "overview": get_overview_counts,
+            "today_treatments": get_today_treatments,
+            "violations_count": get_violations_count,
+            "farm_safety": get_farm_safety_data,
+            "treatment_trends": get_treatment_trends,
+            "animals_by_species": get_animals_by_species
+        })
+    except StatsUnavailable as e:
+        return stats_unavailable(e)
+    meta["accuracy"] = tile_accuracy(OVERVIEW_TILES + ("today_treatments", "violations_count"))
+
+    farm_safety = values["farm_safety"]
+    return cached_response({
+        "overview": values["overview"],
+        "today_treatments": values["today_treatments"],
+        "violations_count": values["violations_count"],
+        "farm_safety": farm_safety,
+        "charts": {
+            "treatment_trends": values["treatment_trends"],
+            "animals_by_species": values["animals_by_species"],
+            "farm_safety_status": farm_safety_percentages(farm_safety) if farm_safety else None
+        }
+    }, meta)
 
 
 # -----------------------------------------------------------
 # 4) CHART DATA ENDPOINTS - REAL DATA
 # -----------------------------------------------------------
 @authority_dashboard_bp.route('/stats/treatment-trends', methods=['GET'])
+@budget(Config.DASHBOARD_BUDGET_SECONDS)
+@cache_control(DASHBOARD_CACHE_POLICY)
+@conditional(dashboard_data_version)
+@coalesce
 def treatment_trends():
-    try:
-        trends = get_treatment_trends()
-        return success_response(trends, 200)
-    except Exception as e:
-        print(f"❌ Error in treatment_trends: {str(e)}")
-        return success_response([
-            {"month": "Jan", "treatments": 12},
-            {"month": "Feb", "treatments": 18},
-            {"month": "Mar", "treatments": 25},
-            {"month": "Apr", "treatments": 20},
-            {"month": "May", "treatments": 30},
-            {"month": "Jun", "treatments": 22},
-        ], 200)
+    return stat_response("treatment_trends", get_treatment_trends)
 
 @authority_dashboard_bp.route('/stats/animals-by-species', methods=['GET'])
+@budget(Config.DASHBOARD_BUDGET_SECONDS)
+@cache_control(DASHBOARD_CACHE_POLICY)
+@conditional(dashboard_data_version)
+@coalesce
 def animals_by_species():
-    try:
-        species_data = get_animals_by_species()
-        return success_response(species_data, 200)
-    except Exception as e:
-        print(f"❌ Error in animals_by_species: {str(e)}")
-        return success_response([
-            {"species": "Cattle", "count": 120},
-            {"species": "Goat", "count": 70},
-            {"species": "Buffalo", "count": 55},
-            {"species": "Sheep", "count": 45},
-        ], 200)
+    return stat_response("animals_by_species", get_animals_by_species)
 
 @authority_dashboard_bp.route('/stats/farm-safety-status', methods=['GET'])
+@budget(Config.DASHBOARD_BUDGET_SECONDS)
+@cache_control(DASHBOARD_CACHE_POLICY)
+@conditional(dashboard_data_version)
+@coalesce
 def farm_safety_status():
-    try:
-        farm_safety = get_farm_safety_data()
-        total = farm_safety["safe"] + farm_safety["unsafe"]
-        
-        if total > 0:
-            safe_percent = int((farm_safety["safe"] / total) * 100)
-            unsafe_percent = 100 - safe_percent
-            return success_response([
-                {"name": "Safe", "value": safe_percent},
-                {"name": "Under Withdrawal", "value": unsafe_percent}
-            ], 200)
-        else:
-            return success_response([
-                {"name": "Safe", "value": 82},
-                {"name": "Under Withdrawal", "value": 18}
-            ], 200)
-    except Exception as e:
-        print(f"❌ Error in farm_safety_status: {str(e)}")
-        return success_response([
-            {"name": "Safe", "value": 82},
-            {"name": "Under Withdrawal", "value": 18}
-        ], 200)
+    return stat_response("farm_safety", get_farm_safety_data, shape=farm_safety_percentages)
 
 @authority_dashboard_bp.route('/stats/compliance-data', methods=['GET'])
+@budget(Config.DASHBOARD_BUDGET_SECONDS)
+@cache_control(DASHBOARD_CACHE_POLICY)
+@conditional(dashboard_data_version)
+@coalesce
 def compliance_data():
-    try:
-        # FIXED: Check if DB.treatments exists
-        if DB.treatments is None:
-            return success_response([
-                {"month": "Jan", "compliant": 85, "nonCompliant": 15},
-                {"month": "Feb", "compliant": 88, "nonCompliant": 12},
-                {"month": "Mar", "compliant": 90, "nonCompliant": 10},
-                {"month": "Apr", "compliant": 87, "nonCompliant": 13},
-                {"month": "May", "compliant": 92, "nonCompliant": 8},
-                {"month": "Jun", "compliant": 94, "nonCompliant": 6},
-            ], 200)
-        
-        # Calculate compliance from treatments
-        six_months_ago = datetime.utcnow() - timedelta(days=180)
-        
-        pipeline = [
-            {
-                "$match": {
-                    "treatment_start_date": {"$gte": six_months_ago}
-                }
-            },
-            {
-                "$group": {
-                    "_id": {
-                        "year": {"$year": "$treatment_start_date"},
-                        "month": {"$month": "$treatment_start_date"}
-                    },
-                    "total": {"$sum": 1},
-                    "compliant": {
-                        "$sum": {
-                            "$cond": [
-                                {"$eq": ["$is_flagged_violation", False]},
-                                1,
-                                0
-                            ]
-                        }
-                    }
-                }
-            },
-            {
-                "$sort": {"_id.year": 1, "_id.month": 1}
-            }
-        ]
-        
-        results = list(DB.treatments.aggregate(pipeline))
-        
-        month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-        compliance_data = []
-        
-        for result in results:
-            month_num = result["_id"]["month"]
-            if 1 <= month_num <= 12:
-                month_name = month_names[month_num - 1]
-                total = result["total"]
-                compliant = result["compliant"]
-                non_compliant = total - compliant
-                
-                compliance_data.append({
-                    "month": month_name,
-                    "compliant": compliant,
-                    "nonCompliant": non_compliant
-                })
-        
-        # If no data, return defaults
-        if not compliance_data:
-            compliance_data = [
-                {"month": "Jan", "compliant": 85, "nonCompliant": 15},
-                {"month": "Feb", "compliant": 88, "nonCompliant": 12},
-                {"month": "Mar", "compliant": 90, "nonCompliant": 10},
-                {"month": "Apr", "compliant": 87, "nonCompliant": 13},
-                {"month": "May", "compliant": 92, "nonCompliant": 8},
-                {"month": "Jun", "compliant": 94, "nonCompliant": 6},
-            ]
-        
-        return success_response(compliance_data, 200)
-    except Exception as e:
-        print(f"❌ Error in compliance_data: {str(e)}")
-        return success_response([
-            {"month": "Jan", "compliant": 85, "nonCompliant": 15},
-            {"month": "Feb", "compliant": 88, "nonCompliant": 12},
-            {"month": "Mar", "compliant": 90, "nonCompliant": 10},
-            {"month": "Apr", "compliant": 87, "nonCompliant": 13},
-            {"month": "May", "compliant": 92, "nonCompliant": 8},
-            {"month": "Jun", "compliant": 94, "nonCompliant": 6},
-        ], 200)
+    return stat_response("compliance_data", get_compliance_data)
 
 @authority_dashboard_bp.route('/stats/vet-activity', methods=['GET'])
+@budget(Config.DASHBOARD_BUDGET_SECONDS)
+@cache_control(DASHBOARD_CACHE_POLICY)
+@conditional(dashboard_data_version)
+@coalesce
 def vet_activity():
-    try:
-        # FIXED: Check if DB.treatments exists
-        if DB.treatments is None:
-            return success_response([
-                {"day": "Mon", "visits": 12},
-                {"day": "Tue", "visits": 15},
-                {"day": "Wed", "visits": 18},
-                {"day": "Thu", "visits": 14},
-                {"day": "Fri", "visits": 20},
-                {"day": "Sat", "visits": 10},
-                {"day": "Sun", "visits": 8},
-            ], 200)
-        
-        # Get vet activity for last 7 days
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        
-        pipeline = [
-            {
-                "$match": {
-                    "treatment_start_date": {"$gte": week_ago},
-                    "vet": {"$ne": None}
-                }
-            },
-            {
-                "$group": {
-                    "_id": {
-                        "day": {"$dayOfWeek": "$treatment_start_date"}
-                    },
-                    "visits": {"$sum": 1}
-                }
-            },
-            {
-                "$sort": {"_id.day": 1}
-            }
-        ]
-        
-        results = list(DB.treatments.aggregate(pipeline))
-        
-        # Map day numbers to names (MongoDB: 1=Sunday, 2=Monday, etc.)
-        day_names = ['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat']
-        activity_data = []
-        
-        for result in results:
-            day_num = result["_id"]["day"]
-            if 1 <= day_num <= 7:
-                # Adjust for Monday start
-                adjusted_index = (day_num + 5) % 7
-                day_name = day_names[adjusted_index]
-                activity_data.append({
-                    "day": day_name,
-                    "visits": result["visits"]
-                })
-        
-        # If no data, return defaults
-        if not activity_data:
-            activity_data = [
-                {"day": "Mon", "visits": 12},
-                {"day": "Tue", "visits": 15},
-                {"day": "Wed", "visits": 18},
-                {"day": "Thu", "visits": 14},
-                {"day": "Fri", "visits": 20},
-                {"day": "Sat", "visits": 10},
-                {"day": "Sun", "visits": 8},
-            ]
-        
-        return success_response(activity_data, 200)
-    except Exception as e:
-        print(f"❌ Error in vet_activity: {str(e)}")
-        return success_response([
-            {"day": "Mon", "visits": 12},
-            {"day": "Tue", "visits": 15},
-            {"day": "Wed", "visits": 18},
-            {"day": "Thu", "visits": 14},
-            {"day": "Fri", "visits": 20},
-            {"day": "Sat", "visits": 10},
-            {"day": "Sun", "visits": 8},
-        ], 200)
+    return stat_response("vet_activity", get_vet_activity)
 
 @authority_dashboard_bp.route('/stats/medicine-usage', methods=['GET'])
+@budget(Config.DASHBOARD_BUDGET_SECONDS)
+@cache_control(DASHBOARD_CACHE_POLICY)
+@conditional(dashboard_data_version)
+@coalesce
 def medicine_usage_stats():
-    try:
-        medicine_data = get_medicine_usage()
-        return success_response(medicine_data, 200)
-    except Exception as e:
-        print(f"❌ Error in medicine_usage_stats: {str(e)}")
-        return success_response([
-            {"medicine": "Antibiotic A", "count": 45},
-            {"medicine": "Vaccine X", "count": 38},
-            {"medicine": "Painkiller Y", "count": 32},
-            {"medicine": "Antibiotic B", "count": 28},
-        ], 200)
+    return stat_response("medicine_usage", get_medicine_usage)
+
+@authority_dashboard_bp.route('/stats/amu', methods=['GET'])
+@budget(Config.DASHBOARD_BUDGET_SECONDS)
+@cache_control(DASHBOARD_CACHE_POLICY)
+@coalesce
+def amu_stats():
+    # Materialized by `flask compute-amu`; treatment writes alone do not
+    # change it, so no data-version ETag here
+    months = request.args.get("months", 12, type=int)
+    if not 1 <= months <= 60:
+        return error_response("months must be between 1 and 60", 400)
+    district = request.args.get("district")
+    species = request.args.get("species")
+    klass = request.args.get("class", ALL_CLASSES)
+
+    this_month = datetime.utcnow()
+    index = this_month.year * 12 + this_month.month - months
+    since = datetime(index // 12, index % 12 + 1, 1)
+
+    return stat_response(
+        f"amu:{months}:{district}:{species}:{klass}",
+        lambda: get_amu_metrics(since, district, species, klass)
+    )
 
 @authority_dashboard_bp.route('/stats/daily-treatments', methods=['GET'])
+@budget(Config.DASHBOARD_BUDGET_SECONDS)
+@cache_control(DASHBOARD_CACHE_POLICY)
+@conditional(dashboard_data_version)
+@coalesce
 def daily_treatments():
-    try:
-        today_count = get_today_treatments()
-        return success_response({"today_treatments": today_count}, 200)
-    except Exception as e:
-        print(f"❌ Error in daily_treatments: {str(e)}")
-        return success_response({"today_treatments": 12}, 200)
+    return stat_response(
+        "today_treatments", get_today_treatments,
+        shape=lambda count: {"today_treatments": count},
+        meta={"accuracy": tile_accuracy(("today_treatments",))}
+    )
+
+
+# -----------------------------------------------------------
+# 4b) LIVE UPDATES (Server-Sent Events)
+# Events: "snapshot" on connect, then "counters" (changed keys only),
+# "treatment" (new treatments) and "violation" (flagged treatments)
+# -----------------------------------------------------------
+@authority_dashboard_bp.route('/stream', methods=['GET'])
+@authority_required
+@budget(None)  # long-lived; the producer thread bounds its own queries
+def dashboard_stream():
+    subscription = DashboardStream.subscribe()
+
+    def events():
+        try:
+            yield "retry: 5000\n\n"
+            snapshot = DashboardStream.snapshot()
+            if snapshot:
+                yield format_sse("snapshot", snapshot)
+
+            while True:
+                try:
+                    item = subscription.get(timeout=Config.DASHBOARD_STREAM_HEARTBEAT)
+                except queue.Empty:
+                    # Comment frame keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+                if item == CLOSED:
+                    return
+                event, data = item
+                yield format_sse(event, data)
+        finally:
+            DashboardStream.unsubscribe(subscription)
+
+    response = Response(stream_with_context(events()), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
 
 
 # -----------------------------------------------------------
@@ -867,37 +627,53 @@ def list_violations():
         return success_response([], 200)
 
 
+@authority_dashboard_bp.route('/violations/<treatment_id>', methods=['PUT'])
+@authority_required
+def set_violation(treatment_id):
+    """Flag ({"flagged": true, "reason": "..."}) or clear a treatment's violation"""
+    if not ObjectId.is_valid(treatment_id):
+        return error_response("Invalid treatment ID", 400)
+
+    data = request.get_json() or {}
+    if not isinstance(data.get("flagged"), bool):
+        return error_response("'flagged' must be true or false", 400)
+
+    treatment = Treatment.objects(id=treatment_id).first()
+    if not treatment:
+        return error_response("Treatment not found", 404)
+
+    if data["flagged"]:
+        changed = ViolationService.flag(treatment, data.get("reason"))
+    else:
+        changed = ViolationService.unflag(treatment)
+
+    return success_response({
+        "treatment_id": treatment_id,
+        "is_flagged_violation": data["flagged"],
+        "changed": changed
+    }, 200)
+
+
 # -----------------------------------------------------------
 # 6) HEALTH CHECK
 # -----------------------------------------------------------
 @authority_dashboard_bp.route('/health', methods=['GET'])
+@cache_control("no-store")
 def health_check():
-    try:
-        # Test database connection
-        db_status = "connected" if DB is not None else "disconnected"
-        
-        return success_response({
-            "service": "Authority Dashboard API",
-            "status": "healthy",
-            "database": db_status,
-            "timestamp": datetime.utcnow().isoformat(),
-            "version": "1.0.0",
-            "collections": {
-                "farmers": get_collection_count('farmers'),
-                "vets": get_collection_count('vets'),
-                "animals": get_collection_count('animals'),
-                "treatments": get_collection_count('treatments')
-            }
-        }, 200)
-    except Exception as e:
-        print(f"❌ Error in health check: {str(e)}")
-        return success_response({
-            "service": "Authority Dashboard API",
-            "status": "degraded",
-            "error": str(e),
-            "timestamp": datetime.utcnow().isoformat(),
-            "version": "1.0.0"
-        }, 200)
+    # Served from HealthService's rate-limited deep check: estimated
+    # (metadata) counts, never a collection scan per probe
+    result = HealthService.deep()
+    return success_response({
+        "service": "Authority Dashboard API",
+        "status": "healthy" if result["ok"] else "degraded",
+        "database": "connected" if result["ok"] else "disconnected",
+        "timestamp": datetime.utcnow().isoformat(),
+        "checked_at": result["checked_at"],
+        "version": "1.0.0",
+        "collections": result.get("collections"),
+        "pool": result["pool"],
+        "error": result.get("error")
+    }, 200)
 
 
 @authority_dashboard_bp.route('/farmer/<farmer_id>', methods=['GET'])
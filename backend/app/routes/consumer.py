@@ -1,51 +1,50 @@
-from flask import Blueprint
-from datetime import datetime
+from flask import Blueprint, request
 
-from app.models.farmers import Farmer
-from app.models.animals import Animal
-from app.models.treatments import Treatment
+from app.config import Config
+from app.services.safety_service import SafetyService, UNDER_WITHDRAWAL, NOT_FOUND, INVALID
 from app.utils.responses import success_response, error_response
 
 consumer_bp = Blueprint("consumer", __name__)
 
 
+# -----------------------------------------------------
+# BATCH SAFETY CHECK (milk collection centres)
+# body: {"ids": [farmer_id or QR badge token, ...]}
+# -----------------------------------------------------
+@consumer_bp.route('/safety/batch', methods=['POST'])
+def check_safety_batch():
+    data = request.get_json() or {}
+    ids = data.get("ids")
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, str) for i in ids):
+        return error_response("ids must be a non-empty list of farmer IDs or QR tokens", 400)
+    if len(ids) > Config.SAFETY_BATCH_MAX_IDS:
+        return error_response(f"At most {Config.SAFETY_BATCH_MAX_IDS} ids per request", 400)
+
+    results = SafetyService.check_many(ids)
+    unsafe = sum(1 for r in results if r["status"] == UNDER_WITHDRAWAL)
+    return success_response(results, 200, meta={"checked": len(results), "under_withdrawal": unsafe})
+
+
 # -----------------------------------------------------
 # CONSUMER SAFETY CHECK
-# /consumer/safety/<farmer_id>
+# /consumer/safety/<farmer_id or QR badge token>
 # -----------------------------------------------------
 @consumer_bp.route('/safety/<farmer_id>', methods=['GET'])
 def check_safety(farmer_id):
-    # Validate farmer
-    try:
-        farmer = Farmer.objects(id=farmer_id).first()
-    except:
-        return error_response("Invalid Farmer ID", 400)
+    # Scanned badges carry a signed token instead of the raw farmer ID;
+    # answered from the worker's unsafe-farmer map, Mongo only as fallback
+    result = SafetyService.check_many([farmer_id])[0]
 
-    if not farmer:
+    if result["status"] == INVALID:
+        return error_response("Invalid Farmer ID", 400)
+    if result["status"] == NOT_FOUND:
         return error_response("Farmer not found", 404)
 
-    # Get all animals registered under the farmer
-    animals = Animal.objects(farmer=farmer).all()
-
-    if not animals:
-        return success_response({
-            "status": "Safe",
-            "message": "No animals found for this farmer."
-        }, 200)
-
-    now = datetime.utcnow()
-
-    # Find any active withdrawal treatments
-    active_violations = Treatment.objects(
-        animal__in=animals,
-        withdrawal_ends_on__gt=now
-    ).count()
-
-    if active_violations > 0:
+    if result["status"] == UNDER_WITHDRAWAL:
         return success_response({
             "status": "Under Withdrawal",
             "message": "Milk or meat from this farmer is currently NOT SAFE.",
-            "safe_after": "Wait until withdrawal period ends."
+            "safe_after": result["safe_after"]
         }, 200)
 
     return success_response({
@@ -0,0 +1,86 @@
+from flask import Blueprint
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from bson import ObjectId
+
+from app.models.vets import Vet
+from app.services.dispatch_service import DispatchService
+from app.utils.responses import success_response, error_response
+
+dispatch_bp = Blueprint("dispatch", __name__)
+
+
+def _serialize(doc):
+    return {
+        key: (str(value) if isinstance(value, ObjectId) else value)
+        for key, value in doc.items()
+    }
+
+
+def _current_vet():
+    return Vet.objects(id=get_jwt_identity()).first()
+
+
+# ------------------------------------------------------
+# CLAIM NEXT REQUEST (most urgent, then nearest)
+# ------------------------------------------------------
+@dispatch_bp.route('/claim', methods=['POST'])
+@jwt_required()
+def claim_request():
+    vet = _current_vet()
+    if not vet:
+        return error_response("Only vets can claim requests", 403)
+
+    doc, reason = DispatchService.claim(vet)
+    if not doc:
+        return success_response({"request": None, "message": reason}, 200)
+
+    return success_response({"request": _serialize(doc)}, 200)
+
+
+# ------------------------------------------------------
+# RENEW / RELEASE / ACCEPT A CLAIMED REQUEST
+# ------------------------------------------------------
+@dispatch_bp.route('/<request_id>/renew', methods=['POST'])
+@jwt_required()
+def renew_request(request_id):
+    return _lease_action(request_id, DispatchService.renew, "Lease expired or not yours")
+
+
+@dispatch_bp.route('/<request_id>/release', methods=['POST'])
+@jwt_required()
+def release_request(request_id):
+    return _lease_action(request_id, DispatchService.release, "Request is not claimed by you")
+
+
+@dispatch_bp.route('/<request_id>/accept', methods=['POST'])
+@jwt_required()
+def accept_request(request_id):
+    return _lease_action(request_id, DispatchService.accept, "Lease expired or not yours")
+
+
+def _lease_action(request_id, action, conflict_message):
+    vet = _current_vet()
+    if not vet:
+        return error_response("Only vets can manage requests", 403)
+
+    if not ObjectId.is_valid(request_id):
+        return error_response("Invalid request ID", 400)
+
+    doc = action(vet, ObjectId(request_id))
+    if not doc:
+        return error_response(conflict_message, 409)
+
+    return success_response({"request": _serialize(doc)}, 200)
+
+
+# ------------------------------------------------------
+# MY ACTIVE REQUESTS
+# ------------------------------------------------------
+@dispatch_bp.route('/mine', methods=['GET'])
+@jwt_required()
+def my_requests():
+    vet = _current_vet()
+    if not vet:
+        return error_response("Only vets can view requests", 403)
+
+    return success_response([_serialize(d) for d in DispatchService.active_for(vet)], 200)
@@ -0,0 +1,122 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+
+from bson import ObjectId
+from flask import Blueprint, request, Response, stream_with_context
+
+from app.services.register_service import RegisterService, COLUMNS
+from app.utils.deadline import budget
+from app.utils.responses import error_response
+from app.utils.security import authority_required
+
+exports_bp = Blueprint("exports", __name__)
+
+# Bytes gathered before a chunk is sent
+CHUNK_SIZE = 64 * 1024
+
+
+def _value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, list):
+        return "; ".join(value)
+    return value
+
+
+def _csv(rows, header=True):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(COLUMNS)
+    for row in rows:
+        writer.writerow([_value(row[c]) for c in COLUMNS])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ndjson(rows):
+    buffer = []
+    size = 0
+    for row in rows:
+        line = json.dumps(row, default=_value) + "\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    yield "".join(buffer)
+
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _export(name, violations_only):
+    args = request.args
+    fmt = args.get("format", "csv")
+    if fmt not in ("csv", "ndjson"):
+        return error_response("format must be csv or ndjson", 400)
+    try:
+        date_from = datetime.strptime(args["from"], "%Y-%m-%d") if args.get("from") else None
+        date_to = datetime.strptime(args["to"], "%Y-%m-%d") if args.get("to") else None
+    except ValueError:
+        return error_response("from/to must be dates (YYYY-MM-DD)", 400)
+    after = args.get("after")
+    if after and not ObjectId.is_valid(after):
+        return error_response("after must be a treatment _id", 400)
+    limit = args.get("limit", type=int)
+    if limit is not None and limit <= 0:
+        return error_response("limit must be a positive number", 400)
+
+    query = RegisterService.query(
+        violations_only=violations_only, date_from=date_from, date_to=date_to,
+        district=args.get("district"), after=after
+    )
+    rows = RegisterService.rows(query, limit=limit)
+    # A resumed download is appended to the part already received: no second header row
+    chunks = _csv(rows, header=not after) if fmt == "csv" else _ndjson(rows)
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{name}-{datetime.utcnow():%Y%m%d}.{fmt}"',
+        "Cache-Control": "no-store",
+        "X-Accel-Buffering": "no",
+    }
+    if request.accept_encodings["gzip"]:
+        chunks = _gzip(chunks)
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
+
+
+# ------------------------------------------------------
+# TREATMENT REGISTER
+# ?format=csv|ndjson&from=YYYY-MM-DD&to=YYYY-MM-DD&district=&after=<_id>&limit=
+# ------------------------------------------------------
+@exports_bp.route('/treatments', methods=['GET'])
+@budget(None)  # streams for as long as the register takes
+@authority_required
+def export_treatments():
+    return _export("treatments", violations_only=False)
+
+
+# ------------------------------------------------------
+# VIOLATION REGISTER (flagged treatments only)
+# ------------------------------------------------------
+@exports_bp.route('/violations', methods=['GET'])
+@budget(None)
+@authority_required
+def export_violations():
+    return _export("violations", violations_only=True)
@@ -88,7 +88,7 @@ def update_my_profile():
 
     # Allowed fields for update
     allowed_fields = [
-        "name", "age", "gender", "address",
+        "name", "age", "gender", "address", "district",
         "gps_location",
         "after_registration"
     ]
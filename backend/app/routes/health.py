@@ -0,0 +1,53 @@
+from flask import Blueprint
+
+from app.services.health_service import HealthService
+from app.startup import is_ready, warm_up
+from app.utils.deadline import budget
+from app.utils.http_cache import cache_control
+from app.utils.responses import success_response, error_response
+
+health_bp = Blueprint("health", __name__)
+
+
+# ------------------------------------------------------
+# LIVENESS: the process is up and serving requests (no I/O)
+# ------------------------------------------------------
+@health_bp.route('/live', methods=['GET'])
+@cache_control("no-store")
+def live():
+    return success_response({"status": "alive"}, 200)
+
+
+# ------------------------------------------------------
+# READINESS: warmed up and able to reach MongoDB
+# (ping cached for HEALTH_PING_CACHE_SECONDS)
+# ------------------------------------------------------
+@health_bp.route('/ready', methods=['GET'])
+@budget(2)
+@cache_control("no-store")
+def ready():
+    ping = HealthService.ping()
+    if not ping["ok"]:
+        return error_response("Database unreachable", 503)
+
+    # A worker whose warm-up failed (e.g. Mongo was down at boot) retries here
+    if not is_ready() and not warm_up():
+        return error_response("Warming up", 503)
+
+    return success_response({
+        "status": "ready",
+        "database": {"latency_ms": ping["latency_ms"], "checked_at": ping["checked_at"]},
+        "pool": ping["pool"]
+    }, 200)
+
+
+# ------------------------------------------------------
+# DEEP HEALTH: metadata counts, server info, circuit state
+# (recomputed at most every HEALTH_DEEP_CACHE_SECONDS)
+# ------------------------------------------------------
+@health_bp.route('/deep', methods=['GET'])
+@budget(3)
+@cache_control("no-store")
+def deep():
+    result = HealthService.deep()
+    return success_response(dict(result, status="healthy" if result["ok"] else "degraded"), 200 if result["ok"] else 503)
@@ -1,10 +1,13 @@
 from flask import Blueprint, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from bson import ObjectId
 
 from app.models.authorized_medicine import AuthorizedMedicine
+from app.services.medicine_catalog import MedicineCatalog
 from app.models.vets import Vet
 from app.models.farmers import Farmer
 from app.utils.responses import success_response, error_response
+from app.utils.http_cache import cache_control, conditional
 
 medicines_bp = Blueprint("medicines", __name__)
 
@@ -24,30 +27,50 @@ def _is_authority(user_id):
     return True
 
 
+def _catalog_version():
+    try:
+        return f"catalog-{MedicineCatalog.version()}"
+    except Exception as e:
+        print(f"[MEDICINE] ERROR: catalog version check failed → {e}")
+        return None
+
+
 # ======================================================
 # 1️⃣ GET ALL AUTHORIZED MEDICINES
 # (Vet / Farmer / Authority)
 # ======================================================
 @medicines_bp.route('/authorized', methods=['GET'])
 @jwt_required()
+@cache_control("private, max-age=300")
+@conditional(_catalog_version)
 def get_authorized_medicines():
     print("\n[MEDICINE] get_authorized_medicines CALLED")
 
-    medicines = AuthorizedMedicine.objects()
-    print(f"[MEDICINE] medicines found = {medicines.count()}")
+    medicines = MedicineCatalog.all()
+    print(f"[MEDICINE] medicines found = {len(medicines)}")
+
+    return success_response(medicines, 200)
+
+
+# ======================================================
+# 1️⃣b AUTOCOMPLETE AUTHORIZED MEDICINES BY NAME PREFIX
+# /medicines/authorized/search?q=amox&limit=10
+# ======================================================
+@medicines_bp.route('/authorized/search', methods=['GET'])
+@jwt_required()
+@cache_control("private, max-age=300")
+@conditional(_catalog_version)
+def search_authorized_medicines():
+    prefix = request.args.get("q", "")
+    try:
+        limit = min(int(request.args.get("limit", 10)), 50)
+    except ValueError:
+        return error_response("limit must be a number", 400)
 
-    return success_response([
-        {
-            "_id": str(m.id),
-            "name": m.name,
-            "dosage": m.dosage,
-            "route": m.route,
-            "frequency": m.frequency,
-            "duration_days": m.duration_days,
-            "withdrawal_period_days": m.withdrawal_period_days
-        }
-        for m in medicines
-    ], 200)
+    if not prefix.strip():
+        return success_response([], 200)
+
+    return success_response(MedicineCatalog.autocomplete(prefix, limit), 200)
 
 
 # # ======================================================
@@ -105,8 +128,10 @@ def create_authorized_medicine():
         route=data.get("route"),
         frequency=data.get("frequency"),
         duration_days=data.get("duration_days", 1),
-        withdrawal_period_days=data["withdrawal_period_days"]
+        withdrawal_period_days=data["withdrawal_period_days"],
+        antimicrobial_class=data.get("antimicrobial_class")
     ).save()
+    MedicineCatalog.bump_version()
 
     print(f"[MEDICINE] Authorized medicine created: {medicine.name}")
 
@@ -140,7 +165,8 @@ def update_authorized_medicine(medicine_id):
         "route",
         "frequency",
         "duration_days",
-        "withdrawal_period_days"
+        "withdrawal_period_days",
+        "antimicrobial_class"
     ]
 
     for field in allowed_fields:
@@ -148,6 +174,7 @@ def update_authorized_medicine(medicine_id):
             setattr(medicine, field, data[field])
 
     medicine.save()
+    MedicineCatalog.bump_version()
     print(f"[MEDICINE] Medicine updated: {medicine.name}")
 
     return success_response({
@@ -174,6 +201,7 @@ def delete_authorized_medicine(medicine_id):
         return error_response("Medicine not found", 404)
 
     medicine.delete()
+    MedicineCatalog.bump_version()
     print("[MEDICINE] Medicine deleted successfully")
 
     return success_response({
@@ -186,25 +214,14 @@ def get_authorized_medicine(medicine_id):
     print(f"\n[MEDICINE] get_authorized_medicine CALLED")
     print(f"[MEDICINE] medicine_id = {medicine_id}")
 
-    try:
-        medicine = AuthorizedMedicine.objects(id=medicine_id).first()
-    except Exception as e:
-        print(f"[MEDICINE] ERROR: Invalid medicine ID → {e}")
+    if not ObjectId.is_valid(medicine_id):
+        print(f"[MEDICINE] ERROR: Invalid medicine ID → {medicine_id}")
         return error_response("Invalid medicine ID", 400)
 
+    medicine = MedicineCatalog.get(medicine_id)
     if not medicine:
         print("[MEDICINE] ERROR: Medicine not found")
         return error_response("Medicine not found", 404)
 
-    response = {
-        "_id": str(medicine.id),
-        "name": medicine.name,
-        "dosage": medicine.dosage,
-        "route": medicine.route,
-        "frequency": medicine.frequency,
-        "duration_days": medicine.duration_days,
-        "withdrawal_period_days": medicine.withdrawal_period_days
-    }
-
-    print(f"[MEDICINE] Medicine fetched successfully: {medicine.name}")
-    return success_response(response, 200)
+    print(f"[MEDICINE] Medicine fetched successfully: {medicine['name']}")
+    return success_response(medicine, 200)
@@ -0,0 +1,122 @@
+import io
+import re
+import zipfile
+from datetime import datetime
+
+from bson import ObjectId
+from flask import Blueprint, request, Response
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from app.config import Config
+from app.db import DB
+from app.models.authorities import Authority
+from app.services.qr_service import QRService, FORMATS
+from app.utils.deadline import budget
+from app.utils.http_cache import cache_control
+from app.utils.responses import error_response
+from app.utils.security import authority_required
+
+qr_bp = Blueprint("qr", __name__)
+
+# Badge images never change for a given farmer/animal, so clients may keep them
+IMAGE_CACHE_CONTROL = "private, max-age=604800"
+
+
+def _can_view(farmer_id):
+    identity = get_jwt_identity()
+    return identity == str(farmer_id) or Authority.objects(id=identity).first() is not None
+
+
+def _image(farmer_id, animal_id, fmt):
+    if fmt not in FORMATS:
+        return error_response("Format must be svg or png", 400)
+    try:
+        content, digest = QRService.image(QRService.url(QRService.token(farmer_id, animal_id)), fmt)
+    except RuntimeError as e:
+        return error_response(str(e), 503)
+
+    response = Response(content, mimetype=FORMATS[fmt])
+    # The content hash is a strong validator; the app middleware answers 304 on a match
+    response.set_etag(digest)
+    return response
+
+
+# ------------------------------------------------------
+# FARMER BADGE  /qr/farmer/<farmer_id>.svg|png
+# ------------------------------------------------------
+@qr_bp.route('/farmer/<farmer_id>.<fmt>', methods=['GET'])
+@jwt_required()
+@cache_control(IMAGE_CACHE_CONTROL)
+def farmer_qr(farmer_id, fmt):
+    if not ObjectId.is_valid(farmer_id):
+        return error_response("Invalid Farmer ID", 400)
+    if not _can_view(farmer_id):
+        return error_response("Unauthorized", 403)
+    if not DB.farmers.find_one({"_id": ObjectId(farmer_id)}, {"_id": 1}):
+        return error_response("Farmer not found", 404)
+    return _image(farmer_id, None, fmt)
+
+
+# ------------------------------------------------------
+# ANIMAL BADGE  /qr/animal/<animal_id>.svg|png
+# ------------------------------------------------------
+@qr_bp.route('/animal/<animal_id>.<fmt>', methods=['GET'])
+@jwt_required()
+@cache_control(IMAGE_CACHE_CONTROL)
+def animal_qr(animal_id, fmt):
+    if not ObjectId.is_valid(animal_id):
+        return error_response("Invalid Animal ID", 400)
+    animal = DB.animals.find_one({"_id": ObjectId(animal_id)}, {"farmer": 1})
+    if not animal:
+        return error_response("Animal not found", 404)
+    if not _can_view(animal["farmer"]):
+        return error_response("Unauthorized", 403)
+    return _image(animal["farmer"], animal_id, fmt)
+
+
+# ------------------------------------------------------
+# PRINTABLE SHEETS (zip of A4 SVG pages)
+# body: {"farmer_ids": [...]} or {"district": "..."}
+# ------------------------------------------------------
+@qr_bp.route('/sheets', methods=['POST'])
+@budget(None)
+@authority_required
+def badge_sheets():
+    data = request.get_json() or {}
+    query = {}
+    if data.get("farmer_ids"):
+        ids = data["farmer_ids"]
+        if not isinstance(ids, list) or not all(ObjectId.is_valid(i) for i in ids):
+            return error_response("farmer_ids must be a list of farmer IDs", 400)
+        query["_id"] = {"$in": [ObjectId(i) for i in ids]}
+    elif data.get("district"):
+        query["district"] = {"$regex": f"^\\s*{re.escape(data['district'].strip())}\\s*$", "$options": "i"}
+    else:
+        return error_response("Provide farmer_ids or district", 400)
+
+    farmers = list(
+        DB.farmers.find(query, {"name": 1, "district": 1})
+        .sort("name", 1)
+        .limit(Config.QR_SHEET_MAX_BADGES + 1)
+    )
+    if not farmers:
+        return error_response("No farmers matched", 404)
+    if len(farmers) > Config.QR_SHEET_MAX_BADGES:
+        return error_response(
+            f"At most {Config.QR_SHEET_MAX_BADGES} badges per request; use `flask qr-sheets` for more", 400
+        )
+
+    try:
+        pages = QRService.sheets(QRService.badges(farmers))
+    except RuntimeError as e:
+        return error_response(str(e), 503)
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for number, page in enumerate(pages, start=1):
+            archive.writestr(f"badges-{number:03d}.svg", page)
+
+    return Response(buffer.getvalue(), mimetype="application/zip", headers={
+        "Content-Disposition": f'attachment; filename="badges-{datetime.utcnow():%Y%m%d}.zip"',
+        "Cache-Control": "no-store",
+    })
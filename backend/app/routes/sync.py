@@ -0,0 +1,57 @@
+from flask import Blueprint, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from app.config import Config
+from app.services.sync_service import SyncService
+from app.utils.http_cache import cache_control
+from app.utils.deadline import budget
+from app.utils.responses import success_response, error_response
+
+sync_bp = Blueprint("sync", __name__)
+
+
+# ------------------------------------------------------
+# PULL CHANGES SINCE LAST SYNC
+# /sync/pull?token=<sync_token>  (no token → full sync)
+# ------------------------------------------------------
+@sync_bp.route('/pull', methods=['GET'])
+@budget(Config.SYNC_BUDGET_SECONDS)
+@jwt_required()
+@cache_control("private, no-store")
+def pull_changes():
+    user_id = get_jwt_identity()
+
+    role, user = SyncService.resolve_user(user_id)
+    if not user:
+        return error_response("Only farmers and vets can sync", 403)
+
+    since = SyncService.read_token(request.args.get("token"), user.id)
+
+    return success_response(SyncService.pull(role, user, since), 200)
+
+
+# ------------------------------------------------------
+# PUSH OFFLINE MUTATIONS
+# body: {"mutations": [{client_id, collection, op, id, base_updated_at, data}]}
+# ------------------------------------------------------
+@sync_bp.route('/push', methods=['POST'])
+@budget(Config.SYNC_BUDGET_SECONDS)
+@jwt_required()
+def push_changes():
+    user_id = get_jwt_identity()
+    data = request.get_json() or {}
+
+    role, user = SyncService.resolve_user(user_id)
+    if not user:
+        return error_response("Only farmers and vets can sync", 403)
+
+    mutations = data.get("mutations")
+    if not isinstance(mutations, list):
+        return error_response("mutations must be a list", 400)
+
+    if len(mutations) > Config.SYNC_MAX_MUTATIONS:
+        return error_response(f"At most {Config.SYNC_MAX_MUTATIONS} mutations per batch", 413)
+
+    results = SyncService.push(role, user, mutations)
+
+    return success_response({"results": results}, 200)
@@ -1,13 +1,19 @@
 from flask import Blueprint, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
+from mongoengine import ValidationError
 from mongoengine.queryset.visitor import Q
+from bson import ObjectId
 
 from app.utils.responses import success_response, error_response
 from app.models.treatments import Treatment, MedicineDetail
 from app.models.farmers import Farmer
 from app.models.vets import Vet
 from app.models.animals import Animal
+from app.services.medicine_catalog import MedicineCatalog
+from app.services.dispatch_service import DispatchService
+from app.services.rollup_service import RollupService
+from app.services.unsafe_farmers import UnsafeFarmers
 
 treatments_bp = Blueprint("treatments", __name__)
 
@@ -46,6 +52,14 @@ def create_treatment_request():
     animal.treatment_ids.append(str(treatment.id))
     animal.save()
 
+    RollupService.record(None, RollupService.snapshot(treatment))
+
+    # Put it on the vets' dispatch queue
+    try:
+        DispatchService.enqueue(treatment, urgency=data.get("urgency"))
+    except Exception as e:
+        print(f"❌ Error enqueueing treatment {treatment.id} for dispatch: {str(e)}")
+
     return success_response(treatment.to_json(), 201)
 
 
@@ -98,24 +112,62 @@ def diagnose_treatment(treatment_id):
     if treatment.status != "pending":
         return error_response("Already diagnosed", 400)
 
+    before = RollupService.snapshot(treatment)
+
     medicines = data.get("medicines")
     if not medicines or not isinstance(medicines, list):
         return error_response("Invalid medicine list", 400)
 
-    entries = []
     for m in medicines:
-        if not m.get("name") or not m.get("dosage") or not m.get("withdrawal_period_days"):
+        if not isinstance(m, dict) or not (m.get("medicine_id") or m.get("name")):
             return error_response("Incomplete medicine entry", 400)
-
-        med = MedicineDetail(
-            name=m["name"],
-            dosage=m["dosage"],
+        days = m.get("withdrawal_period_days")
+        # bool is an int subclass; true/false are not a number of days
+        if days is not None and (isinstance(days, bool) or not isinstance(days, int)):
+            return error_response("withdrawal_period_days must be a whole number of days", 400)
+
+    # One in-memory pass over the cached catalog for the whole prescription
+    resolved = MedicineCatalog.resolve_many(medicines)
+
+    unmatched = [
+        f"{m.get('name') or m.get('medicine_id')}" + (f" (did you mean {', '.join(suggestions)}?)" if suggestions else "")
+        for m, (match, suggestions) in zip(medicines, resolved) if match is None
+    ]
+    if unmatched:
+        return error_response(f"Medicines not in the authorized catalog: {'; '.join(unmatched)}", 400)
+
+    for m, (match, _) in zip(medicines, resolved):
+        requested = m.get("withdrawal_period_days")
+        if requested is not None and requested < match["withdrawal_period_days"]:
+            return error_response(
+                f"Withdrawal period for {match['name']} cannot be shorter than "
+                f"the authorized {match['withdrawal_period_days']} days", 400
+            )
+
+    entries = [
+        MedicineDetail(
+            authorized_medicine=ObjectId(match["_id"]),
+            name=match["name"],
+            prescribed_name=m.get("name"),
+            dosage=m.get("dosage") or match["dosage"],
             route=m.get("route"),
-            frequency=m.get("frequency"),
-            duration_days=m.get("duration_days", 1),
-            withdrawal_period_days=m["withdrawal_period_days"]
-        ).save()
-        entries.append(med)
+            frequency=m.get("frequency") or match["frequency"],
+            duration_days=m.get("duration_days") or match["duration_days"] or 1,
+            withdrawal_period_days=(
+                m["withdrawal_period_days"] if m.get("withdrawal_period_days") is not None
+                else match["withdrawal_period_days"]
+            )
+        )
+        for m, (match, _) in zip(medicines, resolved)
+    ]
+    # insert() skips validation; check every entry first so nothing is written for a bad prescription
+    try:
+        for entry in entries:
+            entry.validate()
+    except ValidationError as e:
+        problems = "; ".join(f"{field}: {message}" for field, message in e.to_dict().items())
+        return error_response(f"Invalid medicine entry ({problems})", 400)
+    entries = MedicineDetail.objects.insert(entries)
 
     treatment.vet = vet
     treatment.medicines = entries
@@ -124,6 +176,11 @@ def diagnose_treatment(treatment_id):
     treatment.treatment_start_date = datetime.utcnow()
     treatment.save()
 
+    RollupService.record(before, RollupService.snapshot(treatment))
+    # Whoever diagnosed it, the dispatch request is done: out of the queue and the vet's active count
+    DispatchService.complete(treatment.id, vet)
+    UnsafeFarmers.record(treatment.farmer.id, treatment.animal.id, treatment.withdrawal_ends_on)
+
     return success_response(treatment.to_json(), 200)
 
 
@@ -3,6 +3,8 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 
 from app.services.storage_service import StorageService
 from app.utils.responses import success_response, error_response
+from app.config import Config
+from app.utils.deadline import budget
 
 upload_bp = Blueprint("upload", __name__)
 storage = StorageService()
@@ -27,6 +29,7 @@ def validate_file(uploaded_file):
 # Upload Farmer files
 # -----------------------------------------------------------
 @upload_bp.route('/farmer', methods=['POST'])
+@budget(Config.UPLOAD_BUDGET_SECONDS)
 @jwt_required()
 def upload_farmer_file():
     file = request.files.get("file")
@@ -52,6 +55,7 @@ def upload_farmer_file():
 # Upload Vet files
 # -----------------------------------------------------------
 @upload_bp.route('/vet', methods=['POST'])
+@budget(Config.UPLOAD_BUDGET_SECONDS)
 @jwt_required()
 def upload_vet_file():
     file = request.files.get("file")
@@ -77,6 +81,7 @@ def upload_vet_file():
 # Upload Animal files
 # -----------------------------------------------------------
 @upload_bp.route('/animal/<animal_id>', methods=['POST'])
+@budget(Config.UPLOAD_BUDGET_SECONDS)
 @jwt_required()
 def upload_animal_file(animal_id):
     file = request.files.get("file")
@@ -100,6 +105,7 @@ def upload_animal_file(animal_id):
 # Upload Treatment files (reports, prescriptions)
 # -----------------------------------------------------------
 @upload_bp.route('/treatment/<treatment_id>', methods=['POST'])
+@budget(Config.UPLOAD_BUDGET_SECONDS)
 @jwt_required()
 def upload_treatment_file(treatment_id):
     file = request.files.get("file")
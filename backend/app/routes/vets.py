@@ -0,0 +1,47 @@
+from flask import Blueprint, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from app.models.farmers import Farmer
+from app.services.geo_service import GeoService
+from app.utils.geo import point_from_gps
+from app.utils.responses import success_response, error_response
+
+vets_bp = Blueprint("vets", __name__)
+
+MAX_RADIUS_KM = 200
+MAX_RESULTS = 50
+
+
+# ------------------------------------------------------
+# NEAREST VERIFIED VETS
+# /vets/nearby?lat=..&lng=..&radius_km=25&limit=10
+# (lat/lng default to the logged-in farmer's location)
+# ------------------------------------------------------
+@vets_bp.route('/nearby', methods=['GET'])
+@jwt_required()
+def nearby_vets():
+    try:
+        radius_km = min(float(request.args.get("radius_km", 25)), MAX_RADIUS_KM)
+        limit = min(int(request.args.get("limit", 10)), MAX_RESULTS)
+    except ValueError:
+        return error_response("radius_km and limit must be numbers", 400)
+    # Mongo rejects a non-positive maxDistance or $limit
+    if not radius_km > 0 or limit < 1:
+        return error_response("radius_km must be above 0 and limit at least 1", 400)
+
+    if "lat" in request.args or "lng" in request.args:
+        try:
+            coordinates = point_from_gps({"lat": request.args.get("lat"), "lng": request.args.get("lng")})
+        except (TypeError, ValueError):
+            coordinates = None
+        if not coordinates:
+            return error_response("Invalid lat/lng", 400)
+    else:
+        farmer = Farmer.objects(id=get_jwt_identity()).first()
+        coordinates = point_from_gps(farmer.gps_location) if farmer else None
+        if not coordinates:
+            return error_response("lat and lng are required", 400)
+
+    vets = GeoService.nearby_vets(coordinates, radius_km=radius_km, limit=limit)
+
+    return success_response(vets, 200)
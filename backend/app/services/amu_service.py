@@ -0,0 +1,258 @@
+import re
+from calendar import monthrange
+from datetime import datetime
+
+import numpy as np
+
+from app.db import DB
+from app.models.amu_metrics import AmuMetric
+from app.services.job_state import JobState
+from app.services.medicine_catalog import MedicineCatalog
+from app.services.rollup_service import UNKNOWN
+
+JOB = "amu_metrics"
+ALL_CLASSES = "*"
+
+# Live weight (kg) assumed for an animal with no recorded weight
+STANDARD_WEIGHT_KG = {"cow": 350, "buffalo": 400, "goat": 30, "sheep": 35, "poultry": 1.5}
+
+MG_PER_UNIT = {"mg": 1.0, "g": 1000.0, "mcg": 0.001, "ug": 0.001, "µg": 0.001}
+
+DOSE_PATTERN = re.compile(
+    r"(\d+(?:\.\d+)?)\s*(mg|g|mcg|ug|µg)\b\s*(/\s*kg)?", re.IGNORECASE
+)
+EVERY_HOURS_PATTERN = re.compile(r"every\s+(\d+)\s*h", re.IGNORECASE)
+DOSES_PER_DAY = (
+    (("qid", "four times"), 4),
+    (("tid", "thrice", "three times"), 3),
+    (("bid", "bd", "twice"), 2),
+    (("alternate",), 0.5),
+)
+
+TREATMENT_FIELDS = {"farmer": 1, "animal": 1, "medicines": 1, "treatment_start_date": 1}
+MEDICINE_FIELDS = {"name": 1, "authorized_medicine": 1, "dosage": 1, "frequency": 1, "duration_days": 1}
+
+
+def parse_dose(dosage):
+    """(mg, per_kg) for a dosage such as "10 mg/kg" or "1.5 g"; None when not in mass units"""
+    match = DOSE_PATTERN.search(dosage or "")
+    if not match:
+        return None
+    amount, unit, per_kg = match.groups()
+    return float(amount) * MG_PER_UNIT[unit.lower()], bool(per_kg)
+
+
+def doses_per_day(frequency):
+    text = (frequency or "").lower()
+    match = EVERY_HOURS_PATTERN.search(text)
+    if match and int(match.group(1)) > 0:
+        return 24 / int(match.group(1))
+    for words, doses in DOSES_PER_DAY:
+        if any(re.search(rf"\b{word}\b", text) for word in words):
+            return doses
+    return 1
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1)
+
+
+class AmuService:
+    """
+    Antimicrobial usage (AMU) indicators, materialized monthly per
+    district, species and antimicrobial class into `amu_metrics`:
+
+    - mg of active substance: dose × (weight, for per-kg doses) ×
+      doses per day × duration, over medicines whose catalog entry has an
+      antimicrobial_class
+    - mg/PCU: mg per kg of live weight of the district's active animals
+      of that species (the population correction unit)
+    - treatment days per 1000 animal-days: each treated animal counts the
+      longest duration among its antimicrobials in the group
+
+    Treatments are read in chunks; each chunk is laid out as columns and
+    reduced with NumPy. The population is the current herd, not a
+    historical one.
+    """
+
+    # -----------------------------------------------------
+    # Computation
+    # -----------------------------------------------------
+    @staticmethod
+    def compute(since, until=None, chunk_size=5000):
+        """Recompute every month from `since` up to (not including) `until`"""
+        since = month_start(since)
+        until = month_start(until) if until else None
+        started = datetime.utcnow()
+
+        query = {"treatment_start_date": {"$gte": since}, "medicines.0": {"$exists": True}}
+        if until:
+            query["treatment_start_date"]["$lt"] = until
+
+        totals, animals_treated = {}, {}
+        scanned, chunk = 0, []
+        for doc in DB.treatments.find(query, TREATMENT_FIELDS).batch_size(chunk_size):
+            chunk.append(doc)
+            if len(chunk) >= chunk_size:
+                AmuService._accumulate(chunk, totals, animals_treated)
+                scanned += len(chunk)
+                chunk = []
+        if chunk:
+            AmuService._accumulate(chunk, totals, animals_treated)
+            scanned += len(chunk)
+
+        docs = AmuService._metrics(totals, animals_treated, AmuService.population(), started)
+
+        collection = AmuMetric._get_collection()
+        period_range = {"$gte": since, **({"$lt": until} if until else {})}
+        collection.delete_many({"period": period_range})
+        for start in range(0, len(docs), chunk_size):
+            collection.insert_many(docs[start:start + chunk_size], ordered=False)
+
+        summary = {"treatments": scanned, "documents": len(docs)}
+        JobState.save(JOB, last_run=dict(summary, since=since, until=until, started_at=started))
+        print(f"[AMU] {len(docs)} metric documents from {scanned} treatments")
+        return summary
+
+    @staticmethod
+    def _accumulate(chunk, totals, animals_treated):
+        farmer_ids = list({d.get("farmer") for d in chunk})
+        animal_ids = list({d.get("animal") for d in chunk})
+        medicine_ids = list({m for d in chunk for m in d.get("medicines") or []})
+
+        districts = {f["_id"]: f.get("district") for f in DB.farmers.find({"_id": {"$in": farmer_ids}}, {"district": 1})}
+        animals = {a["_id"]: a for a in DB.animals.find({"_id": {"$in": animal_ids}}, {"species": 1, "weight": 1})}
+        medicines = {m["_id"]: m for m in DB.db.medicines.find({"_id": {"$in": medicine_ids}}, MEDICINE_FIELDS)}
+
+        # Columnar extract: one row per (antimicrobial prescription, class bucket)
+        groups, group_of = [], {}
+        rows = {"group": [], "treatment": [], "dose": [], "per_kg": [], "weight": [], "doses": [], "duration": []}
+        for t, doc in enumerate(chunk):
+            animal = animals.get(doc.get("animal"), {})
+            species = animal.get("species") or UNKNOWN
+            weight = animal.get("weight") or STANDARD_WEIGHT_KG.get(species, 0)
+            district = (districts.get(doc.get("farmer")) or "").strip().title() or UNKNOWN
+            period = month_start(doc["treatment_start_date"])
+
+            for medicine_id in doc.get("medicines") or []:
+                medicine = medicines.get(medicine_id)
+                entry = MedicineCatalog.for_prescription(medicine) if medicine else None
+                if not entry or not entry.get("antimicrobial_class"):
+                    continue
+                dose = parse_dose(medicine.get("dosage"))
+                for klass in (entry["antimicrobial_class"], ALL_CLASSES):
+                    key = (period, district, species, klass)
+                    if key not in group_of:
+                        group_of[key] = len(groups)
+                        groups.append(key)
+                    rows["group"].append(group_of[key])
+                    rows["treatment"].append(t)
+                    rows["dose"].append(dose[0] if dose else np.nan)
+                    rows["per_kg"].append(dose[1] if dose else False)
+                    rows["weight"].append(weight)
+                    rows["doses"].append(doses_per_day(medicine.get("frequency")))
+                    rows["duration"].append(medicine.get("duration_days") or 1)
+                    animals_treated.setdefault(key, set()).add(doc.get("animal"))
+
+        if not groups:
+            return
+
+        columns = AmuService.reduce(rows, len(groups), len(chunk))
+        for g, key in enumerate(groups):
+            entry = totals.setdefault(key, dict.fromkeys(("mg", "unquantified", "treatments", "treatment_days"), 0))
+            for name, values in columns.items():
+                entry[name] += values[g].item()
+
+    @staticmethod
+    def reduce(rows, group_count, treatment_count):
+        """Per-group sums over the columnar rows of one chunk"""
+        group = np.asarray(rows["group"], dtype=np.int64)
+        treatment = np.asarray(rows["treatment"], dtype=np.int64)
+        dose = np.asarray(rows["dose"], dtype=np.float64)
+        per_kg = np.asarray(rows["per_kg"], dtype=bool)
+        weight = np.asarray(rows["weight"], dtype=np.float64)
+        doses = np.asarray(rows["doses"], dtype=np.float64)
+        duration = np.asarray(rows["duration"], dtype=np.float64)
+
+        mg = dose * np.where(per_kg, weight, 1.0) * doses * duration
+        quantified = ~np.isnan(mg)
+
+        # A treatment counts once per group, for its longest course
+        pair, pair_index = np.unique(group * treatment_count + treatment, return_inverse=True)
+        longest = np.zeros(len(pair))
+        np.maximum.at(longest, pair_index, duration)
+        pair_group = pair // treatment_count
+
+        return {
+            "mg": np.bincount(group, weights=np.where(quantified, mg, 0), minlength=group_count),
+            "unquantified": np.bincount(group[~quantified], minlength=group_count),
+            "treatments": np.bincount(pair_group, minlength=group_count),
+            "treatment_days": np.bincount(pair_group, weights=longest, minlength=group_count),
+        }
+
+    @staticmethod
+    def population():
+        """{(district, species): (active animals, live weight kg)}"""
+        herds = DB.animals.aggregate([
+            {"$match": {"is_active": True}},
+            {"$group": {
+                "_id": {"farmer": "$farmer", "species": "$species"},
+                "animals": {"$sum": 1},
+                "weighed": {"$sum": {"$cond": [{"$gt": ["$weight", 0]}, 1, 0]}},
+                "weight": {"$sum": {"$cond": [{"$gt": ["$weight", 0]}, "$weight", 0]}}
+            }}
+        ])
+        herds = list(herds)
+        farmer_ids = list({h["_id"]["farmer"] for h in herds})
+        districts = {f["_id"]: f.get("district") for f in DB.farmers.find({"_id": {"$in": farmer_ids}}, {"district": 1})}
+
+        population = {}
+        for herd in herds:
+            species = herd["_id"].get("species") or UNKNOWN
+            district = (districts.get(herd["_id"]["farmer"]) or "").strip().title() or UNKNOWN
+            unweighed = herd["animals"] - herd["weighed"]
+            count, weight = population.get((district, species), (0, 0.0))
+            population[(district, species)] = (
+                count + herd["animals"],
+                weight + herd["weight"] + unweighed * STANDARD_WEIGHT_KG.get(species, 0)
+            )
+        return population
+
+    @staticmethod
+    def _metrics(totals, animals_treated, population, computed_at):
+        docs = []
+        for key, entry in totals.items():
+            period, district, species, klass = key
+            animals, pcu = population.get((district, species), (0, 0.0))
+            animal_days = animals * monthrange(period.year, period.month)[1]
+            docs.append({
+                "period": period, "district": district, "species": species, "antimicrobial_class": klass,
+                "mg": round(entry["mg"], 3),
+                "pcu_kg": pcu,
+                "mg_per_pcu": round(entry["mg"] / pcu, 4) if pcu else None,
+                "treatments": int(entry["treatments"]),
+                "animals_treated": len(animals_treated.get(key, ())),
+                "treatment_days": int(entry["treatment_days"]),
+                "animal_days": animal_days,
+                "treatment_days_per_1000": round(entry["treatment_days"] * 1000 / animal_days, 3) if animal_days else None,
+                "unquantified_doses": int(entry["unquantified"]),
+                "computed_at": computed_at
+            })
+        return docs
+
+    # -----------------------------------------------------
+    # Reads
+    # -----------------------------------------------------
+    @staticmethod
+    def metrics(since, district=None, species=None, antimicrobial_class=ALL_CLASSES, max_time_ms=None):
+        query = {"period": {"$gte": month_start(since)}, "antimicrobial_class": antimicrobial_class}
+        if district:
+            query["district"] = district.strip().title()
+        if species:
+            query["species"] = species
+        cursor = AmuMetric._get_collection().find(query, {"_id": 0, "computed_at": 0}).sort(
+            [("period", 1), ("district", 1), ("species", 1)]
+        )
+        if max_time_ms:
+            cursor = cursor.max_time_ms(max_time_ms)
+        return list(cursor)
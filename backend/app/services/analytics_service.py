@@ -0,0 +1,231 @@
+import os
+import shutil
+from datetime import datetime, timedelta
+
+from app.config import Config
+from app.db import DB
+from app.services.export_service import ExportService, schemas
+
+try:
+    import duckdb
+    import pyarrow as pa
+except ImportError:  # optional; the analytics API answers 503 without them
+    duckdb = pa = None
+
+# Re-read this far before the watermark, for writes in flight during the last refresh
+WATERMARK_OVERLAP = timedelta(seconds=60)
+
+# Whitelisted SQL per fact table. Names come from the request; only the
+# expressions below ever reach the query text.
+_TIME_DIMENSIONS = {
+    "year": "strftime(treatment_start_date, '%Y')",
+    "month": "strftime(treatment_start_date, '%Y-%m')",
+    "district": "district",
+    "species": "species",
+}
+FACTS = {
+    "treatments": {
+        "dimensions": dict(_TIME_DIMENSIONS, **{
+            "status": "status",
+            "vet": "vet_id",
+            "flagged": "is_flagged_violation",
+        }),
+        "measures": {
+            "treatments": "count(*)",
+            "violations": "count(*) FILTER (WHERE is_flagged_violation)",
+            "violation_rate": "round(avg(CASE WHEN is_flagged_violation THEN 1.0 ELSE 0.0 END), 4)",
+            "farms": "count(DISTINCT farmer_id)",
+            "animals": "count(DISTINCT animal_id)",
+            "avg_medicines": "round(avg(medicine_count), 2)",
+        },
+    },
+    "prescriptions": {
+        "dimensions": dict(_TIME_DIMENSIONS, **{
+            "medicine": "name",
+            "antimicrobial_class": "antimicrobial_class",
+            "route": "route",
+        }),
+        "measures": {
+            "prescriptions": "count(*)",
+            "treatments": "count(DISTINCT treatment_id)",
+            "avg_withdrawal_days": "round(avg(withdrawal_period_days), 2)",
+            "avg_duration_days": "round(avg(duration_days), 2)",
+        },
+    },
+}
+MAX_ROWS = 10000
+
+
+class AnalyticsError(ValueError):
+    """A query asked for something outside the whitelist"""
+
+
+class AnalyticsUnavailable(Exception):
+    """DuckDB is not installed or the store has not been built yet"""
+
+
+class AnalyticsService:
+    """
+    Embedded DuckDB copy of treatments and prescriptions for ad-hoc
+    group-bys, so analytical queries never reach the operational primary.
+
+    refresh() (`flask refresh-analytics`) upserts what changed in Mongo
+    since the last refresh into a copy of the store file and atomically
+    swaps it in. Web workers open the file read-only per query, so they
+    pick up a refresh on their next query and never hold a write lock.
+
+    Rows are only ever replaced, never removed: treatments are not deleted
+    in Mongo (the app has no delete path for them). A treatment removed by
+    hand stays in the store until a `--full` refresh rebuilds it.
+    """
+
+    # -----------------------------------------------------
+    # Refresh
+    # -----------------------------------------------------
+    @staticmethod
+    def refresh(full=False, batch_size=10000):
+        if duckdb is None or pa is None:
+            raise AnalyticsUnavailable("The analytics store needs duckdb and pyarrow")
+
+        path = Config.ANALYTICS_DB_PATH
+        building = f"{path}.building"
+        if os.path.exists(building):
+            os.remove(building)
+        if os.path.exists(path) and not full:
+            shutil.copyfile(path, building)
+
+        started = datetime.utcnow()
+        tables = schemas()
+        con = duckdb.connect(building)
+        try:
+            con.execute("CREATE TABLE IF NOT EXISTS refresh_state (refreshed_at TIMESTAMP, watermark TIMESTAMP)")
+            # Both fact tables exist even when no treatment has been loaded yet
+            for name in ("treatments", "prescriptions"):
+                con.register("empty", tables[name].empty_table())
+                con.execute(f"CREATE TABLE IF NOT EXISTS {name} AS SELECT * FROM empty")
+                con.unregister("empty")
+            row = con.execute("SELECT max(watermark) FROM refresh_state").fetchone()
+            watermark = row[0] if row else None
+
+            query = {"updated_at": {"$gte": watermark - WATERMARK_OVERLAP}} if watermark else {}
+            batch = _Rows()
+            loaded = 0
+            for doc in DB.treatments.find(query).batch_size(batch_size):
+                batch.chunk.append(doc)
+                if len(batch.chunk) >= batch_size:
+                    loaded += AnalyticsService._load(con, batch, tables)
+            loaded += AnalyticsService._load(con, batch, tables)
+
+            con.execute("INSERT INTO refresh_state VALUES (?, ?)", [datetime.utcnow(), started])
+            con.execute("CHECKPOINT")
+        finally:
+            con.close()
+
+        os.replace(building, path)
+        print(f"[ANALYTICS] {'full' if full or not watermark else 'incremental'} refresh: {loaded} treatments → {path}")
+        return {"treatments": loaded, "full": full or not watermark}
+
+    @staticmethod
+    def _load(con, batch, tables):
+        if not batch.chunk:
+            return 0
+        ExportService._treatment_rows(batch.chunk, batch.treatments, batch.prescriptions)
+
+        treatments = pa.Table.from_pylist(batch.treatments.rows, schema=tables["treatments"])
+        prescriptions = pa.Table.from_pylist(batch.prescriptions.rows, schema=tables["prescriptions"])
+        con.register("new_treatments", treatments)
+        con.register("new_prescriptions", prescriptions)
+        try:
+            # A changed treatment replaces its row and all its prescriptions
+            con.execute("DELETE FROM treatments WHERE _id IN (SELECT _id FROM new_treatments)")
+            con.execute("DELETE FROM prescriptions WHERE treatment_id IN (SELECT _id FROM new_treatments)")
+            con.execute("INSERT INTO treatments SELECT * FROM new_treatments")
+            con.execute("INSERT INTO prescriptions SELECT * FROM new_prescriptions")
+        finally:
+            con.unregister("new_treatments")
+            con.unregister("new_prescriptions")
+
+        count = len(batch.chunk)
+        batch.reset()
+        return count
+
+    # -----------------------------------------------------
+    # Queries
+    # -----------------------------------------------------
+    @staticmethod
+    def build_query(fact, dimensions, measures, filters=None, date_from=None, date_to=None, limit=1000):
+        """(sql, params) for a whitelisted group-by; raises AnalyticsError"""
+        spec = FACTS.get(fact)
+        if spec is None:
+            raise AnalyticsError(f"Unknown fact '{fact}'; use one of: {', '.join(FACTS)}")
+        unknown = [d for d in dimensions if d not in spec["dimensions"]]
+        unknown += [m for m in measures if m not in spec["measures"]]
+        unknown += [f for f in (filters or {}) if f not in spec["dimensions"]]
+        if unknown:
+            raise AnalyticsError(f"Not available for {fact}: {', '.join(unknown)}")
+        if not measures:
+            raise AnalyticsError("At least one measure is required")
+        if not 1 <= limit <= MAX_ROWS:
+            raise AnalyticsError(f"limit must be between 1 and {MAX_ROWS}")
+
+        select = [f"{spec['dimensions'][d]} AS {d}" for d in dimensions]
+        select += [f"{spec['measures'][m]} AS {m}" for m in measures]
+
+        where, params = [], []
+        if date_from:
+            where.append("treatment_start_date >= ?")
+            params.append(date_from)
+        if date_to:
+            where.append("treatment_start_date < ?")
+            params.append(date_to)
+        for name, value in (filters or {}).items():
+            where.append(f"CAST({spec['dimensions'][name]} AS VARCHAR) = ?")
+            params.append(str(value))
+
+        sql = f"SELECT {', '.join(select)} FROM {fact}"
+        if where:
+            sql += f" WHERE {' AND '.join(where)}"
+        if dimensions:
+            positions = ", ".join(str(i + 1) for i in range(len(dimensions)))
+            sql += f" GROUP BY {positions} ORDER BY {positions}"
+        sql += f" LIMIT {int(limit)}"
+        return sql, params
+
+    @staticmethod
+    def query(fact, dimensions, measures, filters=None, date_from=None, date_to=None, limit=1000):
+        sql, params = AnalyticsService.build_query(fact, dimensions, measures, filters, date_from, date_to, limit)
+        if duckdb is None or not os.path.exists(Config.ANALYTICS_DB_PATH):
+            raise AnalyticsUnavailable("The analytics store has not been built; run `flask refresh-analytics`")
+
+        con = duckdb.connect(Config.ANALYTICS_DB_PATH, read_only=True)
+        try:
+            cursor = con.execute(sql, params)
+            columns = [c[0] for c in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            refreshed = con.execute("SELECT max(refreshed_at) FROM refresh_state").fetchone()[0]
+        except duckdb.CatalogException:
+            # A store built before the tables were created up front
+            raise AnalyticsUnavailable("The analytics store is incomplete; run `flask refresh-analytics --full`")
+        finally:
+            con.close()
+        return rows, refreshed
+
+
+class _Collector:
+    """Stands in for a partitioned writer: keeps rows, ignores partitions"""
+
+    def __init__(self):
+        self.rows = []
+
+    def add(self, partition, row):
+        self.rows.append(row)
+
+
+class _Rows:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.chunk = []
+        self.treatments = _Collector()
+        self.prescriptions = _Collector()
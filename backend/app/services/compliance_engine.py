@@ -0,0 +1,188 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.db import DB
+from app.services.job_state import JobState
+from app.services.medicine_catalog import MedicineCatalog
+from app.services.violation_service import ViolationService
+
+JOB = "compliance_rules"
+
+# Rule code → reason shown on the flagged treatment. Order is the order
+# reasons are listed in.
+RULES = {
+    "no_vet": "Medicines given without a veterinarian",
+    "short_withdrawal": "Withdrawal period shorter than the authorized period",
+    "unauthorized_medicine": "Medicine not in the authorized catalog",
+    "lactating_milk_supply": "Lactating animal treated on a farm that supplies milk",
+}
+RULE_CODES = list(RULES)
+
+TREATMENT_FIELDS = {
+    "farmer": 1, "animal": 1, "vet": 1, "medicines": 1, "treatment_start_date": 1,
+    "is_flagged_violation": 1, "violation_source": 1, "violation_rules": 1
+}
+
+# Incremental runs look back this far past the watermark, for writes that
+# were in flight when the previous run started
+WATERMARK_OVERLAP = timedelta(seconds=60)
+
+
+class ComplianceEngine:
+    """
+    Batch compliance rules over treatments.
+
+    Treatments are read in chunks. Each chunk's farmers, animals and
+    prescribed medicines are fetched with one query per collection, laid
+    out as NumPy arrays and every rule is evaluated for the whole chunk at
+    once. Only treatments whose outcome changed are written, through
+    ViolationService.apply() (one bulk_write per chunk, counters and
+    rollups included).
+
+    Incremental runs (the default) look at treatments updated since the
+    last run; full=True re-scans everything, e.g. after the catalog's
+    withdrawal periods change. The rules set and clear their own flags
+    but never touch a treatment an authority has ruled on.
+    """
+
+    @staticmethod
+    def run(full=False, chunk_size=5000):
+        started = datetime.utcnow()
+        state = JobState.get(JOB)
+
+        query = {}
+        if not full and state.get("watermark"):
+            query = {"updated_at": {"$gte": state["watermark"] - WATERMARK_OVERLAP}}
+
+        summary = {"scanned": 0, "flagged": 0, "cleared": 0, "written": 0}
+        chunk = []
+        cursor = DB.treatments.find(query, TREATMENT_FIELDS).batch_size(chunk_size)
+        for doc in cursor:
+            chunk.append(doc)
+            if len(chunk) >= chunk_size:
+                ComplianceEngine._process(chunk, summary)
+                chunk = []
+        if chunk:
+            ComplianceEngine._process(chunk, summary)
+
+        JobState.save(JOB, watermark=started, last_run=dict(summary, full=full, started_at=started))
+        print(
+            f"[COMPLIANCE] {'full' if full else 'incremental'} run: {summary['scanned']} scanned, "
+            f"{summary['flagged']} flagged, {summary['cleared']} cleared"
+        )
+        return summary
+
+    # -----------------------------------------------------
+    # One chunk
+    # -----------------------------------------------------
+    @staticmethod
+    def _process(chunk, summary):
+        farmers, animals, medicines = ComplianceEngine._lookups(chunk)
+        matched = ComplianceEngine.evaluate(chunk, farmers, animals, medicines)
+
+        changes = []
+        for doc, row in zip(chunk, matched):
+            if doc.get("violation_source") == "authority":
+                continue
+            rules = [code for code, hit in zip(RULE_CODES, row) if hit]
+            flagged = bool(doc.get("is_flagged_violation"))
+
+            if rules:
+                if flagged and doc.get("violation_rules") == rules:
+                    continue
+                summary["flagged"] += not flagged
+            elif flagged and doc.get("violation_source") == "rules":
+                summary["cleared"] += 1
+            else:
+                # Unflagged and clean, or flagged before the rules existed
+                continue
+
+            farmer = farmers.get(doc.get("farmer"), {})
+            changes.append({
+                "treatment": doc,
+                "flagged": bool(rules),
+                "rules": rules,
+                "reason": "; ".join(RULES[code] for code in rules) or None,
+                "rollup": (
+                    doc.get("treatment_start_date"),
+                    farmer.get("district"),
+                    animals.get(doc.get("animal"), {}).get("species"),
+                    doc.get("vet")
+                )
+            })
+
+        summary["scanned"] += len(chunk)
+        summary["written"] += ViolationService.apply(changes)
+
+    @staticmethod
+    def _lookups(chunk):
+        farmer_ids = list({d.get("farmer") for d in chunk})
+        animal_ids = list({d.get("animal") for d in chunk})
+        medicine_ids = list({m for d in chunk for m in d.get("medicines") or []})
+
+        farmers = {
+            f["_id"]: f for f in DB.farmers.find(
+                {"_id": {"$in": farmer_ids}}, {"district": 1, "after_registration.milk_supply_to": 1}
+            )
+        }
+        animals = {
+            a["_id"]: a for a in DB.animals.find({"_id": {"$in": animal_ids}}, {"species": 1, "is_lactating": 1})
+        }
+        medicines = {
+            m["_id"]: m for m in DB.db.medicines.find(
+                {"_id": {"$in": medicine_ids}}, {"name": 1, "authorized_medicine": 1, "withdrawal_period_days": 1}
+            )
+        }
+        return farmers, animals, medicines
+
+    # -----------------------------------------------------
+    # Rules
+    # -----------------------------------------------------
+    @staticmethod
+    def evaluate(chunk, farmers, animals, medicines):
+        """Boolean matrix, one row per treatment and one column per RULE_CODES entry"""
+        n = len(chunk)
+
+        # Per treatment
+        has_vet = np.fromiter((d.get("vet") is not None for d in chunk), bool, n)
+        lactating = np.fromiter(
+            (bool(animals.get(d.get("animal"), {}).get("is_lactating")) for d in chunk), bool, n
+        )
+        supplies_milk = np.fromiter(
+            (bool((farmers.get(d.get("farmer"), {}).get("after_registration") or {}).get("milk_supply_to"))
+             for d in chunk), bool, n
+        )
+
+        # Per prescribed medicine, tagged with the row of its treatment
+        owner, prescribed, authorized = [], [], []
+        for row, doc in enumerate(chunk):
+            for medicine_id in doc.get("medicines") or []:
+                medicine = medicines.get(medicine_id)
+                if medicine is None:
+                    continue
+                entry = MedicineCatalog.for_prescription(medicine)
+                owner.append(row)
+                prescribed.append(medicine.get("withdrawal_period_days") or 0)
+                authorized.append(entry["withdrawal_period_days"] if entry else np.nan)
+
+        owner = np.asarray(owner, dtype=np.int64)
+        prescribed = np.asarray(prescribed, dtype=np.float64)
+        authorized = np.asarray(authorized, dtype=np.float64)
+        in_catalog = ~np.isnan(authorized)
+
+        has_medicines = np.zeros(n, bool)
+        has_medicines[owner] = True
+        short = np.zeros(n, bool)
+        short[owner[in_catalog & (prescribed < authorized)]] = True
+        unauthorized = np.zeros(n, bool)
+        unauthorized[owner[~in_catalog]] = True
+        withdrawal = np.zeros(n)
+        np.maximum.at(withdrawal, owner, prescribed)
+
+        return np.column_stack([
+            has_medicines & ~has_vet,
+            short,
+            unauthorized,
+            lactating & supplies_milk & (withdrawal > 0)
+        ])
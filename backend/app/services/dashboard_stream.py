@@ -0,0 +1,180 @@
+import json
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+
+from app.config import Config
+from app.db import DB
+
+# Sentinel telling a subscriber's generator to end the stream
+CLOSED = (None, None)
+
+# Each pass re-reads this far behind the watermark, for writes committed
+# slightly out of order; events already sent are recognised and skipped
+WATERMARK_OVERLAP = timedelta(seconds=30)
+
+# Fields sent for each new treatment / violation event
+TREATMENT_SUMMARY_FIELDS = {
+    "farmer": 1, "animal": 1, "vet": 1, "status": 1, "diagnosis": 1,
+    "is_flagged_violation": 1, "violation_reason": 1,
+    "treatment_start_date": 1, "created_at": 1, "updated_at": 1
+}
+
+
+class DashboardStream:
+    """
+    One background producer per process feeding every open dashboard.
+
+    The producer wakes every DASHBOARD_STREAM_INTERVAL seconds, reads what
+    changed since its last pass (index-backed on updated_at) plus a few
+    cheap counters, and fans the resulting deltas out to subscriber
+    queues. N open dashboards therefore cost one computation, not N
+    polls. The thread starts with the first subscriber and stops soon
+    after the last one leaves.
+    """
+
+    _lock = threading.Lock()
+    _subscribers = set()
+    _thread = None
+
+    _counters = {}
+    _watermark = _started_at = None
+    _seen = {}   # treatment id → updated_at already published, within the overlap window
+
+    # -----------------------------------------------------
+    # Subscribers
+    # -----------------------------------------------------
+    @classmethod
+    def subscribe(cls):
+        q = queue.Queue(maxsize=Config.DASHBOARD_STREAM_QUEUE_SIZE)
+        with cls._lock:
+            cls._subscribers.add(q)
+            if cls._thread is None or not cls._thread.is_alive():
+                cls._thread = threading.Thread(target=cls._run, name="dashboard-stream", daemon=True)
+                cls._thread.start()
+        return q
+
+    @classmethod
+    def unsubscribe(cls, q):
+        with cls._lock:
+            cls._subscribers.discard(q)
+
+    @classmethod
+    def snapshot(cls):
+        return dict(cls._counters)
+
+    @classmethod
+    def _publish(cls, event, data):
+        with cls._lock:
+            subscribers = list(cls._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait((event, data))
+            except queue.Full:
+                # A client that cannot keep up is dropped rather than
+                # letting its backlog grow without bound
+                cls.unsubscribe(q)
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    pass
+                q.put_nowait(CLOSED)
+
+    # -----------------------------------------------------
+    # Producer
+    # -----------------------------------------------------
+    @classmethod
+    def _run(cls):
+        print("📡 Dashboard stream producer started")
+        # A restarted producer only reports what happens from now on
+        cls._watermark = cls._started_at = datetime.utcnow()
+        cls._seen = {}
+        idle_since = None
+        while True:
+            with cls._lock:
+                has_subscribers = bool(cls._subscribers)
+
+            if not has_subscribers:
+                idle_since = idle_since or time.monotonic()
+                if time.monotonic() - idle_since > Config.DASHBOARD_STREAM_INTERVAL:
+                    with cls._lock:
+                        if not cls._subscribers:
+                            cls._thread = None
+                            print("📡 Dashboard stream producer stopped (no subscribers)")
+                            return
+            else:
+                idle_since = None
+                try:
+                    cls._tick()
+                except Exception as e:
+                    print(f"❌ Error in dashboard stream: {str(e)}")
+
+            time.sleep(Config.DASHBOARD_STREAM_INTERVAL)
+
+    @classmethod
+    def _tick(cls):
+        now = datetime.utcnow()
+        since = cls._watermark or now
+        # Never further back than the producer's start
+        window = max(since - WATERMARK_OVERLAP, cls._started_at or since)
+
+        # Incremental part: treatments written since the previous pass,
+        # plus the overlap window; a (treatment, updated_at) is sent once
+        changed = DB.treatments.find(
+            {"updated_at": {"$gte": window}},
+            TREATMENT_SUMMARY_FIELDS
+        ).sort("updated_at", 1)
+
+        published = 0
+        for doc in changed:
+            if published >= Config.DASHBOARD_STREAM_MAX_EVENTS:
+                break
+            previous = cls._seen.get(doc["_id"])
+            if previous is not None and previous >= doc["updated_at"]:
+                continue
+
+            summary = _jsonable(doc)
+            created_at = doc.get("created_at")
+            if previous is None and created_at and created_at >= window:
+                cls._publish("treatment", summary)
+            if doc.get("is_flagged_violation"):
+                cls._publish("violation", summary)
+            cls._seen[doc["_id"]] = doc["updated_at"]
+            since = max(since, doc["updated_at"])
+            published += 1
+
+        cls._watermark = since
+        horizon = since - WATERMARK_OVERLAP
+        cls._seen = {k: v for k, v in cls._seen.items() if v >= horizon}
+
+        # Counters: only the ones that moved are pushed
+        counters = cls._compute_counters(now)
+        delta = {k: v for k, v in counters.items() if cls._counters.get(k) != v}
+        cls._counters = counters
+        if delta:
+            cls._publish("counters", delta)
+
+    @staticmethod
+    def _compute_counters(now):
+        today_start = datetime(now.year, now.month, now.day)
+        return {
+            "total_farmers": DB.farmers.estimated_document_count(),
+            "total_veterinarians": DB.vets.estimated_document_count(),
+            "total_animals": DB.animals.estimated_document_count(),
+            "total_treatments": DB.treatments.estimated_document_count(),
+            "pending_verifications": DB.farmers.count_documents({"is_verified": False}),
+            "violations_count": DB.treatments.count_documents({"is_flagged_violation": True}),
+            "today_treatments": DB.treatments.count_documents({
+                "treatment_start_date": {"$gte": today_start, "$lt": today_start + timedelta(days=1)}
+            })
+        }
+
+
+def _jsonable(doc):
+    return json.loads(json.dumps(doc, default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v)))
+
+
+def format_sse(event, data):
+    """Encode one Server-Sent Event frame"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
@@ -0,0 +1,265 @@
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import ReturnDocument, DESCENDING, ASCENDING
+
+from app.config import Config
+from app.db import DB
+from app.models.treatment_requests import TreatmentRequest, GPSLocation
+from app.models.treatments import Treatment
+from app.services.geo_service import GeoService
+from app.utils.geo import point_from_gps
+
+ACTIVE_STATUSES = ["assigned", "accepted"]
+# Work that is not finished yet; "completed" is set once the treatment is diagnosed
+OPEN_STATUSES = ["pending", "assigned", "accepted"]
+
+# Longest a claim may hold the per-vet claim lock (a crashed worker's lock lapses after this)
+CLAIM_LOCK_SECONDS = 10
+
+
+class DispatchService:
+    """
+    Work queue that hands pending treatment requests to vets.
+
+    Vets pull work with claim(): a request is taken with a single
+    findOneAndUpdate guarded on its status, so two vets can never end up
+    with the same request. A claim is a lease — unless the vet renews or
+    accepts it before lease_expires_at, the request becomes claimable
+    again automatically.
+
+    A vet holds at most DISPATCH_MAX_ACTIVE_PER_VET live requests. The
+    cap is checked and the claim made under a short per-vet lock taken
+    on the vet document, so parallel claims by one vet cannot overshoot
+    it. Diagnosing the treatment completes its request, which frees the
+    slot and keeps it out of the queue.
+    """
+
+    # -----------------------------------------------------
+    # Producer side
+    # -----------------------------------------------------
+    @staticmethod
+    def enqueue(treatment, urgency=None):
+        animal, farmer = treatment.animal, treatment.farmer
+        gps = animal.gps_location or farmer.gps_location
+        coordinates = point_from_gps(gps)
+
+        request = TreatmentRequest(
+            farmer=farmer,
+            animal=animal,
+            treatment=treatment,
+            symptoms=", ".join(treatment.symptoms or []),
+            urgency=urgency if urgency in (0, 1, 2, 3) else 1,
+            gps_location=GPSLocation(lat=coordinates[1], lng=coordinates[0]) if coordinates else None
+        )
+
+        # Offer it first to the nearest verified vet, if we know where it is
+        if coordinates:
+            nearest = GeoService.nearby_vets(coordinates, radius_km=Config.DISPATCH_RADIUS_KM, limit=1)
+            if nearest:
+                request.preferred_vet = ObjectId(nearest[0]["_id"])
+
+        return request.save()
+
+    # -----------------------------------------------------
+    # Vet side
+    # -----------------------------------------------------
+    @staticmethod
+    def _claimable(vet, now):
+        grace_cutoff = now - timedelta(seconds=Config.DISPATCH_PREFERRED_GRACE_SECONDS)
+        return {"$and": [
+            # Never claimed, or the previous claim lapsed
+            {"$or": [
+                {"status": "pending"},
+                {"status": "assigned", "lease_expires_at": {"$lt": now}}
+            ]},
+            # Held for the preferred vet for a short grace period
+            {"$or": [
+                {"preferred_vet": None},
+                {"preferred_vet": vet.id},
+                {"created_at": {"$lt": grace_cutoff}}
+            ]}
+        ]}
+
+    @staticmethod
+    def _active(vet, now):
+        """Accepted work, plus claims whose lease has not lapsed"""
+        return {
+            "assigned_vet": vet.id,
+            "$or": [
+                {"status": "accepted"},
+                {"status": "assigned", "lease_expires_at": {"$gte": now}}
+            ]
+        }
+
+    @staticmethod
+    def active_count(vet, now=None):
+        return DB.treatment_requests.count_documents(DispatchService._active(vet, now or datetime.utcnow()))
+
+    @staticmethod
+    def claim(vet):
+        """
+        Lease the most urgent, then closest, claimable request to this vet.
+        Returns (request_doc, None) or (None, reason).
+        """
+        now = datetime.utcnow()
+        lock_until = now + timedelta(seconds=CLAIM_LOCK_SECONDS)
+        locked = DB.vets.find_one_and_update(
+            {"_id": vet.id, "$or": [{"dispatch_lock_until": None}, {"dispatch_lock_until": {"$lt": now}}]},
+            {"$set": {"dispatch_lock_until": lock_until}},
+            projection={"_id": 1}
+        )
+        if not locked:
+            return None, "Another claim is already in progress"
+        try:
+            if DispatchService.active_count(vet, now) >= Config.DISPATCH_MAX_ACTIVE_PER_VET:
+                return None, "Too many active requests; finish or release one first"
+            return DispatchService._claim(vet, now)
+        finally:
+            # Only our own lock: if it expired and another claim took it, that claim keeps it
+            DB.vets.update_one(
+                {"_id": vet.id, "dispatch_lock_until": lock_until},
+                {"$set": {"dispatch_lock_until": None}}
+            )
+
+    @staticmethod
+    def _claim(vet, now):
+        claimable = DispatchService._claimable(vet, now)
+        update = {
+            "$set": {
+                "status": "assigned",
+                "assigned_vet": vet.id,
+                "lease_expires_at": now + timedelta(seconds=Config.DISPATCH_LEASE_SECONDS),
+                "updated_at": now
+            },
+            "$inc": {"claim_count": 1}
+        }
+
+        coordinates = point_from_gps(vet.gps_location)
+        if coordinates:
+            # Shortlist nearby work, most urgent first then nearest, and
+            # take the first one nobody else grabbed in the meantime.
+            candidates = DB.treatment_requests.aggregate([
+                {"$geoNear": {
+                    "near": {"type": "Point", "coordinates": coordinates},
+                    "key": "location",
+                    "distanceField": "distance_m",
+                    "maxDistance": Config.DISPATCH_RADIUS_KM * 1000,
+                    "query": claimable,
+                    "spherical": True
+                }},
+                {"$sort": {"urgency": DESCENDING, "distance_m": ASCENDING}},
+                {"$limit": Config.DISPATCH_CANDIDATES},
+                {"$project": {"_id": 1}}
+            ])
+            for candidate in candidates:
+                doc = DB.treatment_requests.find_one_and_update(
+                    {"_id": candidate["_id"], **claimable},
+                    update,
+                    return_document=ReturnDocument.AFTER
+                )
+                if doc:
+                    return doc, None
+
+        # Requests without a location (or vets without one) fall back to
+        # plain urgency/age order
+        fallback = dict(claimable)
+        if coordinates:
+            fallback = {"$and": [claimable, {"location": None}]}
+
+        doc = DB.treatment_requests.find_one_and_update(
+            fallback,
+            update,
+            sort=[("urgency", DESCENDING), ("created_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+        if not doc:
+            return None, "No pending requests"
+        return doc, None
+
+    @staticmethod
+    def renew(vet, request_id):
+        now = datetime.utcnow()
+        return DB.treatment_requests.find_one_and_update(
+            {"_id": request_id, "assigned_vet": vet.id, "status": "assigned", "lease_expires_at": {"$gte": now}},
+            {"$set": {
+                "lease_expires_at": now + timedelta(seconds=Config.DISPATCH_LEASE_SECONDS),
+                "updated_at": now
+            }},
+            return_document=ReturnDocument.AFTER
+        )
+
+    @staticmethod
+    def release(vet, request_id):
+        return DB.treatment_requests.find_one_and_update(
+            {"_id": request_id, "assigned_vet": vet.id, "status": "assigned"},
+            {"$set": {
+                "status": "pending",
+                "assigned_vet": None,
+                "lease_expires_at": None,
+                "updated_at": datetime.utcnow()
+            }},
+            return_document=ReturnDocument.AFTER
+        )
+
+    @staticmethod
+    def accept(vet, request_id):
+        """Turn a live lease into a firm assignment and attach the vet to the treatment"""
+        now = datetime.utcnow()
+        doc = DB.treatment_requests.find_one_and_update(
+            {"_id": request_id, "assigned_vet": vet.id, "status": "assigned", "lease_expires_at": {"$gte": now}},
+            {"$set": {"status": "accepted", "lease_expires_at": None, "updated_at": now}},
+            return_document=ReturnDocument.AFTER
+        )
+        if doc and doc.get("treatment"):
+            Treatment.objects(id=doc["treatment"], vet=None).update_one(set__vet=vet, set__updated_at=now)
+        return doc
+
+    @staticmethod
+    def active_for(vet):
+        return list(DB.treatment_requests.find(
+            DispatchService._active(vet, datetime.utcnow())
+        ).sort("updated_at", DESCENDING))
+
+    # -----------------------------------------------------
+    # Completion
+    # -----------------------------------------------------
+    @staticmethod
+    def complete(treatment_id, vet=None):
+        """Close the open request(s) for a treatment once it has been diagnosed"""
+        now = datetime.utcnow()
+        fields = {"status": "completed", "lease_expires_at": None, "completed_at": now, "updated_at": now}
+        if vet is not None:
+            fields["assigned_vet"] = vet.id
+        return DB.treatment_requests.update_many(
+            {"treatment": treatment_id, "status": {"$in": OPEN_STATUSES}},
+            {"$set": fields}
+        ).modified_count
+
+    @staticmethod
+    def complete_diagnosed(batch_size=500):
+        """Backfill: complete open requests whose treatment was already diagnosed"""
+        completed = 0
+        batch = []
+
+        def flush():
+            diagnosed = DB.treatments.distinct("_id", {"_id": {"$in": batch}, "status": {"$ne": "pending"}})
+            if not diagnosed:
+                return 0
+            now = datetime.utcnow()
+            return DB.treatment_requests.update_many(
+                {"treatment": {"$in": diagnosed}, "status": {"$in": OPEN_STATUSES}},
+                {"$set": {"status": "completed", "lease_expires_at": None, "completed_at": now, "updated_at": now}}
+            ).modified_count
+
+        cursor = DB.treatment_requests.find(
+            {"status": {"$in": OPEN_STATUSES}, "treatment": {"$ne": None}}, {"treatment": 1}
+        ).batch_size(batch_size)
+        for doc in cursor:
+            batch.append(doc["treatment"])
+            if len(batch) >= batch_size:
+                completed += flush()
+                batch = []
+        if batch:
+            completed += flush()
+        return completed
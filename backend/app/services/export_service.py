@@ -0,0 +1,266 @@
+import os
+import re
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from app.config import Config
+from app.db import DB
+from app.services.job_state import JobState
+from app.services.medicine_catalog import MedicineCatalog
+from app.services.rollup_service import UNKNOWN
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; only the export job needs it
+    pa = pq = None
+
+# Re-read this far before the watermark, for writes in flight during the last run
+WATERMARK_OVERLAP = timedelta(seconds=60)
+
+
+def schemas():
+    string, timestamp = pa.string(), pa.timestamp("ms")
+    return {
+        "treatments": pa.schema([
+            ("_id", string), ("farmer_id", string), ("animal_id", string), ("vet_id", string),
+            ("district", string), ("species", string),
+            ("diagnosis", string), ("symptoms", pa.list_(string)), ("status", string),
+            ("medicine_count", pa.int32()),
+            ("treatment_start_date", timestamp), ("withdrawal_ends_on", timestamp),
+            ("is_withdrawal_completed", pa.bool_()),
+            ("is_flagged_violation", pa.bool_()), ("violation_reason", string),
+            ("created_at", timestamp), ("updated_at", timestamp),
+        ]),
+        "prescriptions": pa.schema([
+            ("_id", string), ("treatment_id", string), ("authorized_medicine_id", string),
+            ("name", string), ("antimicrobial_class", string),
+            ("dosage", string), ("route", string), ("frequency", string),
+            ("duration_days", pa.int32()), ("withdrawal_period_days", pa.int32()),
+            ("district", string), ("species", string), ("treatment_start_date", timestamp),
+        ]),
+        "animals": pa.schema([
+            ("_id", string), ("farmer_id", string), ("district", string),
+            ("species", string), ("breed", string), ("tag_number", string),
+            ("age", pa.float64()), ("gender", string), ("weight", pa.float64()),
+            ("is_lactating", pa.bool_()), ("daily_milk_yield", pa.float64()), ("is_active", pa.bool_()),
+            ("created_at", timestamp), ("updated_at", timestamp),
+        ]),
+    }
+
+
+def _id(value):
+    value = getattr(value, "id", value)
+    return str(value) if value is not None else None
+
+
+def _region(district):
+    return (district or "").strip().title() or UNKNOWN
+
+
+def _partition(value):
+    """Safe path component for a partition value"""
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", value) or "_"
+
+
+class _PartitionedWriter:
+    """
+    Parquet part files per partition for the run, written in row groups of
+    at least `row_group_size` rows (a partition's last group may be smaller).
+
+    Rows are buffered per partition. When `max_buffered` rows are held in
+    all, the largest buffer is written early. At most `max_open` files are
+    open at once: the least recently written one is closed, and a partition
+    that gets more rows afterwards continues in a new part file.
+    """
+
+    def __init__(self, root, dataset, schema, run_id, row_group_size, max_buffered, max_open):
+        self.root, self.dataset, self.schema, self.run_id = root, dataset, schema, run_id
+        self.row_group_size, self.max_buffered, self.max_open = row_group_size, max_buffered, max_open
+        self.buffers = {}
+        self.writers = OrderedDict()   # partition → open ParquetWriter, least recently written first
+        self.parts = {}                # partition → part files started
+        self.buffered = self.rows = 0
+
+    def add(self, partition, row):
+        rows = self.buffers.setdefault(partition, [])
+        rows.append(row)
+        self.buffered += 1
+        if len(rows) >= self.row_group_size:
+            self._write(partition)
+        elif self.buffered >= self.max_buffered:
+            self._write(max(self.buffers, key=lambda p: len(self.buffers[p])))
+
+    def _write(self, partition):
+        rows = self.buffers.pop(partition)
+        writer = self.writers.get(partition)
+        if writer is None:
+            while len(self.writers) >= self.max_open:
+                self.writers.popitem(last=False)[1].close()
+            writer = self.writers[partition] = pq.ParquetWriter(self._path(partition), self.schema, compression="zstd")
+        else:
+            self.writers.move_to_end(partition)
+        writer.write_table(pa.Table.from_pylist(rows, schema=self.schema), row_group_size=len(rows))
+        self.buffered -= len(rows)
+        self.rows += len(rows)
+
+    def _path(self, partition):
+        directory = os.path.join(self.root, self.dataset, *(f"{k}={_partition(v)}" for k, v in partition))
+        os.makedirs(directory, exist_ok=True)
+        part = self.parts[partition] = self.parts.get(partition, 0) + 1
+        return os.path.join(directory, f"part-{self.run_id}-{part}.parquet")
+
+    def close(self):
+        for partition in list(self.buffers):
+            self._write(partition)
+        for writer in self.writers.values():
+            writer.close()
+        self.writers.clear()
+        return {"rows": self.rows, "files": sum(self.parts.values())}
+
+
+class ExportService:
+    """
+    Columnar export for analysts, off the primary's hot path.
+
+    Writes typed Parquet datasets under EXPORT_DIR, partitioned Hive-style:
+
+        treatments/month=2025-01/region=Pune/part-<run>-1.parquet
+        prescriptions/month=2025-01/region=Pune/part-<run>-1.parquet
+        animals/region=Pune/part-<run>-1.parquet
+
+    <run> is the start time plus a random suffix, so overlapping runs never
+    write the same file. A partition can get several parts in one run when
+    its file was closed to stay under EXPORT_MAX_OPEN_FILES.
+
+    Incremental runs export documents updated since the previous run's
+    watermark (kept in `job_state`) as new part files, so a document
+    changed between runs appears in several parts: readers keep the row
+    with the latest updated_at per _id. Full runs export everything.
+    """
+
+    @staticmethod
+    def export(root=None, full=False, batch_size=10000):
+        if pa is None:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+
+        root = root or Config.EXPORT_DIR
+        started = datetime.utcnow()
+        run_id = f"{started:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        tables = schemas()
+        summary = {}
+
+        def writer(dataset):
+            return _PartitionedWriter(
+                root, dataset, tables[dataset], run_id, Config.EXPORT_ROW_GROUP_ROWS,
+                Config.EXPORT_BUFFER_ROWS, Config.EXPORT_MAX_OPEN_FILES
+            )
+
+        # Treatments and their prescriptions in one pass
+        query = ExportService._since("export:treatments", full)
+        treatments, prescriptions = writer("treatments"), writer("prescriptions")
+        chunk = []
+        for doc in DB.treatments.find(query).batch_size(batch_size):
+            chunk.append(doc)
+            if len(chunk) >= batch_size:
+                ExportService._treatment_rows(chunk, treatments, prescriptions)
+                chunk = []
+        if chunk:
+            ExportService._treatment_rows(chunk, treatments, prescriptions)
+        summary["treatments"] = treatments.close()
+        summary["prescriptions"] = prescriptions.close()
+        JobState.save("export:treatments", watermark=started, last_run=dict(summary["treatments"], full=full))
+
+        # Animals
+        query = ExportService._since("export:animals", full)
+        animals = writer("animals")
+        chunk = []
+        for doc in DB.animals.find(query).batch_size(batch_size):
+            chunk.append(doc)
+            if len(chunk) >= batch_size:
+                ExportService._animal_rows(chunk, animals)
+                chunk = []
+        if chunk:
+            ExportService._animal_rows(chunk, animals)
+        summary["animals"] = animals.close()
+        JobState.save("export:animals", watermark=started, last_run=dict(summary["animals"], full=full))
+
+        counts = ", ".join(f"{name}: {result['rows']} rows" for name, result in summary.items())
+        print(f"[EXPORT] {counts} → {root}")
+        return summary
+
+    @staticmethod
+    def _since(job, full):
+        watermark = None if full else JobState.get(job).get("watermark")
+        return {"updated_at": {"$gte": watermark - WATERMARK_OVERLAP}} if watermark else {}
+
+    @staticmethod
+    def _districts(farmer_ids):
+        return {
+            f["_id"]: f.get("district")
+            for f in DB.farmers.find({"_id": {"$in": list(farmer_ids)}}, {"district": 1})
+        }
+
+    @staticmethod
+    def _treatment_rows(chunk, treatments, prescriptions):
+        districts = ExportService._districts({d.get("farmer") for d in chunk})
+        species = {
+            a["_id"]: a.get("species")
+            for a in DB.animals.find({"_id": {"$in": list({d.get("animal") for d in chunk})}}, {"species": 1})
+        }
+        medicines = {
+            m["_id"]: m
+            for m in DB.db.medicines.find({"_id": {"$in": list({m for d in chunk for m in d.get("medicines") or []})}})
+        }
+
+        for doc in chunk:
+            region = _region(districts.get(doc.get("farmer")))
+            started_on = doc.get("treatment_start_date")
+            month = started_on.strftime("%Y-%m") if started_on else UNKNOWN
+            partition = (("month", month), ("region", region))
+            animal_species = species.get(doc.get("animal"))
+
+            treatments.add(partition, {
+                "_id": _id(doc["_id"]), "farmer_id": _id(doc.get("farmer")),
+                "animal_id": _id(doc.get("animal")), "vet_id": _id(doc.get("vet")),
+                "district": region, "species": animal_species,
+                "diagnosis": doc.get("diagnosis"), "symptoms": doc.get("symptoms") or [],
+                "status": doc.get("status"), "medicine_count": len(doc.get("medicines") or []),
+                "treatment_start_date": started_on, "withdrawal_ends_on": doc.get("withdrawal_ends_on"),
+                "is_withdrawal_completed": doc.get("is_withdrawal_completed"),
+                "is_flagged_violation": doc.get("is_flagged_violation"),
+                "violation_reason": doc.get("violation_reason"),
+                "created_at": doc.get("created_at"), "updated_at": doc.get("updated_at"),
+            })
+
+            for medicine_id in doc.get("medicines") or []:
+                medicine = medicines.get(medicine_id)
+                if medicine is None:
+                    continue
+                entry = MedicineCatalog.get(medicine.get("authorized_medicine")) if medicine.get("authorized_medicine") else None
+                prescriptions.add(partition, {
+                    "_id": _id(medicine["_id"]), "treatment_id": _id(doc["_id"]),
+                    "authorized_medicine_id": _id(medicine.get("authorized_medicine")),
+                    "name": medicine.get("name"),
+                    "antimicrobial_class": entry.get("antimicrobial_class") if entry else None,
+                    "dosage": medicine.get("dosage"), "route": medicine.get("route"),
+                    "frequency": medicine.get("frequency"),
+                    "duration_days": medicine.get("duration_days"),
+                    "withdrawal_period_days": medicine.get("withdrawal_period_days"),
+                    "district": region, "species": animal_species, "treatment_start_date": started_on,
+                })
+
+    @staticmethod
+    def _animal_rows(chunk, animals):
+        districts = ExportService._districts({d.get("farmer") for d in chunk})
+        for doc in chunk:
+            region = _region(districts.get(doc.get("farmer")))
+            animals.add((("region", region),), {
+                "_id": _id(doc["_id"]), "farmer_id": _id(doc.get("farmer")), "district": region,
+                "species": doc.get("species"), "breed": doc.get("breed"), "tag_number": doc.get("tag_number"),
+                "age": doc.get("age"), "gender": doc.get("gender"), "weight": doc.get("weight"),
+                "is_lactating": doc.get("is_lactating"), "daily_milk_yield": doc.get("daily_milk_yield"),
+                "is_active": doc.get("is_active"),
+                "created_at": doc.get("created_at"), "updated_at": doc.get("updated_at"),
+            })
@@ -0,0 +1,88 @@
+from pymongo import UpdateOne
+
+from app.db import DB
+from app.utils.geo import point_from_gps
+
+# Collections whose documents embed a GPSLocation
+GEO_COLLECTIONS = ["farmers", "vets", "animals"]
+
+
+class GeoService:
+    # -----------------------------------------------------
+    # One-off migration: gps_location {lat, lng} → GeoJSON location
+    # -----------------------------------------------------
+    @staticmethod
+    def migrate_gps_locations(batch_size=500):
+        """
+        Backfill the GeoJSON `location` field from the legacy
+        `gps_location` embed and make sure the 2dsphere indexes exist.
+        Safe to re-run: only documents without `location` are touched.
+        """
+        summary = {}
+        for name in GEO_COLLECTIONS:
+            collection = getattr(DB, name)
+            cursor = collection.find(
+                {"gps_location.lat": {"$exists": True}, "location": {"$exists": False}},
+                {"gps_location": 1}
+            ).batch_size(batch_size)
+
+            ops, migrated, skipped = [], 0, 0
+            for doc in cursor:
+                coordinates = point_from_gps(doc.get("gps_location"))
+                if coordinates is None:
+                    skipped += 1
+                    continue
+                ops.append(UpdateOne(
+                    {"_id": doc["_id"]},
+                    {"$set": {"location": {"type": "Point", "coordinates": coordinates}}}
+                ))
+                if len(ops) >= batch_size:
+                    migrated += collection.bulk_write(ops, ordered=False).modified_count
+                    ops = []
+            if ops:
+                migrated += collection.bulk_write(ops, ordered=False).modified_count
+
+            summary[name] = {"migrated": migrated, "skipped": skipped}
+
+        DB.farmers.create_index([("location", "2dsphere")])
+        DB.animals.create_index([("location", "2dsphere")])
+        DB.vets.create_index([("location", "2dsphere"), ("is_verified", 1)])
+
+        return summary
+
+    # -----------------------------------------------------
+    # Nearest verified vets
+    # -----------------------------------------------------
+    @staticmethod
+    def nearby_vets(coordinates, radius_km=25, limit=10):
+        """
+        k nearest verified vets within radius_km of [lng, lat], closest
+        first, in a single $geoNear over the 2dsphere index.
+        """
+        pipeline = [
+            {"$geoNear": {
+                "near": {"type": "Point", "coordinates": coordinates},
+                "key": "location",
+                "distanceField": "distance_m",
+                "maxDistance": radius_km * 1000,
+                "query": {"is_verified": True},
+                "spherical": True
+            }},
+            {"$limit": limit},
+            {"$project": {
+                "name": 1,
+                "qualification": 1,
+                "specialization": 1,
+                "rating": 1,
+                "review_count": 1,
+                "gps_location": 1,
+                "distance_m": 1
+            }}
+        ]
+
+        vets = []
+        for vet in DB.vets.aggregate(pipeline):
+            vet["_id"] = str(vet["_id"])
+            vet["distance_km"] = round(vet.pop("distance_m") / 1000, 2)
+            vets.append(vet)
+        return vets
@@ -0,0 +1,92 @@
+import threading
+import time
+from datetime import datetime
+
+from app.config import Config
+from app.db import DB
+from app.utils.pool_stats import POOL_STATS
+
+
+class HealthService:
+    """
+    Tiered health checks, cheapest first:
+
+    - liveness: no I/O at all (the route answers on its own)
+    - readiness: a `ping`, cached for HEALTH_PING_CACHE_SECONDS, plus pool stats
+    - deep: estimated collection counts and server metadata, recomputed at
+      most once every HEALTH_DEEP_CACHE_SECONDS however often it is polled
+    """
+
+    # One lock per check, so a slow deep check never holds up readiness probes
+    _locks = {"_ping": threading.Lock(), "_deep": threading.Lock()}
+    _ping = None          # (result, monotonic time)
+    _deep = None
+    _server_info = None   # buildInfo never changes for a connection; fetched once
+
+    @classmethod
+    def ping(cls):
+        return cls._cached("_ping", Config.HEALTH_PING_CACHE_SECONDS, cls._run_ping)
+
+    @classmethod
+    def deep(cls):
+        return cls._cached("_deep", Config.HEALTH_DEEP_CACHE_SECONDS, cls._run_deep)
+
+    @classmethod
+    def _cached(cls, slot, max_age, compute):
+        entry = getattr(cls, slot)
+        if entry and time.monotonic() - entry[1] < max_age:
+            return entry[0]
+
+        # One caller refreshes; concurrent probes get the previous result
+        lock = cls._locks[slot]
+        if not lock.acquire(blocking=entry is None):
+            return entry[0]
+        try:
+            entry = getattr(cls, slot)
+            if entry and time.monotonic() - entry[1] < max_age:
+                return entry[0]
+            result = compute()
+            setattr(cls, slot, (result, time.monotonic()))
+            return result
+        finally:
+            lock.release()
+
+    @staticmethod
+    def _run_ping():
+        started = time.monotonic()
+        result = {"checked_at": datetime.utcnow().isoformat(), "pool": POOL_STATS.snapshot()}
+        try:
+            DB.client.admin.command("ping")
+            result.update(ok=True, latency_ms=round((time.monotonic() - started) * 1000, 1))
+        except Exception as e:
+            print(f"❌ Health ping failed: {str(e)}")
+            result.update(ok=False, error=str(e))
+        return result
+
+    @classmethod
+    def _run_deep(cls):
+        from app.services.medicine_catalog import MedicineCatalog
+        from app.services.stats_cache import StatsCache
+
+        result = cls._run_ping()
+        result["dashboard_circuit"] = StatsCache.breaker.state
+        if not result["ok"]:
+            return result
+
+        try:
+            if cls._server_info is None:
+                info = DB.client.admin.command("buildInfo")
+                cls._server_info = {"version": info.get("version")}
+            result["server"] = cls._server_info
+
+            # Metadata-only counts: no collection scans
+            timeout = Config.HEALTH_DEEP_TIMEOUT_MS
+            result["collections"] = {
+                name: getattr(DB, name).estimated_document_count(maxTimeMS=timeout)
+                for name in ("farmers", "vets", "animals", "treatments")
+            }
+            result["catalog_version"] = MedicineCatalog._version
+        except Exception as e:
+            print(f"❌ Deep health check failed: {str(e)}")
+            result.update(ok=False, error=str(e))
+        return result
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from app.db import DB
+
+
+class JobState:
+    """
+    Progress of batch jobs, one `job_state` document per job: watermarks
+    for incremental runs plus a summary of the last run.
+    """
+
+    @staticmethod
+    def get(job):
+        return DB.job_state.find_one({"_id": job}) or {}
+
+    @staticmethod
+    def save(job, **fields):
+        DB.job_state.update_one(
+            {"_id": job},
+            {"$set": dict(fields, updated_at=datetime.utcnow())},
+            upsert=True
+        )
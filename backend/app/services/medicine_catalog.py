@@ -0,0 +1,185 @@
+import threading
+import time
+from difflib import SequenceMatcher
+
+from bson import ObjectId
+
+from app.config import Config
+from app.db import DB
+from app.models.authorized_medicine import AuthorizedMedicine
+from app.utils.trie import PrefixTrie, normalize_name
+
+CATALOG_KEY = "authorized_medicines"
+
+
+class MedicineCatalog:
+    """
+    Process-local, read-through copy of the authorized medicine catalog.
+
+    The catalog is tiny and rarely written, so every worker keeps it in
+    memory. Writers bump a version counter in `catalog_versions`; readers
+    compare their copy against it at most once every
+    CATALOG_VERSION_CHECK_SECONDS and reload only when it moved.
+    """
+
+    _lock = threading.Lock()
+    _version = None
+    _checked_at = 0.0
+
+    _items = []        # serialized medicines, sorted by name
+    _by_id = {}
+    _by_name = {}      # normalized name → serialized medicine
+    _trie = PrefixTrie()
+
+    # -----------------------------------------------------
+    # Versioning
+    # -----------------------------------------------------
+    @classmethod
+    def stored_version(cls):
+        doc = DB.catalog_versions.find_one({"_id": CATALOG_KEY})
+        return doc["version"] if doc else 0
+
+    @classmethod
+    def bump_version(cls):
+        """Call after any create/update/delete of an AuthorizedMedicine"""
+        DB.catalog_versions.update_one({"_id": CATALOG_KEY}, {"$inc": {"version": 1}}, upsert=True)
+        # This worker reloads on its next read; the others within one check interval
+        cls._checked_at = 0.0
+
+    # -----------------------------------------------------
+    # Loading
+    # -----------------------------------------------------
+    @classmethod
+    def ensure_fresh(cls):
+        now = time.monotonic()
+        if cls._version is not None and now - cls._checked_at < Config.CATALOG_VERSION_CHECK_SECONDS:
+            return
+
+        with cls._lock:
+            if cls._version is not None and time.monotonic() - cls._checked_at < Config.CATALOG_VERSION_CHECK_SECONDS:
+                return
+
+            # Read the version before the documents: a write racing with
+            # the load leaves us one version behind, never ahead.
+            version = cls.stored_version()
+            if version != cls._version:
+                cls._load(version)
+            cls._checked_at = time.monotonic()
+
+    @classmethod
+    def _load(cls, version):
+        items = sorted(
+            (cls.serialize(m) for m in AuthorizedMedicine.objects()),
+            key=lambda m: normalize_name(m["name"])
+        )
+
+        trie = PrefixTrie()
+        for item in items:
+            trie.insert(item["name"], item)
+
+        # Swap everything in at once so readers never see a half-built catalog
+        cls._items = items
+        cls._by_id = {m["_id"]: m for m in items}
+        cls._by_name = {normalize_name(m["name"]): m for m in items}
+        cls._trie = trie
+        cls._version = version
+
+        print(f"[MEDICINE] catalog loaded: {len(items)} medicines (version {version})")
+
+    @staticmethod
+    def serialize(m):
+        return {
+            "_id": str(m.id),
+            "name": m.name,
+            "dosage": m.dosage,
+            "route": m.route,
+            "frequency": m.frequency,
+            "duration_days": m.duration_days,
+            "withdrawal_period_days": m.withdrawal_period_days,
+            "antimicrobial_class": m.antimicrobial_class
+        }
+
+    # -----------------------------------------------------
+    # Reads
+    # -----------------------------------------------------
+    @classmethod
+    def version(cls):
+        cls.ensure_fresh()
+        return cls._version
+
+    @classmethod
+    def all(cls):
+        cls.ensure_fresh()
+        return cls._items
+
+    @classmethod
+    def get(cls, medicine_id):
+        cls.ensure_fresh()
+        if not ObjectId.is_valid(str(medicine_id)):
+            return None
+        return cls._by_id.get(str(medicine_id))
+
+    @classmethod
+    def find_by_name(cls, name):
+        cls.ensure_fresh()
+        return cls._by_name.get(normalize_name(name))
+
+    @classmethod
+    def for_prescription(cls, medicine):
+        """
+        Catalog entry for a stored prescription (a raw medicines document).
+        Prescriptions older than catalog matching have no authorized_medicine
+        and are matched by name, as the rollups do.
+        """
+        if medicine.get("authorized_medicine"):
+            return cls.get(medicine["authorized_medicine"])
+        return cls.find_by_name(medicine.get("name"))
+
+    @classmethod
+    def autocomplete(cls, prefix, limit=10):
+        cls.ensure_fresh()
+        return cls._trie.search(prefix, limit)
+
+    # -----------------------------------------------------
+    # Prescription matching
+    # -----------------------------------------------------
+    @classmethod
+    def resolve_many(cls, entries):
+        """
+        Resolve prescribed medicines against the catalog in one pass.
+
+        Each entry is a dict with a `medicine_id` (from autocomplete) or a
+        free-text `name`. Returns one (medicine, suggestions) pair per
+        entry; medicine is None when nothing matched confidently, in which
+        case suggestions lists the closest catalog names.
+        """
+        cls.ensure_fresh()
+        by_id, by_name = cls._by_id, cls._by_name
+
+        results = []
+        for entry in entries:
+            medicine_id = entry.get("medicine_id")
+            if medicine_id:
+                results.append((by_id.get(str(medicine_id)), []))
+                continue
+
+            normalized = normalize_name(entry.get("name"))
+            exact = by_name.get(normalized)
+            if exact or not normalized:
+                results.append((exact, []))
+                continue
+
+            scored = sorted(
+                ((SequenceMatcher(None, normalized, candidate).ratio(), candidate) for candidate in by_name),
+                reverse=True
+            )
+            best = scored[0] if scored else (0, None)
+            runner_up = scored[1][0] if len(scored) > 1 else 0
+
+            # Only auto-correct a clear winner; otherwise let the vet pick
+            if best[0] >= Config.MEDICINE_MATCH_CUTOFF and best[0] - runner_up >= 0.05:
+                results.append((by_name[best[1]], []))
+            else:
+                suggestions = [by_name[c]["name"] for score, c in scored[:3] if score >= 0.5]
+                results.append((None, suggestions))
+        return results
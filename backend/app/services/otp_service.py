@@ -1,11 +1,24 @@
 import phonenumbers
 import random
 from twilio.rest import Client
+from twilio.http.http_client import TwilioHttpClient
 from app.config import TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_VERIFY_SERVICE_SID, Config
+from app.utils.deadline import http_timeout, DeadlineExceeded
+
+
+class DeadlineHttpClient(TwilioHttpClient):
+    """Twilio HTTP client whose timeout shrinks to the request's remaining budget"""
+
+    def request(self, *args, timeout=None, **kwargs):
+        return super().request(*args, timeout=http_timeout(timeout or self.timeout), **kwargs)
+
 
 class OTPService:
     def __init__(self):
-        self.client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+        self.client = Client(
+            TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN,
+            http_client=DeadlineHttpClient(timeout=Config.HTTP_TIMEOUT_SECONDS)
+        )
 
     def parse_phone(self, phone_number):
         try:
@@ -46,6 +59,8 @@ class OTPService:
             )
             return verification.sid
 
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             print("Error sending OTP:", e)
             return None
@@ -70,6 +85,8 @@ class OTPService:
             )
             return result.status == "approved"
 
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             print("Error verifying OTP:", e)
             return False
@@ -1 +1,201 @@
-# Placeholder for QR code generation and related services
\ No newline at end of file
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import escape
+
+from app.config import Config
+from app.utils.tokens import sign_static_token, load_static_token
+
+try:
+    import qrcode
+    from qrcode.image.pure import PyPNGImage
+except ImportError:  # qrcode is optional; only badge rendering needs it
+    qrcode = None
+
+QR_TOKEN_SALT = "qr-badge"
+FORMATS = {"svg": "image/svg+xml", "png": "image/png"}
+
+# Printable sheet: A4 portrait in mm, BADGE_COLUMNS × BADGE_ROWS badges
+PAGE_WIDTH, PAGE_HEIGHT = 210, 297
+BADGE_COLUMNS, BADGE_ROWS = 3, 4
+BADGE_QR_MM = 50
+
+
+def _matrix(data):
+    code = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, border=2)
+    code.add_data(data)
+    code.make(fit=True)
+    return code.get_matrix()
+
+
+def _path(matrix, x=0.0, y=0.0, module=1.0):
+    """SVG path drawing the dark modules, one rectangle per horizontal run"""
+    parts = []
+    for row, cells in enumerate(matrix):
+        col = 0
+        while col < len(cells):
+            if not cells[col]:
+                col += 1
+                continue
+            start = col
+            while col < len(cells) and cells[col]:
+                col += 1
+            parts.append(
+                f"M{x + start * module:g},{y + row * module:g}"
+                f"h{(col - start) * module:g}v{module:g}h{-(col - start) * module:g}z"
+            )
+    return "".join(parts)
+
+
+def render_svg(data):
+    matrix = _matrix(data)
+    size = len(matrix)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" '
+        f'width="{size * 4}" height="{size * 4}" shape-rendering="crispEdges">'
+        f'<rect width="{size}" height="{size}" fill="#fff"/>'
+        f'<path d="{_path(matrix)}" fill="#000"/></svg>'
+    ).encode()
+
+
+def render_png(data):
+    code = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, border=2, box_size=8)
+    code.add_data(data)
+    code.make(fit=True)
+    buffer = io.BytesIO()
+    code.make_image(image_factory=PyPNGImage).save(buffer)
+    return buffer.getvalue()
+
+
+def render_sheet(badges):
+    """One printable A4 SVG page for up to BADGE_COLUMNS × BADGE_ROWS badges"""
+    cell_w, cell_h = PAGE_WIDTH / BADGE_COLUMNS, PAGE_HEIGHT / BADGE_ROWS
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{PAGE_WIDTH}mm" height="{PAGE_HEIGHT}mm" '
+        f'viewBox="0 0 {PAGE_WIDTH} {PAGE_HEIGHT}" shape-rendering="crispEdges">'
+        f'<rect width="{PAGE_WIDTH}" height="{PAGE_HEIGHT}" fill="#fff"/>'
+    ]
+    for i, badge in enumerate(badges):
+        left = (i % BADGE_COLUMNS) * cell_w
+        top = (i // BADGE_COLUMNS) * cell_h
+        matrix = _matrix(badge["data"])
+        module = BADGE_QR_MM / len(matrix)
+        x, y = left + (cell_w - BADGE_QR_MM) / 2, top + 8
+        center = left + cell_w / 2
+        parts.append(f'<path d="{_path(matrix, x, y, module)}" fill="#000"/>')
+        parts.append(
+            f'<text x="{center:g}" y="{y + BADGE_QR_MM + 7:g}" font-family="sans-serif" font-size="4.5" '
+            f'text-anchor="middle">{escape(badge.get("title") or "")}</text>'
+        )
+        parts.append(
+            f'<text x="{center:g}" y="{y + BADGE_QR_MM + 13:g}" font-family="sans-serif" font-size="3.5" '
+            f'text-anchor="middle" fill="#444">{escape(badge.get("subtitle") or "")}</text>'
+        )
+    parts.append("</svg>")
+    return "".join(parts).encode()
+
+
+class QRService:
+    """
+    QR badges for farmers and animals.
+
+    A badge encodes PUBLIC_BASE_URL/consumer/safety/<token>, where the
+    token is a signed, timestamp-free payload ({"f": farmer} or
+    {"f": farmer, "a": animal}): printed badges stay valid forever and
+    cannot be forged for another farm.
+
+    Rendered images are cached by a hash of their content (format and
+    encoded URL) in memory and under QR_CACHE_DIR, which all workers
+    share, so a badge is drawn once however often it is requested.
+    Printable sheets are rendered one page per task, in a process pool
+    when one is asked for (QR encoding is CPU-bound pure Python).
+    """
+
+    _lock = threading.Lock()
+    _memory = OrderedDict()   # content hash → bytes, least recently used first
+
+    # -----------------------------------------------------
+    # Tokens
+    # -----------------------------------------------------
+    @staticmethod
+    def token(farmer_id, animal_id=None):
+        payload = {"f": str(farmer_id)}
+        if animal_id:
+            payload["a"] = str(animal_id)
+        return sign_static_token(payload, QR_TOKEN_SALT)
+
+    @staticmethod
+    def resolve(token):
+        """(farmer_id, animal_id or None) behind a badge token, or None"""
+        payload = load_static_token(token, QR_TOKEN_SALT)
+        if not isinstance(payload, dict) or "f" not in payload:
+            return None
+        return payload["f"], payload.get("a")
+
+    @staticmethod
+    def url(token):
+        return f"{Config.PUBLIC_BASE_URL.rstrip('/')}/consumer/safety/{token}"
+
+    # -----------------------------------------------------
+    # Images
+    # -----------------------------------------------------
+    @classmethod
+    def image(cls, data, fmt):
+        """(bytes, content hash) of the QR code for `data`"""
+        if qrcode is None:
+            raise RuntimeError("QR rendering needs the qrcode package")
+        key = hashlib.blake2b(f"{fmt}:{data}".encode(), digest_size=16).hexdigest()
+
+        with cls._lock:
+            if key in cls._memory:
+                cls._memory.move_to_end(key)
+                return cls._memory[key], key
+
+        path = os.path.join(Config.QR_CACHE_DIR, key[:2], f"{key}.{fmt}")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                content = f.read()
+        else:
+            content = render_svg(data) if fmt == "svg" else render_png(data)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename, so another worker never reads half a file
+            temp = f"{path}.{os.getpid()}.tmp"
+            with open(temp, "wb") as f:
+                f.write(content)
+            os.replace(temp, path)
+
+        with cls._lock:
+            cls._memory[key] = content
+            while len(cls._memory) > Config.QR_MEMORY_CACHE_SIZE:
+                cls._memory.popitem(last=False)
+        return content, key
+
+    # -----------------------------------------------------
+    # Printable sheets
+    # -----------------------------------------------------
+    @staticmethod
+    def badges(farmers):
+        """Badge contents for farmer documents (raw dicts with _id, name, district)"""
+        return [
+            {
+                "data": QRService.url(QRService.token(f["_id"])),
+                "title": f.get("name"),
+                "subtitle": f.get("district")
+            }
+            for f in farmers
+        ]
+
+    @staticmethod
+    def sheets(badges, workers=0):
+        """SVG pages for the badges; workers > 0 renders pages in that many processes"""
+        if qrcode is None:
+            raise RuntimeError("QR rendering needs the qrcode package")
+        per_page = BADGE_COLUMNS * BADGE_ROWS
+        pages = [badges[i:i + per_page] for i in range(0, len(badges), per_page)]
+        if workers and len(pages) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(render_sheet, pages))
+        return [render_sheet(page) for page in pages]
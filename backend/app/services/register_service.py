@@ -0,0 +1,106 @@
+import re
+
+from bson import ObjectId
+
+from app.db import DB
+from app.services.rollup_service import UNKNOWN
+
+# Column order of the treatment and violation registers
+COLUMNS = [
+    "_id", "treatment_start_date", "district",
+    "farmer_id", "farmer_name", "animal_id", "animal_tag", "species",
+    "vet_id", "vet_name", "vet_registration_number",
+    "diagnosis", "status", "medicines", "withdrawal_ends_on",
+    "is_flagged_violation", "violation_reason", "violation_source", "updated_at",
+]
+
+TREATMENT_FIELDS = {
+    "farmer": 1, "animal": 1, "vet": 1, "medicines": 1, "diagnosis": 1, "status": 1,
+    "treatment_start_date": 1, "withdrawal_ends_on": 1, "updated_at": 1,
+    "is_flagged_violation": 1, "violation_reason": 1, "violation_source": 1,
+}
+
+
+class RegisterService:
+    """
+    Full treatment and violation registers for inspections, read as a
+    stream: one cursor in _id order, references resolved per batch, rows
+    yielded one at a time. Memory stays flat however many rows there are.
+    A client that loses the connection resumes with after=<last _id>.
+    """
+
+    @staticmethod
+    def query(violations_only=False, date_from=None, date_to=None, district=None, after=None):
+        query = {}
+        if violations_only:
+            query["is_flagged_violation"] = True
+        if date_from or date_to:
+            query["treatment_start_date"] = {}
+            if date_from:
+                query["treatment_start_date"]["$gte"] = date_from
+            if date_to:
+                query["treatment_start_date"]["$lt"] = date_to
+        if district:
+            farmer_ids = DB.farmers.distinct(
+                "_id", {"district": {"$regex": f"^\\s*{re.escape(district.strip())}\\s*$", "$options": "i"}}
+            )
+            query["farmer"] = {"$in": farmer_ids}
+        if after:
+            query["_id"] = {"$gt": ObjectId(after)}
+        return query
+
+    @staticmethod
+    def rows(query, limit=None, batch_size=1000):
+        cursor = DB.treatments.find(query, TREATMENT_FIELDS).sort("_id", 1).batch_size(batch_size)
+        if limit:
+            cursor = cursor.limit(limit)
+
+        batch = []
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                yield from RegisterService._resolve(batch)
+                batch = []
+        if batch:
+            yield from RegisterService._resolve(batch)
+
+    @staticmethod
+    def _resolve(batch):
+        def lookup(collection, ids, fields):
+            ids = list({i for i in ids if i is not None})
+            return {d["_id"]: d for d in collection.find({"_id": {"$in": ids}}, fields)} if ids else {}
+
+        farmers = lookup(DB.farmers, (d.get("farmer") for d in batch), {"name": 1, "district": 1})
+        animals = lookup(DB.animals, (d.get("animal") for d in batch), {"tag_number": 1, "species": 1})
+        vets = lookup(DB.vets, (d.get("vet") for d in batch), {"name": 1, "registration_number": 1})
+        medicines = lookup(DB.db.medicines, (m for d in batch for m in d.get("medicines") or []), {"name": 1})
+
+        for doc in batch:
+            farmer = farmers.get(doc.get("farmer"), {})
+            animal = animals.get(doc.get("animal"), {})
+            vet = vets.get(doc.get("vet"), {})
+            yield {
+                "_id": str(doc["_id"]),
+                "treatment_start_date": doc.get("treatment_start_date"),
+                "district": (farmer.get("district") or "").strip().title() or UNKNOWN,
+                "farmer_id": _str(doc.get("farmer")),
+                "farmer_name": farmer.get("name"),
+                "animal_id": _str(doc.get("animal")),
+                "animal_tag": animal.get("tag_number"),
+                "species": animal.get("species"),
+                "vet_id": _str(doc.get("vet")),
+                "vet_name": vet.get("name"),
+                "vet_registration_number": vet.get("registration_number"),
+                "diagnosis": doc.get("diagnosis"),
+                "status": doc.get("status"),
+                "medicines": [medicines[m]["name"] for m in doc.get("medicines") or [] if m in medicines],
+                "withdrawal_ends_on": doc.get("withdrawal_ends_on"),
+                "is_flagged_violation": bool(doc.get("is_flagged_violation")),
+                "violation_reason": doc.get("violation_reason"),
+                "violation_source": doc.get("violation_source"),
+                "updated_at": doc.get("updated_at"),
+            }
+
+
+def _str(value):
+    return str(value) if value is not None else None
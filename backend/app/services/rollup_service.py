@@ -0,0 +1,277 @@
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from app.db import DB
+from app.models.treatment_daily_stats import TreatmentDailyStat
+
+ALL_MEDICINES = "*"
+UNKNOWN = "Unknown"
+COUNTERS = ("treatments", "violations", "prescriptions")
+
+RAW_TREATMENT_FIELDS = {
+    "farmer": 1, "animal": 1, "vet": 1, "medicines": 1,
+    "treatment_start_date": 1, "is_flagged_violation": 1
+}
+
+
+class RollupService:
+    """
+    Maintains `treatment_daily_stats`: daily treatment counters keyed by
+    (date, district, species, medicine, vet).
+
+    Every treatment write reports the treatment's state before and after
+    the change; the difference is applied with $inc upserts, so counters
+    stay correct when a treatment moves day, gains a vet or medicines, or
+    gets flagged. Time-range statistics then read a few hundred small
+    rollup documents instead of regrouping raw treatments. rebuild()
+    recomputes a date range from scratch and reconciles any drift.
+    """
+
+    # -----------------------------------------------------
+    # Treatment state
+    # -----------------------------------------------------
+    @staticmethod
+    def day(value):
+        return datetime(value.year, value.month, value.day) if value else None
+
+    @staticmethod
+    def medicine_key(authorized_id, name):
+        if authorized_id:
+            return str(authorized_id)
+        return f"name:{(name or '').strip().lower()}"
+
+    @staticmethod
+    def _state(start_date, district, species, vet_id, violation, medicines):
+        if start_date is None:
+            return None
+        return {
+            "date": RollupService.day(start_date),
+            "district": (district or "").strip().title() or UNKNOWN,
+            "species": species or UNKNOWN,
+            "vet": vet_id,
+            "violation": bool(violation),
+            "medicines": medicines
+        }
+
+    @staticmethod
+    def snapshot(treatment):
+        """Rollup-relevant facts of a Treatment document, or None"""
+        if treatment is None:
+            return None
+        medicines = [
+            (RollupService.medicine_key(_ref_id(m._data.get("authorized_medicine")), m.name), m.name)
+            for m in (treatment.medicines or [])
+        ]
+        return RollupService._state(
+            treatment.treatment_start_date,
+            treatment.farmer.district if treatment.farmer else None,
+            treatment.animal.species if treatment.animal else None,
+            _ref_id(treatment._data.get("vet")),
+            treatment.is_flagged_violation,
+            medicines
+        )
+
+    @staticmethod
+    def _add(totals, names, state, sign):
+        if not state:
+            return
+        base = (state["date"], state["district"], state["species"])
+
+        row = totals.setdefault(base + (ALL_MEDICINES, state["vet"]), dict.fromkeys(COUNTERS, 0))
+        row["treatments"] += sign
+        if state["violation"]:
+            row["violations"] += sign
+
+        for key, name in state["medicines"]:
+            row = totals.setdefault(base + (key, state["vet"]), dict.fromkeys(COUNTERS, 0))
+            row["prescriptions"] += sign
+            names.setdefault(key, name)
+
+    @staticmethod
+    def diff(before, after):
+        """[(key, {counter: delta}, medicine_name)] turning `before` into `after`"""
+        totals, names = {}, {}
+        RollupService._add(totals, names, before, -1)
+        RollupService._add(totals, names, after, 1)
+
+        changes = []
+        for key, counters in totals.items():
+            inc = {name: value for name, value in counters.items() if value}
+            if inc:
+                changes.append((key, inc, names.get(key[3])))
+        return changes
+
+    # -----------------------------------------------------
+    # Incremental maintenance
+    # -----------------------------------------------------
+    @staticmethod
+    def record(before, after):
+        """
+        Apply a treatment write to the rollups. Pass snapshot() of the
+        treatment before the change (None when it is new) and after it.
+        Failures are logged, not raised; rebuild() reconciles them.
+        """
+        try:
+            changes = RollupService.diff(before, after)
+            if not changes:
+                return
+            now = datetime.utcnow()
+            TreatmentDailyStat._get_collection().bulk_write([
+                UpdateOne(
+                    _key_filter(key),
+                    {"$inc": inc, "$set": {"updated_at": now}, "$setOnInsert": {"medicine_name": name}},
+                    upsert=True
+                )
+                for key, inc, name in changes
+            ], ordered=False)
+        except Exception as e:
+            print(f"❌ Error updating treatment rollups: {str(e)}")
+
+    @staticmethod
+    def record_flags(flips):
+        """
+        Apply violation flag changes made in bulk, in one write:
+        [(treatment_start_date, district, species, vet_id, +1 | -1)].
+        """
+        try:
+            totals = {}
+            for start_date, district, species, vet_id, sign in flips:
+                state = RollupService._state(start_date, district, species, vet_id, True, [])
+                if state:
+                    key = (state["date"], state["district"], state["species"], ALL_MEDICINES, state["vet"])
+                    totals[key] = totals.get(key, 0) + sign
+            ops = [
+                UpdateOne(_key_filter(key), {"$inc": {"violations": delta}, "$set": {"updated_at": datetime.utcnow()}}, upsert=True)
+                for key, delta in totals.items() if delta
+            ]
+            if ops:
+                TreatmentDailyStat._get_collection().bulk_write(ops, ordered=False)
+        except Exception as e:
+            print(f"❌ Error updating violation rollups: {str(e)}")
+
+    # -----------------------------------------------------
+    # Backfill
+    # -----------------------------------------------------
+    @staticmethod
+    def rebuild(since=None, batch_size=1000):
+        """Recompute rollups from raw treatments, from `since` (a day) onwards"""
+        since = RollupService.day(since)
+        query = {"treatment_start_date": {"$gte": since} if since else {"$ne": None}}
+
+        totals, names = {}, {}
+        scanned, batch = 0, []
+        cursor = DB.treatments.find(query, RAW_TREATMENT_FIELDS).batch_size(batch_size)
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                RollupService._accumulate(batch, totals, names)
+                scanned += len(batch)
+                batch = []
+        if batch:
+            RollupService._accumulate(batch, totals, names)
+            scanned += len(batch)
+
+        now = datetime.utcnow()
+        docs = [
+            {**_key_filter(key), **counters, "medicine_name": names.get(key[3]), "updated_at": now}
+            for key, counters in totals.items()
+        ]
+
+        # Live $inc writes landing between the delete and the insert are
+        # lost, so run this off-peak (or re-run it for the affected days).
+        collection = TreatmentDailyStat._get_collection()
+        collection.delete_many({"date": {"$gte": since}} if since else {})
+        for start in range(0, len(docs), batch_size):
+            collection.insert_many(docs[start:start + batch_size], ordered=False)
+
+        print(f"[ROLLUP] rebuilt {len(docs)} rollup documents from {scanned} treatments")
+        return {"treatments": scanned, "documents": len(docs)}
+
+    @staticmethod
+    def _accumulate(batch, totals, names):
+        # One lookup per referenced collection for the whole batch
+        farmer_ids = {d.get("farmer") for d in batch}
+        animal_ids = {d.get("animal") for d in batch}
+        medicine_ids = {m for d in batch for m in d.get("medicines") or []}
+
+        districts = {f["_id"]: f.get("district") for f in DB.farmers.find({"_id": {"$in": list(farmer_ids)}}, {"district": 1})}
+        species = {a["_id"]: a.get("species") for a in DB.animals.find({"_id": {"$in": list(animal_ids)}}, {"species": 1})}
+        medicines = {
+            m["_id"]: (RollupService.medicine_key(m.get("authorized_medicine"), m.get("name")), m.get("name"))
+            for m in DB.db.medicines.find({"_id": {"$in": list(medicine_ids)}}, {"authorized_medicine": 1, "name": 1})
+        }
+
+        for doc in batch:
+            state = RollupService._state(
+                doc.get("treatment_start_date"),
+                districts.get(doc.get("farmer")),
+                species.get(doc.get("animal")),
+                doc.get("vet"),
+                doc.get("is_flagged_violation"),
+                [medicines[m] for m in doc.get("medicines") or [] if m in medicines]
+            )
+            RollupService._add(totals, names, state, 1)
+
+    # -----------------------------------------------------
+    # Reads
+    # -----------------------------------------------------
+    @staticmethod
+    def monthly_totals(since, max_time_ms=None):
+        """Treatments and violations per calendar month since `since`"""
+        return list(TreatmentDailyStat._get_collection().aggregate([
+            {"$match": {"medicine": ALL_MEDICINES, "date": {"$gte": RollupService.day(since)}}},
+            {"$group": {
+                "_id": {"year": {"$year": "$date"}, "month": {"$month": "$date"}},
+                "treatments": {"$sum": "$treatments"},
+                "violations": {"$sum": "$violations"}
+            }},
+            {"$sort": {"_id.year": 1, "_id.month": 1}}
+        ], **_time_limit(max_time_ms)))
+
+    @staticmethod
+    def treatments_on(day, max_time_ms=None):
+        """Treatments started on one day"""
+        result = list(TreatmentDailyStat._get_collection().aggregate([
+            {"$match": {"medicine": ALL_MEDICINES, "date": RollupService.day(day)}},
+            {"$group": {"_id": None, "treatments": {"$sum": "$treatments"}}}
+        ], **_time_limit(max_time_ms)))
+        return result[0]["treatments"] if result else 0
+
+    @staticmethod
+    def daily_vet_visits(since, max_time_ms=None):
+        """Treatments attended by a vet, per day since `since`"""
+        return list(TreatmentDailyStat._get_collection().aggregate([
+            {"$match": {"medicine": ALL_MEDICINES, "vet": {"$ne": None}, "date": {"$gte": RollupService.day(since)}}},
+            {"$group": {"_id": "$date", "visits": {"$sum": "$treatments"}}},
+            {"$sort": {"_id": 1}}
+        ], **_time_limit(max_time_ms)))
+
+    @staticmethod
+    def medicine_totals(limit=10, max_time_ms=None):
+        """Most prescribed medicines, all time"""
+        return list(TreatmentDailyStat._get_collection().aggregate([
+            {"$match": {"medicine": {"$ne": ALL_MEDICINES}}},
+            {"$group": {
+                "_id": "$medicine",
+                "name": {"$first": "$medicine_name"},
+                "count": {"$sum": "$prescriptions"}
+            }},
+            {"$match": {"count": {"$gt": 0}}},
+            {"$sort": {"count": -1}},
+            {"$limit": limit}
+        ], **_time_limit(max_time_ms)))
+
+
+def _ref_id(value):
+    """ObjectId behind a raw reference value (ObjectId, DBRef or Document)"""
+    return getattr(value, "id", value)
+
+
+def _time_limit(max_time_ms):
+    return {"maxTimeMS": max_time_ms} if max_time_ms else {}
+
+
+def _key_filter(key):
+    date, district, species, medicine, vet = key
+    return {"date": date, "district": district, "species": species, "medicine": medicine, "vet": vet}
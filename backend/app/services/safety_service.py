@@ -0,0 +1,104 @@
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.db import DB
+from app.services.qr_service import QRService
+from app.services.unsafe_farmers import UnsafeFarmers
+
+SAFE = "Safe"
+UNDER_WITHDRAWAL = "Under Withdrawal"
+NOT_FOUND = "Not Found"
+INVALID = "Invalid"
+
+
+class SafetyService:
+    """
+    Consumer safety checks, for one farmer or many at once (milk
+    collection centres), by farmer ID or QR badge token.
+
+    Answers come from the worker's UnsafeFarmers map. Without it, a batch
+    costs a fixed number of queries whatever its size: one for the
+    farmers that exist, one grouping active withdrawals by farmer, and
+    one by animal when animal badges were scanned. Both groupings walk
+    the (farmer|animal, withdrawal_ends_on) indexes.
+    """
+
+    @staticmethod
+    def parse(ref):
+        """(farmer ObjectId, animal ObjectId or None) for an ID or badge token, or None"""
+        if ObjectId.is_valid(ref):
+            return ObjectId(ref), None
+        resolved = QRService.resolve(ref)
+        if not resolved or not ObjectId.is_valid(resolved[0]):
+            return None
+        farmer_id, animal_id = resolved
+        return ObjectId(farmer_id), ObjectId(animal_id) if animal_id and ObjectId.is_valid(animal_id) else None
+
+    @staticmethod
+    def query(parsed, now):
+        """
+        (existing farmer IDs, {farmer: safe_after}, {animal: safe_after})
+        for parsed (farmer, animal) pairs, where safe_after is the latest
+        withdrawal end still in the future
+        """
+        if not parsed:
+            return set(), {}, {}
+        farmer_ids = {f for f, _ in parsed}
+        known = {d["_id"] for d in DB.farmers.find({"_id": {"$in": list(farmer_ids)}}, {"_id": 1})}
+
+        def latest_withdrawal(field, ids):
+            if not ids:
+                return {}
+            return {
+                row["_id"]: row["safe_after"]
+                for row in DB.treatments.aggregate([
+                    {"$match": {field: {"$in": list(ids)}, "withdrawal_ends_on": {"$gt": now}}},
+                    {"$group": {"_id": f"${field}", "safe_after": {"$max": "$withdrawal_ends_on"}}},
+                ])
+            }
+
+        return (
+            known,
+            latest_withdrawal("farmer", {f for f, a in parsed if not a}),
+            latest_withdrawal("animal", {a for _, a in parsed if a})
+        )
+
+    @staticmethod
+    def assemble(refs, parsed, known, farmer_until, animal_until):
+        results = []
+        for ref in refs:
+            ids = parsed.get(ref)
+            if ids is None:
+                results.append({"id": ref, "status": INVALID, "safe_after": None})
+                continue
+
+            farmer_id, animal_id = ids
+            result = {"id": ref, "farmer_id": str(farmer_id)}
+            if animal_id:
+                result["animal_id"] = str(animal_id)
+
+            if farmer_id not in known:
+                result.update(status=NOT_FOUND, safe_after=None)
+            else:
+                until = animal_until.get(animal_id) if animal_id else farmer_until.get(farmer_id)
+                result.update(
+                    status=UNDER_WITHDRAWAL if until else SAFE,
+                    safe_after=until.isoformat() + "Z" if until else None
+                )
+            results.append(result)
+        return results
+
+    @staticmethod
+    def check_many(refs, now=None):
+        """Status and safe_after per ref (farmer ID or badge token), in request order"""
+        parsed = {}
+        for ref in set(refs):
+            ids = SafetyService.parse(ref)
+            if ids is not None:
+                parsed[ref] = ids
+
+        pairs, now = set(parsed.values()), now or datetime.utcnow()
+        found = UnsafeFarmers.lookup(pairs, now) if pairs else None
+        known, farmer_until, animal_until = found if found is not None else SafetyService.query(pairs, now)
+        return SafetyService.assemble(refs, parsed, known, farmer_until, animal_until)
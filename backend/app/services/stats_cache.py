@@ -0,0 +1,117 @@
+import threading
+import time
+from datetime import datetime
+
+from app.config import Config
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.deadline import deadline
+from app.utils.fanout import fan_out, FanOutTimeout
+
+
+class StatsUnavailable(Exception):
+    """Raised when a statistic can neither be computed nor served from cache"""
+
+    def __init__(self, names, retry_after=0):
+        self.names = list(names)
+        self.retry_after = retry_after
+        super().__init__(f"Statistics unavailable: {', '.join(self.names)}")
+
+
+class StatResult:
+    def __init__(self, value, computed_at, stale):
+        self.value = value
+        self.computed_at = computed_at
+        self.stale = stale
+
+    def meta(self):
+        return {"as_of": _iso(self.computed_at), "stale": self.stale}
+
+
+class StatsCache:
+    """
+    Last-known-good results for the authority dashboard.
+
+    A statistic is recomputed at most once every DASHBOARD_STATS_FRESH_SECONDS.
+    When the database errors, times out (every dashboard query runs with
+    maxTimeMS) or the circuit breaker is open, the previous real result is
+    served with stale=True and the time it was computed, for up to
+    DASHBOARD_STATS_MAX_STALE_SECONDS. With nothing cached, StatsUnavailable
+    is raised so the route can answer 503 instead of inventing numbers.
+    """
+
+    _lock = threading.Lock()
+    _entries = {}   # name → (value, computed_at)
+
+    breaker = CircuitBreaker(
+        "dashboard-db",
+        failure_threshold=Config.DASHBOARD_BREAKER_FAILURES,
+        reset_seconds=Config.DASHBOARD_BREAKER_RESET_SECONDS
+    )
+
+    @classmethod
+    def get(cls, name, compute):
+        now = time.time()
+        entry = cls._entries.get(name)
+        if entry and now - entry[1] < Config.DASHBOARD_STATS_FRESH_SECONDS:
+            return StatResult(entry[0], entry[1], stale=False)
+
+        if cls.breaker.allow():
+            try:
+                # Each statistic gets its own slice, capped by the request budget
+                with deadline(Config.DASHBOARD_QUERY_TIMEOUT_MS / 1000):
+                    value = compute()
+            except Exception as e:
+                cls.breaker.record_failure()
+                print(f"❌ Error computing dashboard stat '{name}': {str(e)}")
+            else:
+                cls.breaker.record_success()
+                computed_at = time.time()
+                with cls._lock:
+                    cls._entries[name] = (value, computed_at)
+                return StatResult(value, computed_at, stale=False)
+
+        if entry and now - entry[1] < Config.DASHBOARD_STATS_MAX_STALE_SECONDS:
+            return StatResult(entry[0], entry[1], stale=True)
+        raise StatsUnavailable([name], cls.breaker.retry_after())
+
+    @classmethod
+    def get_many(cls, computes):
+        """
+        Resolve several statistics for one composite response, concurrently.
+        Returns (values, meta); a statistic that is unavailable is None in
+        values and listed in meta["unavailable"]. Raises StatsUnavailable
+        only when none of them could be served.
+        """
+        calls = {
+            name: (lambda name=name, compute=compute: cls.get(name, compute))
+            for name, compute in computes.items()
+        }
+        # get() bounds each query; the wait is only a backstop for the response
+        served, errors = fan_out(calls, timeout=Config.DASHBOARD_QUERY_TIMEOUT_MS / 1000)
+        for name, error in errors.items():
+            if not isinstance(error, (StatsUnavailable, FanOutTimeout)):
+                print(f"❌ Error resolving dashboard stat '{name}': {str(error)}")
+
+        values = {name: served[name].value if name in served else None for name in computes}
+        results = list(served.values())
+        unavailable = [name for name in computes if name not in served]
+
+        if not results:
+            raise StatsUnavailable(unavailable, cls.breaker.retry_after())
+
+        meta = {
+            "as_of": _iso(min(r.computed_at for r in results)),
+            "stale": any(r.stale for r in results)
+        }
+        if unavailable:
+            meta["unavailable"] = unavailable
+        return values, meta
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._entries = {}
+
+
+def _iso(timestamp):
+    return datetime.utcfromtimestamp(timestamp).isoformat() + "Z"
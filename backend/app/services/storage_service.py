@@ -2,6 +2,8 @@ import os
 import uuid
 import requests
 
+from app.utils.deadline import http_timeout
+
 class StorageService:
     def __init__(self):
         self.url = os.getenv("SUPABASE_URL")
@@ -22,7 +24,8 @@ class StorageService:
         response = requests.post(
             upload_url,
             headers={**self.headers, "Content-Type": content_type},
-            data=file_bytes
+            data=file_bytes,
+            timeout=http_timeout()
         )
 
         if response.status_code not in (200, 201):
@@ -41,7 +44,8 @@ class StorageService:
         res = requests.post(
             signed_url_endpoint,
             headers=self.headers,
-            json=data
+            json=data,
+            timeout=http_timeout()
         )
 
         if res.status_code != 200:
@@ -0,0 +1,269 @@
+from datetime import datetime, timedelta, timezone
+
+from mongoengine.queryset.visitor import Q
+from mongoengine.errors import ValidationError, NotUniqueError
+
+from app.config import Config
+from app.models.farmers import Farmer
+from app.models.vets import Vet
+from app.models.animals import Animal
+from app.models.treatments import Treatment, MedicineDetail
+from app.models.authorized_medicine import AuthorizedMedicine
+from app.services.dispatch_service import DispatchService
+from app.services.rollup_service import RollupService
+from app.utils.serializer import SerializerMixin
+from app.utils.tokens import sign_token, load_token
+
+SYNC_TOKEN_SALT = "dfms-sync"
+
+# Same whitelist the /animals PUT route accepts
+ANIMAL_SYNC_FIELDS = [
+    "species", "breed", "gender", "age", "weight",
+    "is_lactating", "daily_milk_yield", "pregnancy_status",
+    "profile_photo_path", "additional_image_paths"
+]
+
+
+class SyncConflict(Exception):
+    def __init__(self, server_doc):
+        super().__init__("Record changed on server")
+        self.server_doc = server_doc
+
+
+class SyncService:
+    """
+    Delta sync for the offline-first mobile app.
+
+    Clients keep the opaque token returned by pull() and send it back
+    next time; only records whose updated_at moved past the token's
+    timestamp are returned. Offline edits are pushed in batches and
+    applied with optimistic concurrency on updated_at.
+    """
+
+    # -----------------------------------------------------
+    # Tokens
+    # -----------------------------------------------------
+    @staticmethod
+    def issue_token(user_id, server_time):
+        return sign_token(
+            {"uid": str(user_id), "ts": server_time.isoformat()},
+            SYNC_TOKEN_SALT
+        )
+
+    @staticmethod
+    def read_token(token, user_id):
+        """Return the datetime a token was issued at, or None for a full sync"""
+        if not token:
+            return None
+
+        max_age = Config.SYNC_TOKEN_MAX_AGE_DAYS * 24 * 3600
+        payload = load_token(token, SYNC_TOKEN_SALT, max_age=max_age)
+        if not payload or payload.get("uid") != str(user_id):
+            return None
+
+        try:
+            return datetime.fromisoformat(payload["ts"])
+        except (KeyError, ValueError):
+            return None
+
+    # -----------------------------------------------------
+    # Pull
+    # -----------------------------------------------------
+    @staticmethod
+    def resolve_user(user_id):
+        farmer = Farmer.objects(id=user_id).first()
+        if farmer:
+            return "farmer", farmer
+        vet = Vet.objects(id=user_id).first()
+        if vet:
+            return "vet", vet
+        return None, None
+
+    @staticmethod
+    def pull(role, user, since):
+        # Capture the clock before querying so nothing written while
+        # we read can fall between this token and the next one.
+        server_time = datetime.utcnow()
+
+        changed = {}
+        if since is not None:
+            # Overlap slightly: updated_at is stamped by the app before the
+            # write lands, so a concurrent save can carry an older time.
+            changed = {"updated_at__gt": since - timedelta(seconds=Config.SYNC_CLOCK_SKEW_SECONDS)}
+
+        if role == "farmer":
+            treatments = Treatment.objects(farmer=user, **changed)
+            animals = Animal.objects(farmer=user, **changed)
+        else:
+            treatments = Treatment.objects(Q(vet=user) | Q(status="pending"), **changed)
+            animal_ids = Treatment._get_collection().distinct("animal", {"vet": user.id})
+            animals = Animal.objects(id__in=animal_ids, **changed)
+
+        treatments = list(treatments.no_dereference())
+        medicines = list(AuthorizedMedicine.objects(**changed))
+
+        return {
+            "sync_token": SyncService.issue_token(user.id, server_time),
+            "server_time": server_time.isoformat(),
+            "full_sync": since is None,
+            "animals": [SerializerMixin.to_json(a) for a in animals.no_dereference()],
+            "treatments": SyncService._serialize_treatments(treatments),
+            "medicines": [SyncService._serialize_medicine(m) for m in medicines],
+            # The catalog is small; ids let the client drop deleted medicines
+            "medicine_ids": [str(i) for i in AuthorizedMedicine.objects.scalar("id")]
+        }
+
+    @staticmethod
+    def _serialize_treatments(treatments):
+        """Inline prescribed medicines with one batched lookup"""
+        result = [SerializerMixin.to_json(t) for t in treatments]
+
+        medicine_ids = {m for data in result for m in data.get("medicines", [])}
+        details = {}
+        if medicine_ids:
+            for d in MedicineDetail.objects(id__in=list(medicine_ids)):
+                details[str(d.id)] = SerializerMixin.to_json(d)
+
+        for data in result:
+            data["medicines"] = [details[m] for m in data.get("medicines", []) if m in details]
+        return result
+
+    @staticmethod
+    def _serialize_medicine(m):
+        return {
+            "_id": str(m.id),
+            "name": m.name,
+            "dosage": m.dosage,
+            "route": m.route,
+            "frequency": m.frequency,
+            "duration_days": m.duration_days,
+            "withdrawal_period_days": m.withdrawal_period_days,
+            "updated_at": m.updated_at.isoformat() if m.updated_at else None
+        }
+
+    # -----------------------------------------------------
+    # Push
+    # -----------------------------------------------------
+    @staticmethod
+    def push(role, user, mutations):
+        results = []
+        for mutation in mutations:
+            client_id = mutation.get("client_id")
+            try:
+                record = SyncService._apply(role, user, mutation)
+                results.append({"client_id": client_id, "status": "applied", "record": record})
+            except SyncConflict as conflict:
+                results.append({"client_id": client_id, "status": "conflict", "server": conflict.server_doc})
+            except (ValueError, PermissionError, ValidationError, NotUniqueError) as e:
+                results.append({"client_id": client_id, "status": "rejected", "error": str(e)})
+        return results
+
+    @staticmethod
+    def _apply(role, user, mutation):
+        collection = mutation.get("collection")
+        op = mutation.get("op")
+        data = mutation.get("data") or {}
+
+        if role != "farmer":
+            raise PermissionError("Only farmers can push offline changes")
+
+        if collection == "animals" and op == "create":
+            return SyncService._create_animal(user, data)
+        if collection == "animals" and op == "update":
+            return SyncService._update_animal(user, mutation.get("id"), mutation.get("base_updated_at"), data)
+        if collection == "treatments" and op == "create":
+            return SyncService._create_treatment_request(user, data)
+
+        raise ValueError(f"Unsupported mutation: {collection}/{op}")
+
+    @staticmethod
+    def _create_animal(farmer, data):
+        required_fields = ["species", "breed", "gender", "tag_number"]
+        if not all(data.get(f) for f in required_fields):
+            raise ValueError("Missing required fields")
+
+        if Animal.objects(tag_number=data["tag_number"]).first():
+            raise ValueError("Tag number already exists")
+
+        animal = Animal(farmer=farmer, tag_number=data["tag_number"])
+        for field in ANIMAL_SYNC_FIELDS:
+            if field in data:
+                setattr(animal, field, data[field])
+        animal.save()
+        return SerializerMixin.to_json(animal)
+
+    @staticmethod
+    def _update_animal(farmer, animal_id, base_updated_at, data):
+        if not animal_id or not base_updated_at:
+            raise ValueError("id and base_updated_at are required for updates")
+
+        try:
+            base = _naive_utc(datetime.fromisoformat(base_updated_at.replace("Z", "+00:00")))
+        except (AttributeError, ValueError):
+            raise ValueError("base_updated_at must be an ISO 8601 timestamp")
+
+        animal = Animal.objects(id=animal_id).first()
+        if not animal:
+            raise ValueError("Animal not found")
+        if str(animal.farmer.id) != str(farmer.id):
+            raise PermissionError("Not allowed to update this animal")
+
+        if animal.updated_at and animal.updated_at > base:
+            raise SyncConflict(SerializerMixin.to_json(animal))
+
+        updates = {f: data[f] for f in ANIMAL_SYNC_FIELDS if f in data}
+        for field, value in updates.items():
+            setattr(animal, field, value)
+        animal.validate()
+
+        # Guard on the updated_at we read so a concurrent write wins cleanly
+        now = datetime.utcnow()
+        sets = {f"set__{f}": v for f, v in updates.items()}
+        applied = Animal.objects(id=animal.id, updated_at=animal.updated_at).update_one(
+            set__updated_at=now, **sets
+        )
+        if not applied:
+            raise SyncConflict(SerializerMixin.to_json(Animal.objects(id=animal.id).first()))
+
+        animal.reload()
+        return SerializerMixin.to_json(animal)
+
+    @staticmethod
+    def _create_treatment_request(farmer, data):
+        required_fields = ["animal_id", "symptoms", "diagnosis"]
+        if not all(data.get(f) for f in required_fields):
+            raise ValueError("Missing fields")
+
+        animal = Animal.objects(id=data["animal_id"], farmer=farmer).first()
+        if not animal:
+            raise ValueError("Animal not found")
+
+        treatment = Treatment(
+            farmer=farmer,
+            animal=animal,
+            diagnosis=data["diagnosis"],
+            symptoms=data.get("symptoms", []),
+            notes=data.get("notes"),
+            medicines=[],
+            status="pending"
+        ).save()
+
+        Animal.objects(id=animal.id).update_one(
+            push__treatment_ids=str(treatment.id),
+            set__updated_at=datetime.utcnow()
+        )
+        RollupService.record(None, RollupService.snapshot(treatment))
+
+        try:
+            DispatchService.enqueue(treatment, urgency=data.get("urgency"))
+        except Exception as e:
+            print(f"❌ Error enqueueing treatment {treatment.id} for dispatch: {str(e)}")
+
+        return SerializerMixin.to_json(treatment)
+
+
+def _naive_utc(value):
+    """Stored timestamps are naive UTC; clients may send an offset or Z"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
@@ -0,0 +1,152 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from app.config import Config
+from app.db import DB
+
+# Re-read this far before the watermark: updated_at is stamped before the write lands
+WATERMARK_OVERLAP = timedelta(seconds=30)
+
+
+class UnsafeFarmers:
+    """
+    Process-local map of the farmers currently under withdrawal, so the
+    public safety checks are answered from memory.
+
+    Only unsafe farmers are kept, as {farmer: {animal: withdrawal end}};
+    anyone missing is safe. The map is built from one aggregation over
+    active withdrawals at warm-up, then kept current by a delta poll at
+    most every SAFETY_MAP_POLL_SECONDS: farmers with treatments written
+    since the last poll are recomputed on the (farmer, withdrawal_ends_on)
+    index. Entries read as safe once their withdrawal end passes, and each
+    poll drops them. lookup() only reads the map.
+
+    When the map cannot be built, or polls have failed for longer than
+    SAFETY_MAP_MAX_STALE_SECONDS, lookup() returns None and callers read
+    Mongo instead.
+    """
+
+    _lock = threading.Lock()
+    _unsafe = {}
+    _watermark = None
+    _fresh_at = None     # time.monotonic() of the last successful build/poll
+    _polled_at = 0.0
+
+    # Farmers confirmed to exist (they are never deleted), oldest dropped first past the bound
+    _known = OrderedDict()
+    _known_lock = threading.Lock()
+
+    # -----------------------------------------------------
+    # Loading
+    # -----------------------------------------------------
+    @classmethod
+    def ensure_fresh(cls):
+        if time.monotonic() - cls._polled_at < Config.SAFETY_MAP_POLL_SECONDS:
+            return
+        # One thread refreshes; the others keep answering from the current map
+        if not cls._lock.acquire(blocking=False):
+            return
+        try:
+            if time.monotonic() - cls._polled_at < Config.SAFETY_MAP_POLL_SECONDS:
+                return
+            cls._polled_at = time.monotonic()
+            if cls._fresh_at is None:
+                cls._build()
+            else:
+                cls._poll()
+            cls._fresh_at = time.monotonic()
+        except Exception as e:
+            print(f"❌ Error refreshing unsafe-farmer map: {str(e)}")
+        finally:
+            cls._lock.release()
+
+    @classmethod
+    def _build(cls):
+        started = datetime.utcnow()
+        cls._unsafe = withdrawals({}, started)
+        cls._watermark = started
+        print(f"[SAFETY] unsafe-farmer map built: {len(cls._unsafe)} farmers under withdrawal")
+
+    @classmethod
+    def _poll(cls):
+        started = datetime.utcnow()
+        changed = DB.treatments.distinct("farmer", {"updated_at": {"$gte": cls._watermark - WATERMARK_OVERLAP}})
+        if changed:
+            current = withdrawals({"farmer": {"$in": changed}}, started)
+            # Per-farmer assignments, so readers never see a half-updated map
+            for farmer in changed:
+                if farmer in current:
+                    cls._unsafe[farmer] = current[farmer]
+                else:
+                    cls._unsafe.pop(farmer, None)
+        # Farmers whose every withdrawal has ended; lookup() already answers them as safe
+        for farmer, animals in list(cls._unsafe.items()):
+            if max(animals.values()) <= started:
+                cls._unsafe.pop(farmer, None)
+        cls._watermark = started
+
+    @classmethod
+    def record(cls, farmer_id, animal_id, withdrawal_ends_on):
+        """Apply a treatment this worker just wrote, ahead of the next poll"""
+        if cls._fresh_at is None or not withdrawal_ends_on or withdrawal_ends_on <= datetime.utcnow():
+            return
+        animals = dict(cls._unsafe.get(farmer_id, {}))
+        animals[animal_id] = max(withdrawal_ends_on, animals.get(animal_id, withdrawal_ends_on))
+        cls._unsafe[farmer_id] = animals
+
+    # -----------------------------------------------------
+    # Reads
+    # -----------------------------------------------------
+    @classmethod
+    def lookup(cls, parsed, now):
+        """
+        Same answer as SafetyService.query for (farmer, animal) pairs,
+        from memory, or None when the map is unavailable or too stale
+        """
+        cls.ensure_fresh()
+        if cls._fresh_at is None or time.monotonic() - cls._fresh_at > Config.SAFETY_MAP_MAX_STALE_SECONDS:
+            return None
+
+        farmer_until, animal_until = {}, {}
+        for farmer, animal in parsed:
+            animals = cls._unsafe.get(farmer)
+            if not animals:
+                continue
+            if max(animals.values()) <= now:
+                # Every withdrawal has ended; the refresher drops the entry under its lock
+                continue
+            until = animals.get(animal) if animal else max(animals.values())
+            if until and until > now:
+                (animal_until if animal else farmer_until)[animal or farmer] = until
+
+        return cls._existing({f for f, _ in parsed}), farmer_until, animal_until
+
+    @classmethod
+    def _existing(cls, farmer_ids):
+        known = {f for f in farmer_ids if f in cls._known or f in cls._unsafe}
+        missing = farmer_ids - known
+        if missing:
+            found = {d["_id"] for d in DB.farmers.find({"_id": {"$in": list(missing)}}, {"_id": 1})}
+            with cls._known_lock:
+                for farmer in found:
+                    cls._known[farmer] = True
+                while len(cls._known) > Config.SAFETY_KNOWN_FARMERS_SIZE:
+                    cls._known.popitem(last=False)
+            known |= found
+        return known
+
+
+def withdrawals(match, now):
+    """{farmer: {animal: latest withdrawal end}} for treatments still in withdrawal"""
+    unsafe = {}
+    for row in DB.treatments.aggregate([
+        {"$match": dict(match, withdrawal_ends_on={"$gt": now})},
+        {"$group": {
+            "_id": {"farmer": "$farmer", "animal": "$animal"},
+            "until": {"$max": "$withdrawal_ends_on"}
+        }},
+    ]):
+        unsafe.setdefault(row["_id"]["farmer"], {})[row["_id"]["animal"]] = row["until"]
+    return unsafe
@@ -0,0 +1,174 @@
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from app.db import DB
+from app.services.rollup_service import RollupService
+
+FLAGGED = {"is_flagged_violation": True}
+
+
+class ViolationService:
+    """
+    Flags and unflags treatments, keeping Farmer.violation_count in step.
+
+    A farmer's counter is the number of their treatments currently flagged.
+    It changes only when a treatment's flag actually flips, so repeated or
+    concurrent flag calls cannot double count. recount() rebuilds every
+    counter from the flagged treatments, over the partial index, and
+    reconciles any drift.
+    """
+
+    @staticmethod
+    def flag(treatment, reason=None):
+        """An authority flags a treatment; False if it already was flagged"""
+        return ViolationService._set_flag(treatment, True, reason)
+
+    @staticmethod
+    def unflag(treatment):
+        """An authority clears a treatment's flag; False if it was not set"""
+        return ViolationService._set_flag(treatment, False, None)
+
+    @staticmethod
+    def _set_flag(treatment, flagged, reason):
+        before = RollupService.snapshot(treatment)
+        # Always records the authority's decision; the returned old flag
+        # tells whether the counters move
+        previous = DB.treatments.find_one_and_update(
+            {"_id": treatment.id},
+            {"$set": {
+                "is_flagged_violation": flagged,
+                "violation_reason": reason,
+                "violation_source": "authority",
+                "violation_rules": [],
+                "updated_at": datetime.utcnow()
+            }},
+            projection={"is_flagged_violation": 1}
+        )
+        if previous is None or bool(previous.get("is_flagged_violation")) == flagged:
+            return False
+
+        farmer_id = treatment._data.get("farmer")
+        ViolationService._count({getattr(farmer_id, "id", farmer_id): 1 if flagged else -1})
+
+        treatment.reload()
+        RollupService.record(before, RollupService.snapshot(treatment))
+        return True
+
+    @staticmethod
+    def apply(changes):
+        """
+        Write flag decisions made in bulk by the compliance rules:
+        [{"treatment": raw doc, "flagged", "rules", "reason", "rollup": (date, district, species, vet)}].
+        Treatments an authority has ruled on are left alone. Returns the
+        number of treatments written.
+        """
+        if not changes:
+            return 0
+
+        now = datetime.utcnow()
+        ops, farmer_deltas, flips = [], {}, []
+        for change in changes:
+            doc = change["treatment"]
+            ops.append(UpdateOne(
+                {"_id": doc["_id"], "violation_source": {"$ne": "authority"}},
+                {"$set": {
+                    "is_flagged_violation": change["flagged"],
+                    "violation_reason": change["reason"],
+                    "violation_source": "rules" if change["flagged"] else None,
+                    "violation_rules": change["rules"],
+                    "updated_at": now
+                }}
+            ))
+            if bool(doc.get("is_flagged_violation")) != change["flagged"]:
+                sign = 1 if change["flagged"] else -1
+                farmer_deltas[doc.get("farmer")] = farmer_deltas.get(doc.get("farmer"), 0) + sign
+                flips.append(change["rollup"] + (sign,))
+
+        result = DB.treatments.bulk_write(ops, ordered=False)
+        # A treatment changed concurrently can make these drift slightly;
+        # recount() and rebuild-rollups reconcile
+        ViolationService._count(farmer_deltas)
+        RollupService.record_flags(flips)
+        return result.modified_count
+
+    @staticmethod
+    def _count(farmer_deltas):
+        ops = [
+            UpdateOne({"_id": farmer_id}, {"$inc": {"violation_count": delta}})
+            for farmer_id, delta in farmer_deltas.items() if farmer_id and delta
+        ]
+        if ops:
+            DB.farmers.bulk_write(ops, ordered=False)
+
+    # -----------------------------------------------------
+    # Reads
+    # -----------------------------------------------------
+    @staticmethod
+    def farm_safety(max_time_ms=None):
+        """
+        Active farms (with at least one active animal) split into safe and
+        unsafe. Unsafe farms are active farms with a flagged treatment, the
+        same set /violations lists. Both counts come from the counters'
+        partial indexes, so neither grows with the number of farms.
+        """
+        options = {"maxTimeMS": max_time_ms} if max_time_ms else {}
+        active = DB.farmers.count_documents({"active_animals": {"$gt": 0}}, **options)
+        unsafe = DB.farmers.count_documents(
+            {"violation_count": {"$gt": 0}, "active_animals": {"$gt": 0}}, **options
+        )
+        return {
+            "safe": active - unsafe,
+            "unsafe": unsafe
+        }
+
+    # -----------------------------------------------------
+    # Reconciliation
+    # -----------------------------------------------------
+    @staticmethod
+    def recount(batch_size=1000):
+        """
+        Recompute every farmer's violation_count from flagged treatments and
+        active_animals from active animals
+        """
+        counts = {
+            doc["_id"]: doc["count"] for doc in DB.treatments.aggregate([
+                {"$match": FLAGGED},
+                {"$group": {"_id": "$farmer", "count": {"$sum": 1}}}
+            ])
+        }
+        updated, cleared = ViolationService._reconcile("violation_count", counts, batch_size)
+
+        animals = {
+            doc["_id"]: doc["count"] for doc in DB.animals.aggregate([
+                {"$match": {"is_active": True}},
+                {"$group": {"_id": "$farmer", "count": {"$sum": 1}}}
+            ])
+        }
+        active_updated, active_cleared = ViolationService._reconcile("active_animals", animals, batch_size)
+
+        print(
+            f"[VIOLATIONS] {len(counts)} farmers with violations, {updated} updated, {cleared} cleared; "
+            f"{len(animals)} active farms, {active_updated + active_cleared} corrected"
+        )
+        return {
+            "farmers": len(counts), "updated": updated, "cleared": cleared,
+            "active_farms": len(animals), "active_corrected": active_updated + active_cleared
+        }
+
+    @staticmethod
+    def _reconcile(field, counts, batch_size):
+        """Set `field` to the counts given, and to 0 on farmers not among them"""
+        ops = [
+            UpdateOne({"_id": farmer_id, field: {"$ne": count}}, {"$set": {field: count}})
+            for farmer_id, count in counts.items()
+        ]
+        updated = 0
+        for start in range(0, len(ops), batch_size):
+            updated += DB.farmers.bulk_write(ops[start:start + batch_size], ordered=False).modified_count
+
+        cleared = DB.farmers.update_many(
+            {field: {"$gt": 0}, "_id": {"$nin": list(counts)}},
+            {"$set": {field: 0}}
+        ).modified_count
+        return updated, cleared
@@ -0,0 +1,76 @@
+import threading
+import time
+
+from pymongo.errors import ServerSelectionTimeoutError
+
+from app.db import DB
+
+# Set once this process has connected and warmed its caches
+_ready = threading.Event()
+
+
+def document_models():
+    """Every mongoengine Document whose indexes the app relies on"""
+    from app.models.amu_metrics import AmuMetric
+    from app.models.animals import Animal
+    from app.models.authorities import Authority
+    from app.models.authority_verifications import AuthorityVerification
+    from app.models.authorized_medicine import AuthorizedMedicine
+    from app.models.consumer_checks import ConsumerCheck
+    from app.models.farmers import Farmer
+    from app.models.request_flights import RequestFlight
+    from app.models.treatment_daily_stats import TreatmentDailyStat
+    from app.models.treatment_requests import TreatmentRequest
+    from app.models.treatments import Treatment, MedicineDetail
+    from app.models.vets import Vet
+    from app.models.withdrawal_alert import WithdrawalAlert
+
+    return [
+        AmuMetric, Animal, Authority, AuthorityVerification, AuthorizedMedicine, ConsumerCheck,
+        Farmer, MedicineDetail, RequestFlight, Treatment, TreatmentDailyStat,
+        TreatmentRequest, Vet, WithdrawalAlert
+    ]
+
+
+def ensure_indexes():
+    """Create missing indexes up front instead of on the first request that touches a model"""
+    started = time.monotonic()
+    for model in document_models():
+        try:
+            model.ensure_indexes()
+        except ServerSelectionTimeoutError as e:
+            print(f"❌ Cannot reach MongoDB, skipping index creation: {str(e)}")
+            return
+        except Exception as e:
+            print(f"❌ Error ensuring indexes for {model.__name__}: {str(e)}")
+    print(f"[STARTUP] indexes ensured in {time.monotonic() - started:.2f}s")
+
+
+def warm_up():
+    """
+    Open the Mongo pool and load in-process caches so the first requests
+    a worker serves do not pay for them. Marks the process ready.
+    """
+    from app.services.medicine_catalog import MedicineCatalog
+    from app.services.unsafe_farmers import UnsafeFarmers
+
+    started = time.monotonic()
+    try:
+        DB.client.admin.command("ping")
+        # Loads through both clients (raw pymongo and mongoengine)
+        MedicineCatalog.ensure_fresh()
+    except Exception as e:
+        # Stay not-ready; the readiness probe keeps the worker out of rotation
+        print(f"❌ Warm-up failed: {str(e)}")
+        return False
+
+    # Not fatal: safety checks read Mongo until the map builds on a later request
+    UnsafeFarmers.ensure_fresh()
+
+    _ready.set()
+    print(f"[STARTUP] worker warmed up in {time.monotonic() - started:.2f}s")
+    return True
+
+
+def is_ready():
+    return _ready.is_set()
@@ -0,0 +1,67 @@
+import threading
+import time
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing dependency for a while.
+
+    closed    → calls go through; `failure_threshold` consecutive failures open it
+    open      → calls are refused until `reset_seconds` have passed
+    half-open → a single probe call is let through; success closes the
+                breaker, failure opens it again
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+    def __init__(self, name, failure_threshold=5, reset_seconds=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_seconds:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def is_open(self):
+        """True while calls would be refused (does not claim the probe)"""
+        return self.state == self.OPEN or (self.state == self.HALF_OPEN and self._probing)
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    print(f"⚠️ Circuit '{self.name}' opened after {self._failures} failures")
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def retry_after(self):
+        """Seconds until the next probe is allowed"""
+        if self._opened_at is None:
+            return 0
+        return max(0, int(self.reset_seconds - (time.monotonic() - self._opened_at)) + 1)
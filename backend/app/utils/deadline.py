@@ -0,0 +1,137 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+import pymongo
+from flask import request, g, current_app, jsonify
+from pymongo.errors import PyMongoError
+
+from app.config import Config
+
+# Absolute time.monotonic() by which the current request must finish
+_deadline = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """The current request ran out of its time budget"""
+
+
+# -----------------------------------------------------------
+# Budget queries
+# -----------------------------------------------------------
+def remaining():
+    """Seconds left in the current budget, or None when there is none"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check():
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded()
+
+
+def http_timeout(default=None):
+    """
+    Timeout for an outbound HTTP call: the configured default, capped by
+    what is left of the request budget. Raises when nothing is left.
+    """
+    default = Config.HTTP_TIMEOUT_SECONDS if default is None else default
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded()
+    return min(default, left)
+
+
+@contextmanager
+def deadline(seconds):
+    """
+    Run a block within `seconds` (or within the enclosing budget, if that
+    ends sooner). Mongo operations inside it get the remaining time as
+    their client-side timeout, which pymongo also sends as maxTimeMS.
+    """
+    if seconds is None:
+        yield
+        return
+
+    outer = _deadline.get()
+    target = time.monotonic() + seconds
+    if outer is not None:
+        target = min(target, outer)
+
+    token = _deadline.set(target)
+    try:
+        with pymongo.timeout(max(target - time.monotonic(), 0.001)):
+            yield
+    finally:
+        _deadline.reset(token)
+
+
+# -----------------------------------------------------------
+# Per-route budgets
+# -----------------------------------------------------------
+def budget(seconds):
+    """
+    Declare a route's time budget in seconds (None disables it, e.g. for
+    streaming responses). Routes without one get REQUEST_BUDGET_SECONDS.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            return view(*args, **kwargs)
+        wrapper.request_budget = seconds
+        return wrapper
+    return decorator
+
+
+def deadline_exceeded_response(budget_seconds=None):
+    response = jsonify({
+        "status": "error",
+        "error": "deadline_exceeded",
+        "message": "The request took longer than its time budget; please retry",
+        "budget_ms": int(budget_seconds * 1000) if budget_seconds else None
+    })
+    response.status_code = 503
+    response.headers["Retry-After"] = "1"
+    return response
+
+
+def init_deadlines(app):
+    @app.before_request
+    def start_request_budget():
+        view = current_app.view_functions.get(request.endpoint)
+        seconds = getattr(view, "request_budget", Config.REQUEST_BUDGET_SECONDS)
+        g.request_budget = seconds
+        if seconds is None:
+            return
+        g.request_deadline = deadline(seconds)
+        g.request_deadline.__enter__()
+
+    @app.teardown_request
+    def end_request_budget(exc=None):
+        scope = g.pop("request_deadline", None)
+        if scope is not None:
+            scope.__exit__(None, None, None)
+
+    @app.errorhandler(DeadlineExceeded)
+    def handle_deadline_exceeded(error):
+        print(f"⏱️ Deadline exceeded on {request.method} {request.path}")
+        return deadline_exceeded_response(g.get("request_budget"))
+
+    @app.errorhandler(PyMongoError)
+    def handle_mongo_error(error):
+        if error.timeout:
+            print(f"⏱️ Database timeout on {request.method} {request.path}: {str(error)}")
+            return deadline_exceeded_response(g.get("request_budget"))
+        print(f"❌ Database error on {request.method} {request.path}: {str(error)}")
+        return jsonify({
+            "error": "Internal server error",
+            "message": "Database error"
+        }), 500
+
+    return app
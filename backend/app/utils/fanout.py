@@ -0,0 +1,79 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextvars import ContextVar, copy_context
+
+from app.config import Config
+from app.utils.deadline import remaining
+
+# Set inside pool workers, so a fan-out nested in another runs inline
+# instead of queueing behind (and deadlocking on) its own parent tasks
+_in_worker = ContextVar("fan_out_worker", default=False)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class FanOutTimeout(Exception):
+    """A fanned-out call did not finish within the fan-out's timeout"""
+
+
+def executor():
+    """Process-wide bounded pool, created on first use (after any fork)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=Config.FANOUT_MAX_WORKERS, thread_name_prefix="fan-out"
+                )
+    return _executor
+
+
+def _run_in_worker(func):
+    _in_worker.set(True)
+    return func()
+
+
+def fan_out(calls, timeout=None):
+    """
+    Run independent calls ({name: callable}) concurrently on the shared pool.
+
+    Each call sees the caller's context variables, so the request deadline
+    (and the Mongo timeout derived from it) still applies inside it. Waits
+    at most `timeout` seconds, capped by the request budget.
+
+    Returns (results, errors): a call that raised or did not finish in time
+    is missing from results and mapped to its exception (FanOutTimeout for
+    the latter) in errors. Nothing is raised.
+    """
+    results, errors = {}, {}
+
+    if _in_worker.get() or len(calls) <= 1:
+        for name, func in calls.items():
+            try:
+                results[name] = func()
+            except Exception as e:
+                errors[name] = e
+        return results, errors
+
+    left = remaining()
+    if left is not None:
+        timeout = left if timeout is None else min(timeout, left)
+
+    pool = executor()
+    futures = {
+        name: pool.submit(copy_context().run, _run_in_worker, func)
+        for name, func in calls.items()
+    }
+    wait(futures.values(), timeout=max(timeout, 0) if timeout is not None else None)
+
+    for name, future in futures.items():
+        if not future.done():
+            # Cannot be interrupted; its own maxTimeMS bounds it on the server
+            future.cancel()
+            errors[name] = FanOutTimeout(name)
+        elif future.exception() is not None:
+            errors[name] = future.exception()
+        else:
+            results[name] = future.result()
+    return results, errors
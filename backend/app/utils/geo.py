@@ -0,0 +1,18 @@
+def point_from_gps(gps):
+    """
+    Convert an embedded GPSLocation (or a plain {"lat", "lng"} dict) into
+    GeoJSON coordinates [lng, lat]. Returns None when incomplete.
+    """
+    if gps is None:
+        return None
+
+    lat = gps.get("lat") if isinstance(gps, dict) else getattr(gps, "lat", None)
+    lng = gps.get("lng") if isinstance(gps, dict) else getattr(gps, "lng", None)
+    if lat is None or lng is None:
+        return None
+
+    lat, lng = float(lat), float(lng)
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    return [lng, lat]
+
@@ -0,0 +1,147 @@
+import gzip
+import hashlib
+from datetime import datetime
+from functools import wraps
+
+from flask import request, make_response
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+
+from app.config import Config
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "text/csv",
+    "text/html",
+    "text/plain",
+    "image/svg+xml",
+)
+
+# Used when a route does not declare its own policy: clients may keep a
+# copy but must revalidate it (cheap thanks to the ETag/304 handshake).
+DEFAULT_CACHE_CONTROL = "private, no-cache"
+
+
+# -----------------------------------------------------------
+# Per-route decorators
+# -----------------------------------------------------------
+def cache_control(policy):
+    """Attach a Cache-Control policy to a view, e.g. "public, max-age=300"."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            response = make_response(view(*args, **kwargs))
+            # Errors are never cached, and a view may tighten the policy itself
+            if response.status_code in (200, 304) and "Cache-Control" not in response.headers:
+                response.headers["Cache-Control"] = policy
+            return response
+        return wrapper
+    return decorator
+
+
+def conditional(version_func):
+    """
+    Answer If-None-Match before the view runs.
+
+    version_func returns a cheap version stamp for the data behind the
+    route (a datetime or any string, or None when it cannot tell). When
+    the client already holds that version, a 304 is sent without running
+    the view or serializing its body. The ETag includes the caller's JWT
+    identity, so one user's tag never validates another user's copy.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            version = version_func()
+            if version is None:
+                # No cheap stamp available; the content-hash ETag still applies
+                return view(*args, **kwargs)
+
+            last_modified = version if isinstance(version, datetime) else None
+            if last_modified is not None:
+                version = last_modified.isoformat()
+
+            etag = _digest(f"{_identity()}:{request.endpoint}:{request.query_string.decode()}:{version}")
+
+            if request.if_none_match.contains_weak(etag):
+                response = make_response("", 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+
+            if response.status_code in (200, 304):
+                response.set_etag(etag, weak=True)
+                if last_modified is not None:
+                    response.last_modified = last_modified
+            return response
+        return wrapper
+    return decorator
+
+
+# -----------------------------------------------------------
+# App-wide middleware
+# -----------------------------------------------------------
+def init_http_cache(app):
+    @app.after_request
+    def apply_http_cache(response):
+        if request.method not in ("GET", "HEAD") or response.direct_passthrough or response.is_streamed:
+            return response
+
+        if response.status_code == 200:
+            # Routes without a @conditional version fall back to a content hash
+            if "ETag" not in response.headers:
+                response.set_etag(_digest(response.get_data()), weak=True)
+            response.make_conditional(request)
+
+        if response.status_code in (200, 304) and "Cache-Control" not in response.headers:
+            response.headers["Cache-Control"] = DEFAULT_CACHE_CONTROL
+
+        if response.status_code == 200:
+            _compress(response)
+
+        return response
+
+    return app
+
+
+def _identity():
+    """JWT identity of the caller, or "" for anonymous requests"""
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity() or ""
+    except Exception:
+        # Bad or expired tokens are the view's to reject; the tag stays anonymous
+        return ""
+
+
+def _digest(value):
+    if isinstance(value, str):
+        value = value.encode()
+    return hashlib.blake2b(value, digest_size=16).hexdigest()
+
+
+def _compress(response):
+    if "Content-Encoding" in response.headers:
+        return
+    if response.mimetype not in COMPRESSIBLE_TYPES:
+        return
+
+    body = response.get_data()
+    if len(body) < Config.COMPRESSION_MIN_SIZE:
+        return
+
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        response.set_data(brotli.compress(body, quality=Config.COMPRESSION_LEVEL))
+        response.headers["Content-Encoding"] = "br"
+    elif accepted["gzip"]:
+        response.set_data(gzip.compress(body, compresslevel=Config.COMPRESSION_LEVEL))
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        return
+
+    response.vary.add("Accept-Encoding")
@@ -0,0 +1,60 @@
+import threading
+
+from pymongo import monitoring
+
+from app.config import Config
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Connection pool counters fed by pymongo's CMAP events"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0
+        self.checked_out = 0
+        self.created = 0
+        self.closed = 0
+        self.checkout_failures = 0
+
+    def _bump(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "open": self.open,
+                "in_use": self.checked_out,
+                "idle": max(0, self.open - self.checked_out),
+                "created_total": self.created,
+                "closed_total": self.closed,
+                "checkout_failures_total": self.checkout_failures,
+                "max_pool_size": Config.MONGO_MAX_POOL_SIZE
+            }
+
+    def connection_created(self, event):
+        self._bump(open=1, created=1)
+
+    def connection_closed(self, event):
+        self._bump(open=-1, closed=1)
+
+    def connection_checked_out(self, event):
+        self._bump(checked_out=1)
+
+    def connection_checked_in(self, event):
+        self._bump(checked_out=-1)
+
+    def connection_check_out_failed(self, event):
+        self._bump(checkout_failures=1)
+
+    # Remaining CMAP events carry nothing we report
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_check_out_started(self, event): pass
+
+
+POOL_STATS = PoolStats()
@@ -1,7 +1,7 @@
 from flask import jsonify
 import json
 
-def success_response(data, status_code=200):
+def success_response(data, status_code=200, meta=None):
     # If route passed a JSON string, convert back to dict
     if isinstance(data, str):
         try:
@@ -9,10 +9,13 @@ def success_response(data, status_code=200):
         except:
             pass  # If not JSON, keep as is
 
-    return jsonify({
+    body = {
         'status': 'success',
         'data': data
-    }), status_code
+    }
+    if meta is not None:
+        body['meta'] = meta
+    return jsonify(body), status_code
 
 
 def error_response(message, status_code=400):
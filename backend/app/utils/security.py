@@ -1,2 +1,19 @@
-# Placeholder for security-related utilities
-# e.g., password hashing, JWT token handling (beyond flask-jwt-extended basics)
\ No newline at end of file
+# Security-related utilities beyond the flask-jwt-extended basics
+from functools import wraps
+
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from app.utils.responses import error_response
+
+
+def authority_required(view):
+    """JWT-protected view that only authority accounts may call"""
+    @wraps(view)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        from app.models.authorities import Authority
+
+        if not Authority.objects(id=get_jwt_identity()).first():
+            return error_response("Authority access required", 403)
+        return view(*args, **kwargs)
+    return wrapper
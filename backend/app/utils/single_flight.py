@@ -0,0 +1,169 @@
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+from urllib.parse import urlencode
+
+from bson import Binary
+from flask import request, make_response, Response
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.config import Config
+from app.utils.deadline import remaining, check, DeadlineExceeded
+
+OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent computations.
+
+    The first caller for a key computes; callers arriving while it runs
+    wait for it and get the same result (or the same exception) instead
+    of repeating the work. Nothing is kept once the computation finishes:
+    this is not a cache, only a queue of one.
+
+    With shared=True the computation is also coordinated across worker
+    processes through a lease in the `request_flights` collection: one
+    worker computes, the others poll for its result, which stays readable
+    for COALESCE_RESULT_SECONDS. A lease that outlives
+    COALESCE_LOCK_SECONDS (a crashed worker) is taken over.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def do(self, key, compute, shared=False, shareable=None):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            left = remaining()
+            if not flight.done.wait(left if left is None else max(left, 0)):
+                raise DeadlineExceeded()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            if shared:
+                flight.result = _shared(key, compute, shareable)
+            else:
+                flight.result = compute()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+
+# -----------------------------------------------------------
+# Cross-worker coordination
+# -----------------------------------------------------------
+def _shared(key, compute, shareable=None):
+    from app.models.request_flights import RequestFlight
+    collection = RequestFlight._get_collection()
+
+    give_up_at = time.monotonic() + Config.COALESCE_LOCK_SECONDS
+    while True:
+        now = datetime.utcnow()
+        doc = collection.find_one({"_id": key})
+        if doc and doc["state"] == "done" and doc["result_expires_at"] > now:
+            return _unpack(doc)
+
+        lock_until = now + timedelta(seconds=Config.COALESCE_LOCK_SECONDS)
+        try:
+            # Free when absent, finished, or its holder's lease lapsed. A live
+            # lease makes the upsert collide on _id instead.
+            collection.find_one_and_update(
+                {"_id": key, "$or": [{"state": "done"}, {"lock_expires_at": {"$lt": now}}]},
+                {"$set": {"state": "running", "owner": OWNER, "lock_expires_at": lock_until, "expires_at": lock_until}},
+                upsert=True, return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Another worker is computing it
+            check()
+            if time.monotonic() >= give_up_at:
+                # Its holder is stuck; do the work rather than wait any longer
+                return compute()
+            time.sleep(Config.COALESCE_POLL_SECONDS)
+            continue
+        break
+
+    try:
+        result = compute()
+    except BaseException:
+        collection.delete_one({"_id": key, "owner": OWNER})
+        raise
+
+    if shareable is None or shareable(result):
+        result_until = datetime.utcnow() + timedelta(seconds=Config.COALESCE_RESULT_SECONDS)
+        collection.update_one({"_id": key, "owner": OWNER}, {"$set": dict(
+            _pack(result), state="done", result_expires_at=result_until, expires_at=result_until
+        )})
+    else:
+        collection.delete_one({"_id": key, "owner": OWNER})
+    return result
+
+
+def _pack(captured):
+    return {"status": captured["status"], "headers": captured["headers"], "body": Binary(captured["body"])}
+
+
+def _unpack(doc):
+    return {"status": doc["status"], "headers": [tuple(h) for h in doc["headers"]], "body": bytes(doc["body"])}
+
+
+# -----------------------------------------------------------
+# View decorator
+# -----------------------------------------------------------
+FLIGHTS = SingleFlight()
+
+
+def request_key():
+    """Endpoint plus its arguments in a canonical order"""
+    args = sorted(request.args.items(multi=True))
+    return f"{request.endpoint}?{urlencode(args)}"
+
+
+def coalesce(view):
+    """
+    Let identical concurrent requests to a read-only GET view share one
+    run of it. The view's response must not depend on who is asking, and
+    must not be streamed. Only 200 responses are shared across workers.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        def run():
+            response = make_response(view(*args, **kwargs))
+            return {
+                "status": response.status_code,
+                "headers": [(k, v) for k, v in response.headers.items() if k != "Content-Length"],
+                "body": response.get_data()
+            }
+
+        captured = FLIGHTS.do(
+            request_key(), run,
+            shared=Config.COALESCE_SHARED,
+            shareable=lambda c: c["status"] == 200
+        )
+        # Every caller gets its own Response object built from the shared parts
+        return Response(captured["body"], status=captured["status"], headers=captured["headers"])
+    return wrapper
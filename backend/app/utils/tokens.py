@@ -0,0 +1,37 @@
+from itsdangerous import URLSafeSerializer, URLSafeTimedSerializer, BadSignature, SignatureExpired
+from app.config import Config
+
+
+def _serializer(salt):
+    return URLSafeTimedSerializer(Config.JWT_SECRET_KEY, salt=salt)
+
+
+def sign_token(payload, salt):
+    """Sign a small JSON payload into an opaque URL-safe token"""
+    return _serializer(salt).dumps(payload)
+
+
+def load_token(token, salt, max_age=None):
+    """
+    Return the payload of a token issued by sign_token, or None
+    if the token is tampered with or older than max_age seconds.
+    """
+    try:
+        return _serializer(salt).loads(token, max_age=max_age)
+    except (BadSignature, SignatureExpired):
+        return None
+
+
+def sign_static_token(payload, salt):
+    """
+    Like sign_token, but without a timestamp: the same payload always
+    gives the same token (for printed codes that must never change).
+    """
+    return URLSafeSerializer(Config.JWT_SECRET_KEY, salt=salt).dumps(payload)
+
+
+def load_static_token(token, salt):
+    try:
+        return URLSafeSerializer(Config.JWT_SECRET_KEY, salt=salt).loads(token)
+    except BadSignature:
+        return None
@@ -0,0 +1,52 @@
+import re
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize_name(name):
+    """Lowercase and collapse punctuation/whitespace: ' Amoxi-Cillin ' → 'amoxi cillin'"""
+    return " ".join(_WORD.findall((name or "").lower()))
+
+
+class PrefixTrie:
+    """
+    Small prefix tree for autocomplete.
+
+    Every value is indexed under its full normalized name and under each
+    word in it, so "clav" finds "Amoxicillin Clavulanate".
+    """
+
+    def __init__(self):
+        self._root = {}
+
+    def insert(self, name, value):
+        normalized = normalize_name(name)
+        if not normalized:
+            return
+        words = normalized.split(" ")
+        keys = {normalized} | {" ".join(words[i:]) for i in range(1, len(words))}
+        for key in keys:
+            node = self._root
+            for ch in key:
+                node = node.setdefault(ch, {})
+            node.setdefault(None, []).append(value)
+
+    def search(self, prefix, limit=10):
+        node = self._root
+        for ch in normalize_name(prefix):
+            node = node.get(ch)
+            if node is None:
+                return []
+
+        results = []
+        seen = set()
+        stack = [node]
+        while stack and len(results) < limit:
+            current = stack.pop()
+            for value in current.get(None, []):
+                if id(value) not in seen:
+                    seen.add(id(value))
+                    results.append(value)
+            # Visit children in reverse so pops come out alphabetically
+            stack.extend(current[ch] for ch in sorted((k for k in current if k is not None), reverse=True))
+        return results[:limit]
@@ -0,0 +1,62 @@
+"""
+Gunicorn settings for production: gunicorn -c gunicorn.conf.py wsgi:app
+
+The app is imported once in the master (preload_app) and shared with the
+workers copy-on-write. The master creates missing indexes once before
+forking and then drops its Mongo connections, because pymongo clients
+must not cross a fork. Each worker opens its own pool and warms its
+caches before it accepts traffic. /health/ready stays 503 until that has
+happened.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+
+# "gthread" by default; "gevent" for the cooperative mode described in serve_async.py
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 1000))
+
+# Hard kill only well after the per-request budget (REQUEST_BUDGET_SECONDS)
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+# Recycle workers now and then; the jitter stops them all restarting
+# (and reconnecting to Mongo) at the same moment
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 200))
+
+# gevent has to patch the standard library before the app imports it,
+# which an (unpatched) preloading master would defeat
+preload_app = os.getenv(
+    "GUNICORN_PRELOAD", "false" if worker_class == "gevent" else "true"
+).lower() == "true"
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    from app.db import DB
+    from app.startup import ensure_indexes
+
+    ensure_indexes()
+    # Nothing Mongo-related may be inherited by the forked workers
+    DB.close()
+
+
+def post_worker_init(worker):
+    from app.db import DB
+    from app.startup import ensure_indexes, warm_up
+
+    # Fresh clients (and pool) owned by this worker process
+    DB.close()
+    DB.initialize()
+    if not preload_app:
+        ensure_indexes()
+    warm_up()
@@ -1,6 +1,10 @@
 from app.app import create_app
+from app.config import Config
+from app.startup import warm_up
 
 app = create_app()
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    # Development server only; production runs gunicorn -c gunicorn.conf.py wsgi:app
+    warm_up()
+    app.run(debug=Config.DEBUG)
@@ -0,0 +1,38 @@
+"""
+Async serving mode for I/O-bound traffic.
+
+Runs the same Flask app (same blueprints and URLs) on gevent: sockets,
+pymongo, requests (Supabase) and Twilio all become cooperative, so a
+request waiting on Mongo or an outbound HTTP call parks a greenlet
+instead of holding an OS thread. One process can then keep thousands
+of slow mobile connections open.
+
+    python serve_async.py        # HOST, PORT, ASYNC_MAX_CONNECTIONS
+"""
+# Must run before anything else imports socket/ssl/threading
+from gevent import monkey
+monkey.patch_all()
+
+import os
+
+from gevent.pool import Pool
+from gevent.pywsgi import WSGIServer
+
+from app.app import create_app
+from app.config import Config
+from app.startup import ensure_indexes, warm_up
+
+app = create_app()
+
+
+if __name__ == '__main__':
+    host = os.getenv("HOST", "0.0.0.0")
+    port = int(os.getenv("PORT", 5000))
+
+    # Cap concurrent connections so a burst queues at accept() instead
+    # of exhausting memory or the Mongo connection pool
+    server = WSGIServer((host, port), app, spawn=Pool(Config.ASYNC_MAX_CONNECTIONS))
+    ensure_indexes()
+    warm_up()
+    print(f"🚀 Serving (gevent) on http://{host}:{port} — up to {Config.ASYNC_MAX_CONNECTIONS} concurrent connections")
+    server.serve_forever()
@@ -0,0 +1,82 @@
+import time
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import numpy as np
+from bson import ObjectId
+
+from app.services.amu_service import AmuService, ALL_CLASSES, parse_dose, doses_per_day
+from app.services.medicine_catalog import MedicineCatalog
+from app.utils.trie import PrefixTrie
+
+
+class AmuParsingTest(unittest.TestCase):
+    def test_1_dosages_in_mass_units(self):
+        self.assertEqual(parse_dose("10 mg/kg"), (10.0, True))
+        self.assertEqual(parse_dose("1.5 g"), (1500.0, False))
+        self.assertEqual(parse_dose("250mcg / kg IM"), (0.25, True))
+        self.assertIsNone(parse_dose("5 ml"))
+        self.assertIsNone(parse_dose(None))
+
+    def test_2_frequencies(self):
+        self.assertEqual(doses_per_day("once daily"), 1)
+        self.assertEqual(doses_per_day("BID"), 2)
+        self.assertEqual(doses_per_day("every 8 hours"), 3)
+        self.assertEqual(doses_per_day("on alternate days"), 0.5)
+        self.assertEqual(doses_per_day(None), 1)
+
+
+class AmuReduceTest(unittest.TestCase):
+    def test_3_chunk_reduction(self):
+        # Treatment 0: two medicines in group 0; treatment 1: one in group 0
+        # and one unquantifiable dose in group 1
+        rows = {
+            "group": [0, 0, 0, 1],
+            "treatment": [0, 0, 1, 1],
+            "dose": [10.0, 500.0, 10.0, np.nan],
+            "per_kg": [True, False, True, False],
+            "weight": [300.0, 300.0, 30.0, 30.0],
+            "doses": [1, 2, 1, 1],
+            "duration": [3, 5, 2, 4],
+        }
+        totals = AmuService.reduce(rows, group_count=2, treatment_count=2)
+
+        self.assertEqual(totals["mg"].tolist(), [10 * 300 * 3 + 500 * 2 * 5 + 10 * 30 * 2, 0])
+        self.assertEqual(totals["unquantified"].tolist(), [0, 1])
+        self.assertEqual(totals["treatments"].tolist(), [2, 1])
+        # Longest course per treatment: 5 days and 2 days in group 0
+        self.assertEqual(totals["treatment_days"].tolist(), [7, 4])
+
+
+class AmuLegacyPrescriptionTest(unittest.TestCase):
+    def setUp(self):
+        items = [{"_id": str(ObjectId()), "name": "Oxytetracycline", "antimicrobial_class": "tetracyclines"}]
+        # Catalog snapshot as _load() would install it, without a database
+        MedicineCatalog._items = items
+        MedicineCatalog._by_id = {m["_id"]: m for m in items}
+        MedicineCatalog._by_name = {"oxytetracycline": items[0]}
+        MedicineCatalog._trie = PrefixTrie()
+        MedicineCatalog._version = 1
+        MedicineCatalog._checked_at = time.monotonic()
+        patcher = mock.patch("app.services.medicine_catalog.Config.CATALOG_VERSION_CHECK_SECONDS", 3600)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @mock.patch("app.services.amu_service.DB")
+    def test_4_legacy_prescriptions_count_by_name(self, db):
+        farmer, animal, legacy = ObjectId(), ObjectId(), ObjectId()
+        db.farmers.find.return_value = [{"_id": farmer, "district": "pune"}]
+        db.animals.find.return_value = [{"_id": animal, "species": "cow", "weight": 300}]
+        # Prescribed before catalog matching: no authorized_medicine, only a name
+        db.db.medicines.find.return_value = [
+            {"_id": legacy, "name": "Oxytetracycline", "dosage": "10 mg/kg", "frequency": "daily", "duration_days": 3}
+        ]
+        chunk = [{"farmer": farmer, "animal": animal, "medicines": [legacy], "treatment_start_date": datetime(2025, 1, 9)}]
+
+        totals, animals_treated = {}, {}
+        AmuService._accumulate(chunk, totals, animals_treated)
+
+        key = (datetime(2025, 1, 1), "Pune", "cow", "tetracyclines")
+        self.assertEqual(totals[key]["mg"], 10 * 300 * 3)
+        self.assertEqual(totals[key[:3] + (ALL_CLASSES,)]["treatments"], 1)
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from app.services import analytics_service
+from app.services.analytics_service import AnalyticsService, AnalyticsError, AnalyticsUnavailable
+from app.services.export_service import schemas
+
+
+class AnalyticsQueryBuilderTest(unittest.TestCase):
+    def test_1_only_whitelisted_names_reach_sql(self):
+        with self.assertRaises(AnalyticsError):
+            AnalyticsService.build_query("treatments", ["district; DROP TABLE treatments"], ["treatments"])
+        with self.assertRaises(AnalyticsError):
+            AnalyticsService.build_query("treatments", ["district"], ["medicine"])
+        with self.assertRaises(AnalyticsError):
+            AnalyticsService.build_query("farmers", [], ["treatments"])
+
+    def test_2_filters_are_bound_parameters(self):
+        sql, params = AnalyticsService.build_query(
+            "treatments", ["month"], ["violations"], filters={"district": "Pune' OR 1=1"},
+            date_from=datetime(2024, 1, 1)
+        )
+        self.assertNotIn("Pune", sql)
+        self.assertEqual(params, [datetime(2024, 1, 1), "Pune' OR 1=1"])
+
+
+@unittest.skipIf(analytics_service.duckdb is None, "duckdb is not installed")
+class AnalyticsStoreTest(unittest.TestCase):
+    def test_3_group_by_over_the_store(self):
+        import duckdb
+        import pyarrow as pa
+
+        rows = [
+            {"_id": "1", "district": "Pune", "species": "cow", "treatment_start_date": datetime(2024, 1, 5), "is_flagged_violation": True},
+            {"_id": "2", "district": "Pune", "species": "goat", "treatment_start_date": datetime(2024, 1, 9), "is_flagged_violation": False},
+            {"_id": "3", "district": "Satara", "species": "cow", "treatment_start_date": datetime(2024, 2, 1), "is_flagged_violation": False},
+        ]
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "analytics.duckdb")
+            con = duckdb.connect(path)
+            con.register("t", pa.Table.from_pylist(rows, schema=schemas()["treatments"]))
+            con.execute("CREATE TABLE treatments AS SELECT * FROM t")
+            con.execute("CREATE TABLE refresh_state (refreshed_at TIMESTAMP, watermark TIMESTAMP)")
+            con.close()
+
+            with mock.patch("app.services.analytics_service.Config.ANALYTICS_DB_PATH", path):
+                result, _ = AnalyticsService.query("treatments", ["month", "district"], ["treatments", "violations"])
+
+        self.assertEqual(result, [
+            {"month": "2024-01", "district": "Pune", "treatments": 2, "violations": 1},
+            {"month": "2024-02", "district": "Satara", "treatments": 1, "violations": 0},
+        ])
+
+    @mock.patch("app.services.analytics_service.DB")
+    def test_4_empty_refresh_leaves_a_queryable_store(self, db):
+        db.treatments.find.return_value.batch_size.return_value = []
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "analytics.duckdb")
+            with mock.patch("app.services.analytics_service.Config.ANALYTICS_DB_PATH", path):
+                self.assertEqual(AnalyticsService.refresh()["treatments"], 0)
+                treatments, refreshed = AnalyticsService.query("treatments", ["district"], ["treatments"])
+                prescriptions, _ = AnalyticsService.query("prescriptions", ["medicine"], ["prescriptions"])
+
+        self.assertEqual((treatments, prescriptions), ([], []))
+        self.assertIsNotNone(refreshed)
+
+    def test_5_store_without_fact_tables_is_unavailable(self):
+        import duckdb
+
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "analytics.duckdb")
+            duckdb.connect(path).close()
+            with mock.patch("app.services.analytics_service.Config.ANALYTICS_DB_PATH", path):
+                with self.assertRaises(AnalyticsUnavailable):
+                    AnalyticsService.query("treatments", [], ["treatments"])
@@ -0,0 +1,75 @@
+import time
+import unittest
+from unittest import mock
+
+from bson import ObjectId
+
+from app.services.compliance_engine import ComplianceEngine, RULE_CODES
+from app.services.medicine_catalog import MedicineCatalog
+from app.utils.trie import PrefixTrie
+
+CATALOG_ID = ObjectId("64b0000000000000000000a1")
+
+
+class ComplianceRulesTest(unittest.TestCase):
+    def setUp(self):
+        items = [{"_id": str(CATALOG_ID), "name": "Oxytetracycline", "withdrawal_period_days": 28}]
+        # Catalog snapshot as _load() would install it, without a database
+        MedicineCatalog._items = items
+        MedicineCatalog._by_id = {m["_id"]: m for m in items}
+        MedicineCatalog._by_name = {"oxytetracycline": items[0]}
+        MedicineCatalog._trie = PrefixTrie()
+        MedicineCatalog._version = 1
+        MedicineCatalog._checked_at = time.monotonic()
+
+        patcher = mock.patch("app.services.medicine_catalog.Config.CATALOG_VERSION_CHECK_SECONDS", 3600)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.dairy, self.goat_farm = ObjectId(), ObjectId()
+        self.cow, self.goat = ObjectId(), ObjectId()
+        self.farmers = {
+            self.dairy: {"after_registration": {"milk_supply_to": ["cooperative"]}},
+            self.goat_farm: {}
+        }
+        self.animals = {self.cow: {"is_lactating": True}, self.goat: {"is_lactating": False}}
+        self.full, self.short, self.unlisted, self.legacy = ObjectId(), ObjectId(), ObjectId(), ObjectId()
+        self.medicines = {
+            self.full: {"authorized_medicine": CATALOG_ID, "withdrawal_period_days": 28},
+            self.short: {"authorized_medicine": CATALOG_ID, "withdrawal_period_days": 7},
+            self.unlisted: {"name": "Herbal tonic", "authorized_medicine": None, "withdrawal_period_days": 3},
+            # Prescribed before catalog matching: no authorized_medicine, only a name
+            self.legacy: {"name": " oxytetracycline ", "withdrawal_period_days": 28},
+        }
+
+    def rules(self, *treatments):
+        matrix = ComplianceEngine.evaluate(list(treatments), self.farmers, self.animals, self.medicines)
+        return [[code for code, hit in zip(RULE_CODES, row) if hit] for row in matrix]
+
+    def test_1_compliant_and_unmedicated_treatments_pass(self):
+        self.assertEqual(self.rules(
+            {"farmer": self.goat_farm, "animal": self.goat, "vet": ObjectId(), "medicines": [self.full]},
+            {"farmer": self.dairy, "animal": self.cow, "vet": None, "medicines": []}
+        ), [[], []])
+
+    def test_2_each_rule_is_detected(self):
+        self.assertEqual(self.rules(
+            {"farmer": self.goat_farm, "animal": self.goat, "vet": None, "medicines": [self.full]},
+            {"farmer": self.goat_farm, "animal": self.goat, "vet": ObjectId(), "medicines": [self.full, self.short]},
+            {"farmer": self.goat_farm, "animal": self.goat, "vet": ObjectId(), "medicines": [self.unlisted]},
+            {"farmer": self.dairy, "animal": self.cow, "vet": ObjectId(), "medicines": [self.full]}
+        ), [["no_vet"], ["short_withdrawal"], ["unauthorized_medicine"], ["lactating_milk_supply"]])
+
+    def test_3_rules_combine(self):
+        self.assertEqual(self.rules(
+            {"farmer": self.dairy, "animal": self.cow, "vet": None, "medicines": [self.short, self.unlisted]}
+        ), [RULE_CODES])
+
+    def test_4_legacy_prescriptions_match_the_catalog_by_name(self):
+        self.assertEqual(self.rules(
+            {"farmer": self.goat_farm, "animal": self.goat, "vet": ObjectId(), "medicines": [self.legacy]}
+        ), [[]])
+        self.medicines[self.legacy]["withdrawal_period_days"] = 7
+        self.assertEqual(self.rules(
+            {"farmer": self.goat_farm, "animal": self.goat, "vet": ObjectId(), "medicines": [self.legacy]}
+        ), [["short_withdrawal"]])
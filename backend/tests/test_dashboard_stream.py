@@ -0,0 +1,71 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from bson import ObjectId
+
+from app.app import create_app
+from app.services.dashboard_stream import DashboardStream
+
+START = datetime(2025, 3, 1, 9, 0, 0)
+
+
+def _doc(updated_at, created_at=None, flagged=False, _id=None):
+    return {
+        "_id": _id or ObjectId(), "updated_at": updated_at,
+        "created_at": created_at or updated_at, "is_flagged_violation": flagged
+    }
+
+
+class DashboardStreamTest(unittest.TestCase):
+    def setUp(self):
+        self.db = mock.patch("app.services.dashboard_stream.DB").start()
+        self.events = []
+        mock.patch.object(DashboardStream, "_publish", side_effect=lambda e, d: self.events.append((e, d["_id"]))).start()
+        mock.patch.object(DashboardStream, "_compute_counters", return_value={}).start()
+        self.addCleanup(mock.patch.stopall)
+        DashboardStream._watermark = DashboardStream._started_at = START
+        DashboardStream._seen, DashboardStream._counters = {}, {}
+        self.addCleanup(self.reset)
+
+    @staticmethod
+    def reset():
+        DashboardStream._watermark = DashboardStream._started_at = None
+        DashboardStream._seen = {}
+
+    def tick(self, *docs):
+        self.db.treatments.find.return_value.sort.return_value = list(docs)
+        self.events.clear()
+        DashboardStream._tick()
+        return [event for event, _ in self.events]
+
+    def test_1_late_commits_in_the_overlap_are_sent_once(self):
+        first = _doc(START + timedelta(seconds=10))
+        self.assertEqual(self.tick(first), ["treatment"])
+
+        # Committed after the previous pass but stamped earlier (clock skew)
+        late = _doc(START + timedelta(seconds=8), flagged=True)
+        self.assertEqual(self.tick(first, late), ["treatment", "violation"])
+        query = self.db.treatments.find.call_args[0][0]
+        self.assertEqual(query["updated_at"]["$gte"], START)   # overlap, bounded by the producer's start
+
+        self.assertEqual(self.tick(late, first), [])
+
+    def test_2_an_update_to_a_seen_treatment_is_not_a_new_treatment(self):
+        treatment_id = ObjectId()
+        self.tick(_doc(START + timedelta(seconds=5), _id=treatment_id))
+        flagged = _doc(START + timedelta(seconds=20), created_at=START + timedelta(seconds=5), flagged=True, _id=treatment_id)
+        self.assertEqual(self.tick(flagged), ["violation"])
+
+    def test_3_restarting_the_producer_does_not_replay(self):
+        DashboardStream._watermark = START - timedelta(days=2)
+        with mock.patch.object(DashboardStream, "_subscribers", set()), \
+                mock.patch("app.services.dashboard_stream.Config.DASHBOARD_STREAM_INTERVAL", 0), \
+                mock.patch("app.services.dashboard_stream.time.sleep"):
+            DashboardStream._run()   # no subscribers: starts, then stops right away
+        self.assertGreater(DashboardStream._watermark, START)
+        self.assertEqual(DashboardStream._started_at, DashboardStream._watermark)
+
+    def test_4_stream_requires_an_authority(self):
+        response = create_app().test_client().get("/authority/dashboard/stream")
+        self.assertEqual(response.status_code, 401)
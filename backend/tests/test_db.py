@@ -0,0 +1,21 @@
+import unittest
+
+from mongoengine.connection import get_connection
+
+from app.db import DB
+
+
+class DBInitializeTest(unittest.TestCase):
+    def tearDown(self):
+        DB.close()
+
+    def test_1_initialize_is_idempotent(self):
+        # create_app() initializes lazily; route tests then call DB.initialize() again
+        DB.initialize(connect=False)
+        first = DB.client
+        DB.initialize()
+        DB.initialize(connect=False)
+
+        self.assertIsNot(DB.client, first)
+        self.assertIs(DB.treatments.database.client, DB.client)
+        self.assertIsNotNone(get_connection())
@@ -0,0 +1,63 @@
+import time
+import unittest
+
+from flask import Flask, jsonify
+from pymongo.errors import ExecutionTimeout
+
+from app.utils import deadline
+from app.utils.deadline import init_deadlines, budget
+
+
+class DeadlineTest(unittest.TestCase):
+    def setUp(self):
+        app = Flask(__name__)
+        init_deadlines(app)
+
+        @app.route("/slow")
+        @budget(0.05)
+        def slow():
+            time.sleep(0.06)
+            deadline.check()
+            return jsonify(ok=True)
+
+        @app.route("/timeout")
+        def timeout():
+            return jsonify(remaining=deadline.remaining(), http=deadline.http_timeout(60))
+
+        @app.route("/mongo")
+        def mongo():
+            raise ExecutionTimeout("operation exceeded time limit", 50)
+
+        @app.route("/stream")
+        @budget(None)
+        def stream():
+            return jsonify(remaining=deadline.remaining())
+
+        self.client = app.test_client()
+
+    def test_1_budget_exhaustion_is_a_structured_503(self):
+        response = self.client.get("/slow")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json["error"], "deadline_exceeded")
+        self.assertEqual(response.json["budget_ms"], 50)
+
+    def test_2_default_budget_caps_outbound_calls(self):
+        data = self.client.get("/timeout").json
+        self.assertLessEqual(data["http"], data["remaining"] + 0.01)
+        self.assertLess(data["http"], 60)
+
+    def test_3_mongo_timeouts_map_to_503(self):
+        self.assertEqual(self.client.get("/mongo").status_code, 503)
+
+    def test_4_budget_none_and_nesting(self):
+        self.assertIsNone(self.client.get("/stream").json["remaining"])
+        self.assertIsNone(deadline.remaining())
+        with deadline.deadline(10):
+            with deadline.deadline(0.5):
+                self.assertLessEqual(deadline.remaining(), 0.5)
+            with deadline.deadline(60):
+                self.assertLessEqual(deadline.remaining(), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
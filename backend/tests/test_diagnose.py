@@ -0,0 +1,64 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from bson import ObjectId
+from flask_jwt_extended import create_access_token
+
+from app.app import create_app
+
+CATALOG_ID = str(ObjectId())
+MATCH = {
+    "_id": CATALOG_ID, "name": "Oxytetracycline", "dosage": "10 mg/kg",
+    "frequency": "daily", "duration_days": 5, "withdrawal_period_days": 28
+}
+
+
+class DiagnoseValidationTest(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            self.headers = {"Authorization": f"Bearer {create_access_token(identity=str(ObjectId()))}"}
+
+        patch = lambda target: mock.patch(f"app.routes.treatments.{target}").start()
+        self.addCleanup(mock.patch.stopall)
+        patch("Vet").objects.return_value.first.return_value = SimpleNamespace(id=ObjectId())
+        self.treatment = mock.MagicMock(status="pending")
+        self.treatment.to_json.return_value = {}
+        patch("Treatment").objects.return_value.first.return_value = self.treatment
+        for target in ("RollupService", "DispatchService", "UnsafeFarmers"):
+            patch(target)
+        self.catalog = patch("MedicineCatalog")
+        self.catalog.resolve_many.side_effect = lambda entries: [(MATCH, []) for _ in entries]
+        self.details = mock.patch("app.routes.treatments.MedicineDetail.objects").start()
+
+    def diagnose(self, *medicines):
+        return self.client.put(f"/treatments/{ObjectId()}/diagnose", headers=self.headers, json={"medicines": list(medicines)})
+
+    def test_1_invalid_entries_are_rejected_before_anything_is_written(self):
+        for entry in (
+            {"name": "Oxytetracycline", "withdrawal_period_days": True},
+            {"name": "Oxytetracycline", "withdrawal_period_days": "28"},
+            {"name": "Oxytetracycline", "route": "nasal"},
+        ):
+            response = self.diagnose(entry)
+            self.assertEqual(response.status_code, 400, entry)
+            self.assertIsInstance(response.get_json()["message"], str)
+        self.details.insert.assert_not_called()
+
+    def test_2_null_withdrawal_falls_back_to_the_catalog(self):
+        response = self.diagnose({"name": "Oxytetracycline", "withdrawal_period_days": None, "route": "IM"})
+        self.assertEqual(response.status_code, 200)
+        entry, = self.details.insert.call_args[0][0]
+        self.assertEqual(entry.withdrawal_period_days, 28)
+        self.treatment.save.assert_called_once()
+
+    def test_3_unmatched_medicines_get_a_string_message(self):
+        self.catalog.resolve_many.side_effect = lambda entries: [(None, ["Enrofloxacin"])]
+        response = self.diagnose({"name": "Enrofloxin"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.get_json()["message"],
+            "Medicines not in the authorized catalog: Enrofloxin (did you mean Enrofloxacin?)"
+        )
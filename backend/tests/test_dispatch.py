@@ -0,0 +1,89 @@
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+from unittest import mock
+
+from bson import ObjectId
+
+from app.config import Config
+from app.services.dispatch_service import DispatchService, OPEN_STATUSES
+
+VET = SimpleNamespace(id=ObjectId(), gps_location=None)
+
+
+class DispatchTest(unittest.TestCase):
+    def setUp(self):
+        self.db = mock.patch("app.services.dispatch_service.DB").start()
+        self.addCleanup(mock.patch.stopall)
+        self.db.vets.find_one_and_update.return_value = {"_id": VET.id}   # claim lock free
+        self.db.treatment_requests.count_documents.return_value = 0
+
+    def _lock_released(self):
+        # Released only while it still holds the lock_until this claim set
+        (query, update), _ = self.db.vets.update_one.call_args
+        taken = self.db.vets.find_one_and_update.call_args[0][1]["$set"]["dispatch_lock_until"]
+        self.assertEqual(query, {"_id": VET.id, "dispatch_lock_until": taken})
+        self.assertEqual(update, {"$set": {"dispatch_lock_until": None}})
+        self.db.vets.update_one.assert_called_once()
+
+    def test_1_claim_leases_the_next_request(self):
+        request = {"_id": ObjectId(), "status": "assigned"}
+        self.db.treatment_requests.find_one_and_update.return_value = request
+
+        self.assertEqual(DispatchService.claim(VET), (request, None))
+
+        query, update = self.db.treatment_requests.find_one_and_update.call_args[0]
+        statuses = query["$and"][0]["$or"]
+        self.assertEqual([s["status"] for s in statuses], ["pending", "assigned"])   # never completed work
+        self.assertEqual(update["$set"]["assigned_vet"], VET.id)
+        self._lock_released()
+
+    def test_2_cap_is_checked_under_the_vet_lock(self):
+        self.db.treatment_requests.count_documents.return_value = Config.DISPATCH_MAX_ACTIVE_PER_VET
+
+        doc, reason = DispatchService.claim(VET)
+        self.assertIsNone(doc)
+        self.assertIn("Too many", reason)
+        self.db.treatment_requests.find_one_and_update.assert_not_called()
+        self._lock_released()
+
+        # A parallel claim by the same vet finds the lock taken and claims nothing
+        self.db.reset_mock()
+        self.db.vets.find_one_and_update.return_value = None
+        doc, reason = DispatchService.claim(VET)
+        self.assertIsNone(doc)
+        self.db.treatment_requests.count_documents.assert_not_called()
+        self.db.vets.update_one.assert_not_called()
+
+    def test_3_active_count_ignores_completed_and_lapsed_work(self):
+        now = datetime(2025, 1, 15, 10, 0)
+        DispatchService.active_count(VET, now)
+
+        query = self.db.treatment_requests.count_documents.call_args[0][0]
+        self.assertEqual(query["assigned_vet"], VET.id)
+        self.assertEqual(query["$or"], [
+            {"status": "accepted"},
+            {"status": "assigned", "lease_expires_at": {"$gte": now}},
+        ])
+
+    @mock.patch("app.services.dispatch_service.Treatment")
+    def test_4_accept_attaches_the_vet(self, Treatment):
+        treatment_id = ObjectId()
+        self.db.treatment_requests.find_one_and_update.return_value = {"_id": ObjectId(), "treatment": treatment_id}
+
+        self.assertIsNotNone(DispatchService.accept(VET, ObjectId()))
+        query, update = self.db.treatment_requests.find_one_and_update.call_args[0]
+        self.assertEqual(query["status"], "assigned")
+        self.assertEqual(update["$set"]["status"], "accepted")
+        Treatment.objects.assert_called_once_with(id=treatment_id, vet=None)
+
+    def test_5_diagnosis_completes_the_request(self):
+        treatment_id = ObjectId()
+        self.db.treatment_requests.update_many.return_value.modified_count = 1
+
+        self.assertEqual(DispatchService.complete(treatment_id, VET), 1)
+        query, update = self.db.treatment_requests.update_many.call_args[0]
+        self.assertEqual(query, {"treatment": treatment_id, "status": {"$in": OPEN_STATUSES}})
+        self.assertEqual(update["$set"]["status"], "completed")
+        self.assertEqual(update["$set"]["assigned_vet"], VET.id)
+        self.assertIsNone(update["$set"]["lease_expires_at"])
@@ -0,0 +1,40 @@
+import time
+import unittest
+
+from app.utils import deadline
+from app.utils.fanout import fan_out, FanOutTimeout
+
+
+class FanOutTest(unittest.TestCase):
+    def test_1_calls_run_concurrently(self):
+        started = time.monotonic()
+        results, errors = fan_out({str(i): (lambda i=i: time.sleep(0.1) or i) for i in range(5)})
+        self.assertLess(time.monotonic() - started, 0.3)
+        self.assertEqual(results, {str(i): i for i in range(5)})
+        self.assertEqual(errors, {})
+
+    def test_2_failures_and_timeouts_are_reported_per_call(self):
+        def boom():
+            raise ValueError("boom")
+
+        results, errors = fan_out({
+            "ok": lambda: 1,
+            "boom": boom,
+            "slow": lambda: time.sleep(0.3)
+        }, timeout=0.1)
+        self.assertEqual(results, {"ok": 1})
+        self.assertIsInstance(errors["boom"], ValueError)
+        self.assertIsInstance(errors["slow"], FanOutTimeout)
+
+    def test_3_workers_see_the_request_deadline(self):
+        with deadline.deadline(5):
+            results, _ = fan_out({"a": deadline.remaining, "b": deadline.remaining})
+        self.assertTrue(all(0 < left <= 5 for left in results.values()))
+
+    def test_4_nested_fan_out_runs_inline(self):
+        def inner():
+            results, _ = fan_out({"x": lambda: 1, "y": lambda: 2})
+            return sum(results.values())
+
+        results, errors = fan_out({"a": inner, "b": inner})
+        self.assertEqual(results, {"a": 3, "b": 3})
@@ -0,0 +1,48 @@
+import unittest
+from unittest import mock
+
+from bson import ObjectId
+
+from app.models.animals import Animal
+from app.services.violation_service import ViolationService
+
+
+class FarmSafetyTest(unittest.TestCase):
+    @mock.patch("app.services.violation_service.DB")
+    def test_1_unsafe_farms_are_active_farms(self, db):
+        # 10 active farms, 3 of them with violations; farms without animals are never counted
+        db.farmers.count_documents.side_effect = lambda query, **kw: 3 if "violation_count" in query else 10
+
+        self.assertEqual(ViolationService.farm_safety(max_time_ms=500), {"safe": 7, "unsafe": 3})
+        for call in db.farmers.count_documents.call_args_list:
+            self.assertEqual(call[0][0]["active_animals"], {"$gt": 0})
+            self.assertEqual(call[1], {"maxTimeMS": 500})
+        db.animals.distinct.assert_not_called()
+
+
+class ActiveAnimalsCounterTest(unittest.TestCase):
+    def setUp(self):
+        self.farmers = mock.patch("app.models.animals.Farmer").start()
+        mock.patch("mongoengine.Document.save").start()
+        self.addCleanup(mock.patch.stopall)
+        self.farmer_id = ObjectId()
+
+    def _inc(self):
+        return [call[1] for call in self.farmers.objects.return_value.update_one.call_args_list]
+
+    def test_2_new_active_animal_counts(self):
+        Animal(farmer=self.farmer_id, species="cow", tag_number="T-1").save()
+        self.farmers.objects.assert_called_once_with(id=self.farmer_id)
+        self.assertEqual(self._inc(), [{"inc__active_animals": 1}])
+
+    def test_3_only_is_active_flips_move_the_counter(self):
+        animal = Animal(id=ObjectId(), farmer=self.farmer_id, species="cow", tag_number="T-2")
+        animal._clear_changed_fields()
+
+        animal.weight = 320
+        animal.save()
+        self.assertEqual(self._inc(), [])
+
+        animal.is_active = False
+        animal.save()
+        self.assertEqual(self._inc(), [{"inc__active_animals": -1}])
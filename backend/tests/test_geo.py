@@ -0,0 +1,57 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from bson import ObjectId
+from flask_jwt_extended import create_access_token
+
+from app.app import create_app
+from app.services.geo_service import GeoService
+from app.utils.geo import point_from_gps
+
+
+class PointFromGpsTest(unittest.TestCase):
+    def test_1_dicts_and_embedded_documents(self):
+        self.assertEqual(point_from_gps({"lat": 18.52, "lng": 73.85}), [73.85, 18.52])
+        self.assertEqual(point_from_gps({"lat": "18.52", "lng": "73.85"}), [73.85, 18.52])
+        self.assertEqual(point_from_gps(SimpleNamespace(lat=18.52, lng=73.85)), [73.85, 18.52])
+
+    def test_2_incomplete_or_out_of_range(self):
+        self.assertIsNone(point_from_gps(None))
+        self.assertIsNone(point_from_gps({"lat": 18.52}))
+        self.assertIsNone(point_from_gps(SimpleNamespace(lat=None, lng=73.85)))
+        self.assertIsNone(point_from_gps({"lat": 91, "lng": 73.85}))
+        self.assertIsNone(point_from_gps({"lat": 18.52, "lng": -181}))
+
+
+class NearbyVetsTest(unittest.TestCase):
+    @mock.patch("app.services.geo_service.DB")
+    def test_3_single_geo_near_pipeline(self, db):
+        vet_id = ObjectId()
+        db.vets.aggregate.return_value = [{"_id": vet_id, "name": "Dr. Patil", "distance_m": 1234.5}]
+
+        vets = GeoService.nearby_vets([73.85, 18.52], radius_km=10, limit=5)
+
+        self.assertEqual(vets, [{"_id": str(vet_id), "name": "Dr. Patil", "distance_km": 1.23}])
+        pipeline = db.vets.aggregate.call_args[0][0]
+        near = pipeline[0]["$geoNear"]
+        self.assertEqual(near["near"]["coordinates"], [73.85, 18.52])
+        self.assertEqual(near["maxDistance"], 10000)
+        self.assertEqual(near["query"], {"is_verified": True})
+        self.assertEqual(pipeline[1], {"$limit": 5})
+
+    def test_4_route_rejects_empty_radius_and_limit(self):
+        app = create_app()
+        client = app.test_client()
+        with app.app_context():
+            headers = {"Authorization": f"Bearer {create_access_token(identity=str(ObjectId()))}"}
+
+        with mock.patch("app.routes.vets.GeoService.nearby_vets", return_value=[]) as nearby:
+            for query in ("radius_km=0", "radius_km=-5", "limit=0", "limit=-1", "radius_km=nan", "limit=x"):
+                response = client.get(f"/vets/nearby?lat=18.52&lng=73.85&{query}", headers=headers)
+                self.assertEqual(response.status_code, 400, query)
+            nearby.assert_not_called()
+
+            response = client.get("/vets/nearby?lat=18.52&lng=73.85&radius_km=500&limit=500", headers=headers)
+            self.assertEqual(response.status_code, 200)
+            nearby.assert_called_once_with([73.85, 18.52], radius_km=200, limit=50)
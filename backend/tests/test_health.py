@@ -0,0 +1,38 @@
+import threading
+import unittest
+from unittest import mock
+
+from app.services.health_service import HealthService
+
+
+class HealthLockTest(unittest.TestCase):
+    def setUp(self):
+        HealthService._ping = HealthService._deep = None
+
+    def tearDown(self):
+        HealthService._ping = HealthService._deep = None
+
+    def test_1_slow_deep_check_does_not_block_readiness(self):
+        deep_started, release_deep = threading.Event(), threading.Event()
+
+        def slow_deep():
+            deep_started.set()
+            release_deep.wait(5)
+            return {"ok": True}
+
+        with mock.patch.object(HealthService, "_run_deep", side_effect=slow_deep), \
+                mock.patch.object(HealthService, "_run_ping", return_value={"ok": True, "fresh": True}):
+            worker = threading.Thread(target=HealthService.deep)
+            worker.start()
+            self.assertTrue(deep_started.wait(5))
+
+            # The deep check holds its own lock; a first readiness probe still computes a fresh ping
+            results = []
+            probe = threading.Thread(target=lambda: results.append(HealthService.ping()))
+            probe.start()
+            probe.join(1)
+            self.assertFalse(probe.is_alive(), "readiness probe waited on the deep check")
+            self.assertEqual(results, [{"ok": True, "fresh": True}])
+
+            release_deep.set()
+            worker.join(5)
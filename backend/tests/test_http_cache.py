@@ -0,0 +1,106 @@
+import gzip
+import json
+import unittest
+from unittest import mock
+
+from flask import Flask, jsonify
+from flask_jwt_extended import JWTManager, create_access_token
+
+from app.routes import authority_dashboard
+from app.utils.http_cache import init_http_cache, cache_control, conditional
+
+
+class HttpCacheTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.calls = {"versioned": 0}
+        app = Flask(__name__)
+        init_http_cache(app)
+
+        @app.route('/big')
+        def big():
+            return jsonify({"items": ["medicine"] * 500})
+
+        @app.route('/versioned')
+        @cache_control("private, max-age=300")
+        @conditional(lambda: "v1")
+        def versioned():
+            cls.calls["versioned"] += 1
+            return jsonify({"version": 1})
+
+        cls.client = app.test_client()
+
+    def test_1_content_hash_etag_and_304(self):
+        first = self.client.get('/big')
+        self.assertEqual(first.status_code, 200)
+        etag = first.headers["ETag"]
+        self.assertTrue(etag.startswith('W/'))
+
+        second = self.client.get('/big', headers={"If-None-Match": etag})
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.data, b"")
+
+    def test_2_conditional_skips_view(self):
+        first = self.client.get('/versioned')
+        self.assertEqual(first.headers["Cache-Control"], "private, max-age=300")
+        calls = self.calls["versioned"]
+
+        second = self.client.get('/versioned', headers={"If-None-Match": first.headers["ETag"]})
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(self.calls["versioned"], calls)
+        self.assertEqual(second.headers["Cache-Control"], "private, max-age=300")
+
+    def test_3_gzip_above_threshold(self):
+        response = self.client.get('/big', headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        self.assertEqual(len(json.loads(gzip.decompress(response.data))["items"]), 500)
+
+    def test_4_small_bodies_not_compressed(self):
+        response = self.client.get('/versioned', headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("Content-Encoding", response.headers)
+
+    def test_5_versioned_etags_are_per_user(self):
+        app = Flask(__name__)
+        app.config["JWT_SECRET_KEY"] = "test-secret"
+        JWTManager(app)
+        init_http_cache(app)
+
+        @app.route('/mine')
+        @conditional(lambda: "v1")
+        def mine():
+            return jsonify({"version": 1})
+
+        client = app.test_client()
+        with app.app_context():
+            alice, bob = ({"Authorization": f"Bearer {create_access_token(identity=name)}"} for name in ("alice", "bob"))
+
+        etag = client.get('/mine', headers=alice).headers["ETag"]
+        self.assertEqual(client.get('/mine', headers=dict(alice, **{"If-None-Match": etag})).status_code, 304)
+        self.assertEqual(client.get('/mine', headers=dict(bob, **{"If-None-Match": etag})).status_code, 200)
+        self.assertNotEqual(client.get('/mine', headers=bob).headers["ETag"], etag)
+
+
+class DashboardVersionTest(unittest.TestCase):
+    def setUp(self):
+        authority_dashboard._data_version = (None, 0.0)
+        self.addCleanup(setattr, authority_dashboard, "_data_version", (None, 0.0))
+
+    @mock.patch("app.routes.authority_dashboard.DB")
+    def test_6_version_is_reused_for_a_few_seconds(self, db):
+        for name in ("treatments", "animals", "farmers", "vets"):
+            getattr(db, name).find_one.return_value = None
+            getattr(db, name).estimated_document_count.return_value = 3
+
+        first = authority_dashboard.dashboard_data_version()
+        second = authority_dashboard.dashboard_data_version()
+        self.assertEqual(first, second)
+        self.assertEqual(db.treatments.find_one.call_count, 1)
+
+        with mock.patch("app.routes.authority_dashboard.Config.DASHBOARD_VERSION_SECONDS", 0):
+            authority_dashboard.dashboard_data_version()
+        self.assertEqual(db.treatments.find_one.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import time
+import unittest
+from unittest import mock
+
+from app.services.medicine_catalog import MedicineCatalog
+from app.utils.trie import PrefixTrie, normalize_name
+
+
+def _medicine(_id, name, withdrawal):
+    return {
+        "_id": _id, "name": name, "dosage": "10 mg/kg", "route": "IM",
+        "frequency": "once daily", "duration_days": 3, "withdrawal_period_days": withdrawal
+    }
+
+
+class MedicineCatalogResolveTest(unittest.TestCase):
+    def setUp(self):
+        items = [
+            _medicine("64b0000000000000000000a1", "Oxytetracycline", 28),
+            _medicine("64b0000000000000000000a2", "Enrofloxacin", 14),
+            _medicine("64b0000000000000000000a3", "Meloxicam", 5),
+        ]
+        # Install a catalog snapshot as _load() would, without a database
+        MedicineCatalog._items = items
+        MedicineCatalog._by_id = {m["_id"]: m for m in items}
+        MedicineCatalog._by_name = {normalize_name(m["name"]): m for m in items}
+        MedicineCatalog._trie = PrefixTrie()
+        MedicineCatalog._version = 1
+        MedicineCatalog._checked_at = time.monotonic()
+
+        patcher = mock.patch("app.services.medicine_catalog.Config.CATALOG_VERSION_CHECK_SECONDS", 3600)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_1_exact_and_id_matches(self):
+        results = MedicineCatalog.resolve_many([
+            {"name": "  meloxicam "},
+            {"medicine_id": "64b0000000000000000000a2"},
+        ])
+        self.assertEqual([m["name"] for m, _ in results], ["Meloxicam", "Enrofloxacin"])
+
+    def test_2_misspelling_is_corrected(self):
+        (match, suggestions), = MedicineCatalog.resolve_many([{"name": "Oxytetracyclin"}])
+        self.assertEqual(match["_id"], "64b0000000000000000000a1")
+        self.assertEqual(suggestions, [])
+
+    def test_3_unknown_medicine_gets_suggestions(self):
+        (match, suggestions), = MedicineCatalog.resolve_many([{"name": "Enrofloxin tabs"}])
+        self.assertIsNone(match)
+        self.assertIn("Enrofloxacin", suggestions)
+
+        (match, suggestions), = MedicineCatalog.resolve_many([{"name": "Ivermectin"}])
+        self.assertIsNone(match)
+
+
+if __name__ == '__main__':
+    unittest.main()
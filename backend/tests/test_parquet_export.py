@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from app.services import export_service
+from app.services.export_service import ExportService, _PartitionedWriter, schemas
+
+
+def _row(i):
+    return {"_id": str(i), "species": "cow", "weight": 300, "is_active": True, "created_at": datetime(2025, 1, 1)}
+
+
+@unittest.skipIf(export_service.pa is None, "pyarrow is not installed")
+class PartitionedWriterTest(unittest.TestCase):
+    def test_1_rows_land_in_hive_partitions(self):
+        import pyarrow.parquet as pq
+
+        schema = schemas()["animals"]
+        with tempfile.TemporaryDirectory() as root:
+            writer = _PartitionedWriter(root, "animals", schema, "run1", row_group_size=2, max_buffered=10, max_open=8)
+            for i, region in enumerate(["Pune", "Pune", "Nashik Rd", "Pune"]):
+                writer.add((("region", region),), _row(i))
+            self.assertEqual(writer.close(), {"rows": 4, "files": 2})
+
+            pune = pq.ParquetFile(os.path.join(root, "animals", "region=Pune", "part-run1-1.parquet"))
+            self.assertEqual(pune.read().column("_id").to_pylist(), ["0", "1", "3"])
+            self.assertEqual(pune.schema_arrow, schema)
+            # A full group of two, then the remainder at close
+            self.assertEqual([pune.metadata.row_group(g).num_rows for g in range(pune.num_row_groups)], [2, 1])
+            self.assertTrue(os.path.exists(os.path.join(root, "animals", "region=Nashik_Rd", "part-run1-1.parquet")))
+
+    def test_2_open_files_and_buffered_rows_are_bounded(self):
+        import pyarrow.parquet as pq
+
+        schema = schemas()["animals"]
+        regions = [f"R{i}" for i in range(6)]
+        with tempfile.TemporaryDirectory() as root:
+            writer = _PartitionedWriter(root, "animals", schema, "run1", row_group_size=3, max_buffered=12, max_open=2)
+            for i in range(60):
+                writer.add((("region", regions[i % 6]),), _row(i))
+                self.assertLessEqual(len(writer.writers), 2)
+                self.assertLess(writer.buffered, 12)
+            self.assertEqual(writer.close()["rows"], 60)
+            self.assertEqual(writer.writers, {})
+
+            # Partitions whose file was closed continue in a new part; no row is lost
+            ids = []
+            for region in regions:
+                directory = os.path.join(root, "animals", f"region={region}")
+                for name in sorted(os.listdir(directory)):
+                    self.assertTrue(name.startswith("part-run1-"))
+                    ids += pq.read_table(os.path.join(directory, name)).column("_id").to_pylist()
+            self.assertEqual(sorted(ids, key=int), [str(i) for i in range(60)])
+
+    @mock.patch("app.services.export_service.JobState")
+    @mock.patch("app.services.export_service.DB")
+    def test_3_runs_started_in_the_same_second_get_their_own_files(self, db, job_state):
+        job_state.get.return_value = {}
+        db.treatments.find.return_value.batch_size.return_value = []
+        db.animals.find.return_value.batch_size.return_value = []
+
+        with mock.patch("app.services.export_service._PartitionedWriter") as writer, \
+                mock.patch("app.services.export_service.datetime") as clock:
+            clock.utcnow.return_value = datetime(2025, 1, 1, 12, 0, 0)
+            writer.return_value.close.return_value = {"rows": 0, "files": 0}
+            ExportService.export(root="unused")
+            ExportService.export(root="unused")
+
+        run_ids = {call[0][3] for call in writer.call_args_list}
+        self.assertEqual(len(run_ids), 2)
+        self.assertTrue(all(run_id.startswith("20250101T120000-") for run_id in run_ids))
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from app.services import qr_service
+from app.services.qr_service import QRService
+
+
+class QRTokenTest(unittest.TestCase):
+    def test_1_tokens_are_stable_and_signed(self):
+        token = QRService.token("65f000000000000000000001", "65f000000000000000000002")
+        self.assertEqual(token, QRService.token("65f000000000000000000001", "65f000000000000000000002"))
+        self.assertEqual(QRService.resolve(token), ("65f000000000000000000001", "65f000000000000000000002"))
+        self.assertEqual(QRService.resolve(QRService.token("65f000000000000000000001"))[1], None)
+
+        self.assertIsNone(QRService.resolve(token[:-2] + "xx"))
+        self.assertIsNone(QRService.resolve("not-a-token"))
+
+
+@unittest.skipIf(qr_service.qrcode is None, "qrcode is not installed")
+class QRRenderTest(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.patch = mock.patch("app.services.qr_service.Config.QR_CACHE_DIR", self.cache_dir.name)
+        self.patch.start()
+        QRService._memory.clear()
+
+    def tearDown(self):
+        self.patch.stop()
+        self.cache_dir.cleanup()
+        QRService._memory.clear()
+
+    def test_2_svg_and_png(self):
+        svg, _ = QRService.image("https://example.org/consumer/safety/abc", "svg")
+        png, _ = QRService.image("https://example.org/consumer/safety/abc", "png")
+        self.assertTrue(svg.startswith(b"<svg") and b"<path d=\"M" in svg)
+        self.assertTrue(png.startswith(b"\x89PNG"))
+
+    def test_3_rendered_once_then_cached(self):
+        with mock.patch("app.services.qr_service.render_svg", wraps=qr_service.render_svg) as render:
+            first, key = QRService.image("https://example.org/x", "svg")
+            QRService._memory.clear()   # a fresh worker still finds it on disk
+            second, again = QRService.image("https://example.org/x", "svg")
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual((first, key), (second, again))
+        self.assertTrue(os.path.exists(os.path.join(self.cache_dir.name, key[:2], f"{key}.svg")))
+
+    def test_4_sheets_hold_twelve_badges_per_page(self):
+        farmers = [{"_id": f"65f0000000000000000000{i:02d}", "name": f"Farmer <{i}>", "district": "Pune"} for i in range(14)]
+        pages = QRService.sheets(QRService.badges(farmers))
+        self.assertEqual(len(pages), 2)
+        self.assertEqual(pages[0].count(b"<text"), 24)
+        self.assertIn(b"Farmer &lt;0&gt;", pages[0])
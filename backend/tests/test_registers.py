@@ -0,0 +1,62 @@
+import csv
+import gzip
+import io
+import json
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from bson import ObjectId
+from flask_jwt_extended import create_access_token
+
+from app.app import create_app
+
+from app.routes.exports import _csv, _ndjson, _gzip
+from app.services.register_service import COLUMNS
+
+
+def _row(i):
+    row = dict.fromkeys(COLUMNS)
+    row.update(_id=str(i), medicines=["Oxytetracycline", "Meloxicam"], treatment_start_date=datetime(2025, 1, 15))
+    return row
+
+
+class RegisterFormatTest(unittest.TestCase):
+    def test_1_csv_streams_in_chunks(self):
+        chunks = list(_csv(_row(i) for i in range(5000)))
+        self.assertGreater(len(chunks), 1)
+
+        rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+        self.assertEqual(len(rows), 5000)
+        self.assertEqual(rows[0]["medicines"], "Oxytetracycline; Meloxicam")
+        self.assertEqual(rows[0]["treatment_start_date"], "2025-01-15T00:00:00")
+
+    def test_2_ndjson_lines(self):
+        lines = "".join(_ndjson(_row(i) for i in range(3))).splitlines()
+        self.assertEqual([json.loads(line)["_id"] for line in lines], ["0", "1", "2"])
+
+    def test_3_gzip_stream_round_trips(self):
+        text = "".join(_csv(_row(i) for i in range(100)))
+        compressed = b"".join(_gzip(_csv(_row(i) for i in range(100))))
+        self.assertEqual(gzip.decompress(compressed).decode(), text)
+
+    def test_4_resumed_csv_has_no_header(self):
+        first = "".join(_csv(_row(i) for i in range(3)))
+        resumed = "".join(_csv((_row(i) for i in range(3, 5)), header=False))
+        rows = list(csv.DictReader(io.StringIO(first + resumed)))
+        self.assertEqual([r["_id"] for r in rows], ["0", "1", "2", "3", "4"])
+
+    @mock.patch("app.routes.exports.RegisterService")
+    @mock.patch("app.models.authorities.Authority.objects")
+    def test_5_route_omits_the_header_after_a_cursor(self, authorities, registers):
+        app = create_app()
+        client = app.test_client()
+        with app.app_context():
+            headers = {"Authorization": f"Bearer {create_access_token(identity=str(ObjectId()))}"}
+        registers.rows.side_effect = lambda query, limit=None: iter([_row(1)])
+
+        fresh = client.get("/authority/exports/treatments", headers=headers).get_data(as_text=True)
+        resumed = client.get(f"/authority/exports/treatments?after={ObjectId()}", headers=headers).get_data(as_text=True)
+        self.assertTrue(fresh.startswith(",".join(COLUMNS)))
+        self.assertEqual(len(resumed.splitlines()), 1)
+        self.assertFalse(resumed.startswith(",".join(COLUMNS)))
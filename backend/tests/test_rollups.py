@@ -0,0 +1,47 @@
+import unittest
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.services.rollup_service import RollupService, ALL_MEDICINES
+
+
+class RollupDiffTest(unittest.TestCase):
+    def setUp(self):
+        self.vet = ObjectId()
+        self.pending = RollupService._state(
+            datetime(2025, 1, 14, 9, 30), " pune ", "cow", None, False, []
+        )
+        self.diagnosed = RollupService._state(
+            datetime(2025, 1, 15, 11, 0), "Pune", "cow", self.vet, False,
+            [("abc", "Amoxicillin"), ("name:meloxicam", "Meloxicam")]
+        )
+
+    def changes(self, before, after):
+        return {key: inc for key, inc, _ in RollupService.diff(before, after)}
+
+    def test_1_new_treatment_counts_once(self):
+        changes = self.changes(None, self.pending)
+        key = (datetime(2025, 1, 14), "Pune", "cow", ALL_MEDICINES, None)
+        self.assertEqual(changes, {key: {"treatments": 1}})
+
+    def test_2_diagnosis_moves_the_treatment(self):
+        changes = self.changes(self.pending, self.diagnosed)
+        day = datetime(2025, 1, 15)
+        self.assertEqual(changes[(datetime(2025, 1, 14), "Pune", "cow", ALL_MEDICINES, None)], {"treatments": -1})
+        self.assertEqual(changes[(day, "Pune", "cow", ALL_MEDICINES, self.vet)], {"treatments": 1})
+        self.assertEqual(changes[(day, "Pune", "cow", "abc", self.vet)], {"prescriptions": 1})
+        self.assertEqual(len(changes), 4)
+
+    def test_3_flagging_only_touches_violations(self):
+        flagged = dict(self.diagnosed, violation=True)
+        changes = self.changes(self.diagnosed, flagged)
+        self.assertEqual(list(changes.values()), [{"violations": 1}])
+
+    def test_4_no_change_no_writes(self):
+        self.assertEqual(RollupService.diff(self.diagnosed, dict(self.diagnosed)), [])
+        self.assertIsNone(RollupService._state(None, "Pune", "cow", None, False, []))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from bson import ObjectId
+
+from app.services.qr_service import QRService
+from app.services.safety_service import SafetyService, SAFE, UNDER_WITHDRAWAL, NOT_FOUND, INVALID
+
+NOW = datetime(2025, 3, 1, 6, 0)
+
+
+class SafetyBatchTest(unittest.TestCase):
+    def test_1_ids_and_tokens_parse(self):
+        farmer, animal = ObjectId(), ObjectId()
+        self.assertEqual(SafetyService.parse(str(farmer)), (farmer, None))
+        self.assertEqual(SafetyService.parse(QRService.token(farmer, animal)), (farmer, animal))
+        self.assertIsNone(SafetyService.parse("garbage"))
+
+    def test_2_statuses_in_request_order(self):
+        safe, unsafe, missing, animal = ObjectId(), ObjectId(), ObjectId(), ObjectId()
+        until = NOW + timedelta(days=3)
+        refs = [str(unsafe), "garbage", str(safe), str(missing), QRService.token(safe, animal)]
+        parsed = {r: SafetyService.parse(r) for r in refs if SafetyService.parse(r)}
+
+        results = SafetyService.assemble(refs, parsed, {safe, unsafe}, {unsafe: until}, {animal: until})
+        self.assertEqual([r["status"] for r in results], [UNDER_WITHDRAWAL, INVALID, SAFE, NOT_FOUND, UNDER_WITHDRAWAL])
+        self.assertEqual(results[0]["safe_after"], until.isoformat() + "Z")
+        self.assertEqual(results[4]["animal_id"], str(animal))
+
+    def test_3_constant_number_of_queries(self):
+        refs = [str(ObjectId()) for _ in range(1000)] + [QRService.token(ObjectId(), ObjectId()) for _ in range(50)]
+        # Database path, as when the worker's unsafe-farmer map is unavailable
+        with mock.patch("app.services.safety_service.UnsafeFarmers.lookup", return_value=None), \
+                mock.patch("app.services.safety_service.DB") as db:
+            db.farmers.find.return_value = []
+            db.treatments.aggregate.return_value = []
+            results = SafetyService.check_many(refs, now=NOW)
+        self.assertEqual(len(results), 1050)
+        self.assertEqual(db.farmers.find.call_count, 1)
+        self.assertEqual(db.treatments.aggregate.call_count, 2)
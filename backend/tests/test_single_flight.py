@@ -0,0 +1,62 @@
+import threading
+import time
+import unittest
+
+from flask import Flask, jsonify
+
+from app.utils.single_flight import SingleFlight, coalesce
+
+
+class SingleFlightTest(unittest.TestCase):
+    def test_1_concurrent_callers_share_one_computation(self):
+        flights, calls, results = SingleFlight(), [], []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return "value"
+
+        threads = [threading.Thread(target=lambda: results.append(flights.do("k", compute))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["value"] * 5)
+
+    def test_2_errors_are_shared_and_not_remembered(self):
+        flights = SingleFlight()
+
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            flights.do("k", fail)
+        self.assertEqual(flights.do("k", lambda: 1), 1)
+
+    def test_3_identical_requests_share_a_response(self):
+        app, calls = Flask(__name__), []
+
+        @app.route("/stats")
+        @coalesce
+        def stats():
+            calls.append(1)
+            time.sleep(0.1)
+            return jsonify(count=len(calls))
+
+        responses = []
+
+        def get(query):
+            with app.test_client() as client:
+                responses.append(client.get(f"/stats?{query}"))
+
+        threads = [threading.Thread(target=get, args=(q,)) for q in ("a=1&b=2", "b=2&a=1", "a=1&b=2", "a=2")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Argument order does not matter; different arguments are a different flight
+        self.assertEqual(len(calls), 2)
+        self.assertTrue(all(r.status_code == 200 for r in responses))
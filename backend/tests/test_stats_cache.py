@@ -0,0 +1,68 @@
+import time
+import unittest
+
+from app.config import Config
+from app.services.stats_cache import StatsCache, StatsUnavailable
+from app.utils.circuit_breaker import CircuitBreaker
+
+
+def failing():
+    raise RuntimeError("operation exceeded time limit")
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def test_1_opens_after_threshold_and_probes_once(self):
+        breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=0.05)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())    # the probe
+        self.assertFalse(breaker.allow())   # only one at a time
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+
+class StatsCacheTest(unittest.TestCase):
+    def setUp(self):
+        StatsCache.clear()
+        StatsCache.breaker.record_success()
+        self.fresh_seconds = Config.DASHBOARD_STATS_FRESH_SECONDS
+        Config.DASHBOARD_STATS_FRESH_SECONDS = 0
+
+    def tearDown(self):
+        Config.DASHBOARD_STATS_FRESH_SECONDS = self.fresh_seconds
+        StatsCache.clear()
+        StatsCache.breaker.record_success()
+
+    def test_1_serves_last_known_good_as_stale(self):
+        self.assertFalse(StatsCache.get("violations", lambda: 7).stale)
+        result = StatsCache.get("violations", failing)
+        self.assertEqual(result.value, 7)
+        self.assertTrue(result.meta()["stale"])
+
+    def test_2_never_invents_data(self):
+        with self.assertRaises(StatsUnavailable):
+            StatsCache.get("violations", failing)
+
+    def test_3_composite_reports_missing_parts(self):
+        StatsCache.get("overview", lambda: {"total_farmers": 3})
+        values, meta = StatsCache.get_many({"overview": failing, "trends": failing})
+        self.assertEqual(values, {"overview": {"total_farmers": 3}, "trends": None})
+        self.assertTrue(meta["stale"])
+        self.assertEqual(meta["unavailable"], ["trends"])
+
+    def test_4_open_breaker_skips_the_database(self):
+        for _ in range(Config.DASHBOARD_BREAKER_FAILURES):
+            StatsCache.breaker.record_failure()
+        calls = []
+        with self.assertRaises(StatsUnavailable) as ctx:
+            StatsCache.get("violations", lambda: calls.append(1))
+        self.assertEqual(calls, [])
+        self.assertGreater(ctx.exception.retry_after, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from app.config import Config
+from app.services.sync_service import SyncService
+
+FARMER = SimpleNamespace(id="64b000000000000000000001")
+
+
+class SyncTokenTest(unittest.TestCase):
+    def test_1_token_round_trip(self):
+        issued_at = datetime(2025, 1, 15, 10, 30, 0)
+        token = SyncService.issue_token("64b000000000000000000001", issued_at)
+
+        self.assertEqual(SyncService.read_token(token, "64b000000000000000000001"), issued_at)
+
+    def test_2_token_is_bound_to_user(self):
+        token = SyncService.issue_token("64b000000000000000000001", datetime.utcnow())
+
+        # Another user's token falls back to a full sync
+        self.assertIsNone(SyncService.read_token(token, "64b000000000000000000002"))
+
+    def test_3_tampered_or_missing_token(self):
+        token = SyncService.issue_token("64b000000000000000000001", datetime.utcnow())
+
+        self.assertIsNone(SyncService.read_token(token[:-2] + "xx", "64b000000000000000000001"))
+        self.assertIsNone(SyncService.read_token(None, "64b000000000000000000001"))
+
+
+
+@mock.patch("app.services.sync_service.SerializerMixin.to_json", side_effect=lambda doc: {"updated_at": doc.updated_at})
+@mock.patch("app.services.sync_service.Animal")
+class SyncPushTest(unittest.TestCase):
+    def _animal(self, Animal, updated_at):
+        animal = mock.MagicMock(farmer=FARMER, updated_at=updated_at)
+        Animal.objects.return_value.first.return_value = animal
+        return animal
+
+    def _push(self, base_updated_at):
+        return SyncService.push("farmer", FARMER, [{
+            "client_id": "local-1", "collection": "animals", "op": "update",
+            "id": "64b0000000000000000000aa", "base_updated_at": base_updated_at, "data": {"weight": 412}
+        }])[0]
+
+    def test_4_offset_timestamps_are_compared_as_utc(self, Animal, to_json):
+        self._animal(Animal, datetime(2025, 1, 14, 8, 0))
+        Animal.objects.return_value.update_one.return_value = 1
+
+        # 13:30+05:30 is 08:00 UTC: nothing changed since the client read it
+        self.assertEqual(self._push("2025-01-14T13:30:00+05:30")["status"], "applied")
+        self.assertEqual(self._push("2025-01-14T08:00:00Z")["status"], "applied")
+        # 07:59 UTC predates the server copy
+        self.assertEqual(self._push("2025-01-14T07:59:00+00:00")["status"], "conflict")
+
+    def test_5_lost_race_and_bad_input(self, Animal, to_json):
+        self._animal(Animal, datetime(2025, 1, 14, 8, 0))
+        Animal.objects.return_value.update_one.return_value = 0
+        self.assertEqual(self._push("2025-01-14T08:00:00")["status"], "conflict")
+
+        rejected = self._push("yesterday")
+        self.assertEqual(rejected["status"], "rejected")
+        self.assertIn("ISO 8601", rejected["error"])
+
+        vet_push = SyncService.push("vet", FARMER, [{"client_id": "x", "collection": "animals", "op": "create"}])
+        self.assertEqual(vet_push[0]["status"], "rejected")
+
+
+class SyncPullTest(unittest.TestCase):
+    @mock.patch("app.services.sync_service.AuthorizedMedicine")
+    @mock.patch("app.services.sync_service.Animal")
+    @mock.patch("app.services.sync_service.Treatment")
+    def test_6_delta_pull_filters_on_updated_at(self, Treatment, Animal, AuthorizedMedicine):
+        Treatment.objects.return_value.no_dereference.return_value = []
+        Animal.objects.return_value.no_dereference.return_value = []
+        AuthorizedMedicine.objects.return_value = []
+        AuthorizedMedicine.objects.scalar.return_value = ["m1", "m2"]
+
+        since = datetime(2025, 1, 15, 10, 0)
+        result = SyncService.pull("farmer", FARMER, since)
+
+        cutoff = since - timedelta(seconds=Config.SYNC_CLOCK_SKEW_SECONDS)
+        Treatment.objects.assert_called_once_with(farmer=FARMER, updated_at__gt=cutoff)
+        Animal.objects.assert_called_once_with(farmer=FARMER, updated_at__gt=cutoff)
+        self.assertFalse(result["full_sync"])
+        self.assertEqual(result["medicine_ids"], ["m1", "m2"])
+        self.assertEqual(SyncService.read_token(result["sync_token"], FARMER.id).isoformat(), result["server_time"])
+
+        full = SyncService.pull("farmer", FARMER, None)
+        self.assertTrue(full["full_sync"])
+        self.assertEqual(Treatment.objects.call_args, mock.call(farmer=FARMER))
+
+
+if __name__ == '__main__':
+    unittest.main()
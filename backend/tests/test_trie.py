@@ -0,0 +1,30 @@
+import unittest
+
+from app.utils.trie import PrefixTrie, normalize_name
+
+
+class PrefixTrieTest(unittest.TestCase):
+    def setUp(self):
+        self.trie = PrefixTrie()
+        for name in ["Amoxicillin", "Amoxicillin Clavulanate", "Oxytetracycline", "Meloxicam", "Enrofloxacin"]:
+            self.trie.insert(name, {"name": name})
+
+    def test_1_normalize_name(self):
+        self.assertEqual(normalize_name("  Amoxi-Cillin  LA "), "amoxi cillin la")
+        self.assertEqual(normalize_name(None), "")
+
+    def test_2_prefix_search_is_case_insensitive(self):
+        names = [m["name"] for m in self.trie.search("AMOX")]
+        self.assertEqual(names, ["Amoxicillin", "Amoxicillin Clavulanate"])
+
+    def test_3_matches_inner_words_once(self):
+        names = [m["name"] for m in self.trie.search("clav")]
+        self.assertEqual(names, ["Amoxicillin Clavulanate"])
+
+    def test_4_limit_and_misses(self):
+        self.assertEqual(len(self.trie.search("a", limit=1)), 1)
+        self.assertEqual(self.trie.search("zz"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from bson import ObjectId
+
+from app.services.unsafe_farmers import UnsafeFarmers
+
+NOW = datetime.utcnow()
+FARMER, OTHER, ANIMAL, CALF = ObjectId(), ObjectId(), ObjectId(), ObjectId()
+
+
+def _rows(*entries):
+    return [{"_id": {"farmer": f, "animal": a}, "until": until} for f, a, until in entries]
+
+
+class UnsafeFarmersTest(unittest.TestCase):
+    def setUp(self):
+        UnsafeFarmers._unsafe, UnsafeFarmers._fresh_at, UnsafeFarmers._polled_at = {}, None, 0.0
+        UnsafeFarmers._known.clear()
+        self.db = mock.patch("app.services.unsafe_farmers.DB").start()
+        self.addCleanup(mock.patch.stopall)
+        self.db.treatments.aggregate.return_value = _rows(
+            (FARMER, ANIMAL, NOW + timedelta(days=2)),
+            (FARMER, CALF, NOW + timedelta(days=5)),
+        )
+        self.db.farmers.find.return_value = [{"_id": OTHER}]
+        UnsafeFarmers.ensure_fresh()
+
+    def test_1_answers_from_memory(self):
+        known, farmers, animals = UnsafeFarmers.lookup({(FARMER, None), (OTHER, None), (FARMER, ANIMAL)}, NOW)
+        self.assertEqual(known, {FARMER, OTHER})
+        self.assertEqual(farmers, {FARMER: NOW + timedelta(days=5)})
+        self.assertEqual(animals, {ANIMAL: NOW + timedelta(days=2)})
+
+        # OTHER is now known too: the next lookup touches no collection
+        self.db.reset_mock()
+        UnsafeFarmers.lookup({(OTHER, None), (FARMER, None)}, NOW)
+        self.db.farmers.find.assert_not_called()
+        self.db.treatments.aggregate.assert_not_called()
+
+    def test_2_withdrawals_expire_without_a_poll(self):
+        _, farmers, animals = UnsafeFarmers.lookup({(FARMER, None), (FARMER, ANIMAL)}, NOW + timedelta(days=3))
+        self.assertEqual(farmers, {FARMER: NOW + timedelta(days=5)})
+        self.assertEqual(animals, {})
+
+        _, farmers, _ = UnsafeFarmers.lookup({(FARMER, None)}, NOW + timedelta(days=6))
+        self.assertEqual(farmers, {})
+        self.assertIn(FARMER, UnsafeFarmers._unsafe)   # readers never mutate the map
+
+        # The next poll, under the refresh lock, drops the ended withdrawals
+        self.db.treatments.distinct.return_value = []
+        UnsafeFarmers._polled_at = 0.0
+        with mock.patch("app.services.unsafe_farmers.datetime") as clock:
+            clock.utcnow.return_value = NOW + timedelta(days=6)
+            UnsafeFarmers.ensure_fresh()
+        self.assertNotIn(FARMER, UnsafeFarmers._unsafe)
+
+    def test_3_poll_recomputes_changed_farmers(self):
+        self.db.treatments.distinct.return_value = [FARMER, OTHER]
+        self.db.treatments.aggregate.return_value = _rows((OTHER, ANIMAL, NOW + timedelta(days=1)))
+        UnsafeFarmers._polled_at = 0.0
+        UnsafeFarmers.ensure_fresh()
+        self.assertEqual(set(UnsafeFarmers._unsafe), {OTHER})
+
+    def test_4_stale_map_falls_back_to_the_database(self):
+        self.db.treatments.distinct.side_effect = RuntimeError("primary unreachable")
+        UnsafeFarmers._fresh_at -= 3600
+        UnsafeFarmers._polled_at = 0.0
+        self.assertIsNone(UnsafeFarmers.lookup({(FARMER, None)}, NOW))